@@ -0,0 +1,284 @@
+" A thin client for `python -m python_style_swapper.daemon`.
+"
+" The daemon is started the first time that it's needed, with `job_start` in
+" Vim or `jobstart` in Neovim, and it keeps running until Vim exits. Requests
+" and responses are newline-delimited JSON-RPC. A buffer's lines are only
+" sent when the daemon doesn't have the buffer's current `b:changedtick`.
+"
+" If `g:vim_python_style_swapper_daemon_address` is set, like
+" "localhost:8765", a daemon which was started with `--port` is used instead.
+
+let s:STALE_BUFFER = -32001
+let s:root = expand('<sfile>:p:h:h:h')
+let s:channel = v:null
+let s:request_id = 0
+let s:responses = {}
+let s:callbacks = {}
+let s:pending = {}
+let s:partial = ''
+
+
+function! s:GetCommand()
+    return get(g:, 'vim_python_style_swapper_daemon_command', ['python3', '-m', 'python_style_swapper.daemon'])
+endfunction
+
+
+function! s:GetTimeout()
+    return get(g:, 'vim_python_style_swapper_daemon_timeout', 5000)
+endfunction
+
+
+" Collect the lines that Neovim reads from the daemon. A line may be split
+" across calls so the last, unfinished line is kept until the rest arrives.
+function! s:OnOutput(channel, data, ...)
+    let l:data = copy(a:data)
+    let l:data[0] = s:partial . l:data[0]
+    let s:partial = remove(l:data, -1)
+
+    for l:line in l:data
+        if empty(l:line)
+            continue
+        endif
+
+        let l:response = json_decode(l:line)
+
+        if has_key(s:callbacks, l:response.id)
+            call call(remove(s:callbacks, l:response.id), [l:response])
+        else
+            let s:responses[l:response.id] = l:response
+        endif
+    endfor
+endfunction
+
+
+function! s:Connect()
+    let l:address = get(g:, 'vim_python_style_swapper_daemon_address', '')
+
+    if has('nvim')
+        if s:channel isnot v:null
+            return
+        endif
+
+        if empty(l:address)
+            let s:channel = jobstart(s:GetCommand(), {'cwd': s:root . '/pythonx', 'on_stdout': function('s:OnOutput')})
+        else
+            let s:channel = sockconnect('tcp', l:address, {'on_data': function('s:OnOutput')})
+        endif
+    else
+        if s:channel isnot v:null && ch_status(s:channel) ==# 'open'
+            return
+        endif
+
+        if empty(l:address)
+            let s:channel = job_getchannel(job_start(s:GetCommand(), {'cwd': s:root . '/pythonx', 'mode': 'nl'}))
+        else
+            let s:channel = ch_open(l:address, {'mode': 'nl'})
+        endif
+    endif
+
+    " The daemon keeps these for this connection only, so editors which share it don't overwrite each other
+    call python_style_swapper#daemon#request('initialize', {
+        \ 'indent': get(g:, 'vim_python_style_swapper_indent', &expandtab ? '    ' : "\t"),
+        \ 'backend': get(g:, 'vim_python_style_swapper_backend', v:null),
+        \ 'scope': get(g:, 'vim_python_style_swapper_parse_scope', v:null),
+        \ })
+endfunction
+
+
+function! s:Send(message)
+    if has('nvim')
+        call chansend(s:channel, json_encode(a:message) . "\n")
+    else
+        call ch_sendraw(s:channel, json_encode(a:message) . "\n")
+    endif
+endfunction
+
+
+" Send a request to the daemon and wait for its response.
+function! python_style_swapper#daemon#request(method, params)
+    call s:Connect()
+
+    let s:request_id += 1
+    let l:id = s:request_id
+    let l:message = {'jsonrpc': '2.0', 'id': l:id, 'method': a:method, 'params': a:params}
+
+    if !has('nvim')
+        return json_decode(ch_evalraw(s:channel, json_encode(l:message) . "\n", {'timeout': s:GetTimeout()}))
+    endif
+
+    call s:Send(l:message)
+
+    if wait(s:GetTimeout(), {-> has_key(s:responses, l:id)}) != 0
+        throw 'vim-python-style-swapper: The daemon did not respond to "' . a:method . '"'
+    endif
+
+    return remove(s:responses, l:id)
+endfunction
+
+
+" Send a request to the daemon and call {callback} with its response, without waiting for it.
+function! python_style_swapper#daemon#request_async(method, params, callback)
+    call s:Connect()
+
+    let s:request_id += 1
+    let l:message = {'jsonrpc': '2.0', 'id': s:request_id, 'method': a:method, 'params': a:params}
+
+    if has('nvim')
+        let s:callbacks[s:request_id] = a:callback
+        call s:Send(l:message)
+    else
+        call ch_sendraw(
+            \ s:channel,
+            \ json_encode(l:message) . "\n",
+            \ {'callback': {channel, line -> call(a:callback, [json_decode(line)])}},
+            \ )
+    endif
+
+    return s:request_id
+endfunction
+
+
+" Send a message to the daemon which doesn't need a response.
+function! python_style_swapper#daemon#notify(method, params)
+    call s:Connect()
+    call s:Send({'jsonrpc': '2.0', 'method': a:method, 'params': a:params})
+endfunction
+
+
+function! s:GetBufferName()
+    return getpid() . ':' . bufnr('%')
+endfunction
+
+
+" Send a request about the current buffer, re-sending its lines only if the daemon needs them.
+function! s:RequestBuffer(method, params)
+    let l:params = extend({'buffer': s:GetBufferName(), 'version': b:changedtick}, a:params)
+    let l:response = python_style_swapper#daemon#request(a:method, l:params)
+
+    if has_key(l:response, 'error') && l:response.error.code == s:STALE_BUFFER
+        let l:params.lines = getline(1, '$')
+        let l:response = python_style_swapper#daemon#request(a:method, l:params)
+    endif
+
+    if has_key(l:response, 'error')
+        echoerr 'vim-python-style-swapper: ' . l:response.error.message
+
+        return v:null
+    endif
+
+    return l:response.result
+endfunction
+
+
+" Apply the daemon's edits to the current buffer, from the bottom up so that
+" each edit never moves the lines of the edits that are still left to apply.
+function! s:ApplyEdits(edits)
+    for l:edit in reverse(copy(a:edits))
+        let l:count = l:edit.end - l:edit.start
+        let l:common = min([l:count, len(l:edit.lines)])
+
+        if l:common > 0
+            call setline(l:edit.start + 1, l:edit.lines[: l:common - 1])
+        endif
+
+        if l:count > l:common
+            silent execute (l:edit.start + l:common + 1) . ',' . l:edit.end . 'delete _'
+        elseif len(l:edit.lines) > l:common
+            call append(l:edit.start + l:common, l:edit.lines[l:common :])
+        endif
+    endfor
+
+    if !empty(a:edits)
+        call python_style_swapper#daemon#notify('applied', {'buffer': s:GetBufferName(), 'version': b:changedtick})
+    endif
+endfunction
+
+
+function! python_style_swapper#daemon#toggle()
+    let l:result = s:RequestBuffer('toggle', {'row': line('.')})
+
+    if l:result is v:null || l:result.row is v:null
+        return
+    endif
+
+    call s:ApplyEdits(l:result.edits)
+    call cursor(l:result.row, 1)
+    normal! ^
+endfunction
+
+
+function! python_style_swapper#daemon#toggle_range(first, last)
+    let l:result = s:RequestBuffer('toggle_range', {'first': a:first, 'last': a:last})
+
+    if l:result isnot v:null
+        call s:ApplyEdits(l:result.edits)
+    endif
+endfunction
+
+
+" Check if the result of an asynchronous toggle can still be applied.
+"
+" The result is only applied to the buffer that it was requested for, if
+" that buffer is still current, hasn't changed since and no newer toggle
+" was requested for it.
+"
+function! s:IsCurrent(request)
+    return bufnr('%') == a:request.buffer
+        \ && b:changedtick == a:request.version
+        \ && get(s:pending, a:request.buffer, -1) == a:request.id
+endfunction
+
+
+function! s:OnToggle(request, response)
+    if !s:IsCurrent(a:request)
+        " The buffer changed while the daemon was busy. The edits describe
+        " lines which may have moved, so they're thrown away.
+        "
+        return
+    endif
+
+    if has_key(a:response, 'error') && a:response.error.code == s:STALE_BUFFER && !has_key(a:request.params, 'lines')
+        let a:request.params.lines = getline(1, '$')
+        call s:RequestToggle(a:request)
+
+        return
+    endif
+
+    call remove(s:pending, a:request.buffer)
+
+    if has_key(a:response, 'error')
+        echoerr 'vim-python-style-swapper: ' . a:response.error.message
+
+        return
+    endif
+
+    if a:response.result.row is v:null
+        return
+    endif
+
+    call s:ApplyEdits(a:response.result.edits)
+    call cursor(a:response.result.row, 1)
+    normal! ^
+endfunction
+
+
+function! s:RequestToggle(request)
+    let a:request.id = python_style_swapper#daemon#request_async('toggle', a:request.params, function('s:OnToggle', [a:request]))
+    let s:pending[a:request.buffer] = a:request.id
+endfunction
+
+
+" Swap the call under the cursor without waiting for the daemon.
+"
+" Vim stays responsive while the daemon works. The edits are applied once
+" they arrive, unless the buffer was changed in the meantime.
+"
+function! python_style_swapper#daemon#toggle_async()
+    let l:request = {
+        \ 'buffer': bufnr('%'),
+        \ 'version': b:changedtick,
+        \ 'params': {'buffer': s:GetBufferName(), 'version': b:changedtick, 'row': line('.')},
+        \ }
+
+    call s:RequestToggle(l:request)
+endfunction
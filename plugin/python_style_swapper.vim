@@ -8,11 +8,21 @@ if get(g:, 'style_swapper_loaded', '0') == '1'
 endif
 
 command! -nargs=0 PythonFunctionStyleToggle call s:PythonFunctionStyleToggle()
+command! -nargs=0 -range=% PythonFunctionStyleToggleRange call s:PythonFunctionStyleToggleRange(<line1>, <line2>)
+command! -nargs=0 PythonStyleSwapperCacheInfo call s:PythonStyleSwapperCacheInfo()
+command! -nargs=0 PythonStyleSwapperCacheClear call s:PythonStyleSwapperCacheClear()
+command! -nargs=0 PythonStyleSwapperStats call s:PythonStyleSwapperStats()
+command! -nargs=? PythonStyleSwapperProfile call s:PythonStyleSwapperProfile(<q-args>)
 
 if !hasmapto('<Plug>(vim-python-style-swapper-mapping)')
     nmap <leader>sa <Plug>(vim-python-style-swapper-mapping)
 endif
 
+if !hasmapto('<Plug>(vim-python-style-swapper-operator)')
+    nmap <leader>sr <Plug>(vim-python-style-swapper-operator)
+    xmap <leader>sr <Plug>(vim-python-style-swapper-operator)
+endif
+
 " Plugin mappings
 try
     " If [tpope/vim-repeat](https://github.com/tpope/vim-repeat) is installed, use it
@@ -22,6 +32,20 @@ catch /\VUnknown function/
     nnoremap <silent> <Plug>(vim-python-style-swapper-mapping) :PythonFunctionStyleToggle<CR>
 endtry
 
+" Toggle every call in a motion, like `<leader>sr}`, or in a visual selection
+nnoremap <silent> <Plug>(vim-python-style-swapper-operator) :set operatorfunc=<SID>PythonFunctionStyleToggleOperator<CR>g@
+xnoremap <silent> <Plug>(vim-python-style-swapper-operator) :PythonFunctionStyleToggleRange<CR>
+
+" Find the swap of the call under the cursor while Vim is idle, so that
+" swapping only needs to apply it
+"
+if get(g:, 'vim_python_style_swapper_precompute', 0) && !get(g:, 'vim_python_style_swapper_daemon', 0)
+    augroup python_style_swapper_precompute
+        autocmd!
+        autocmd CursorHold *.py call s:PythonFunctionStylePrecompute()
+    augroup END
+endif
+
 
 pythonx << EOF
 from python_style_swapper import vim_swapper
@@ -31,6 +55,18 @@ EOF
 
 
 function! s:PythonFunctionStyleToggle()
+if get(g:, 'vim_python_style_swapper_daemon', 0) && get(g:, 'vim_python_style_swapper_async', 0)
+    call python_style_swapper#daemon#toggle_async()
+
+    return
+endif
+
+if get(g:, 'vim_python_style_swapper_daemon', 0)
+    call python_style_swapper#daemon#toggle()
+
+    return
+endif
+
 pythonx << EOF
 from python_style_swapper import vim_swapper
 from python_style_swapper import swapper
@@ -40,4 +76,73 @@ EOF
 endfunction
 
 
+function! s:PythonFunctionStylePrecompute()
+pythonx << EOF
+from python_style_swapper import vim_swapper
+
+vim_swapper.precompute()
+EOF
+endfunction
+
+
+function! s:PythonFunctionStyleToggleRange(first, last)
+if get(g:, 'vim_python_style_swapper_daemon', 0)
+    call python_style_swapper#daemon#toggle_range(a:first, a:last)
+
+    return
+endif
+
+pythonx << EOF
+import vim
+
+from python_style_swapper import vim_swapper
+
+vim_swapper.toggle_range(vim.eval('a:first'), vim.eval('a:last'))
+EOF
+endfunction
+
+
+function! s:PythonFunctionStyleToggleOperator(type)
+    call s:PythonFunctionStyleToggleRange(line("'["), line("']"))
+endfunction
+
+
+function! s:PythonStyleSwapperCacheInfo()
+pythonx << EOF
+from python_style_swapper import vim_swapper
+
+vim_swapper.echo_cache_stats()
+EOF
+endfunction
+
+
+function! s:PythonStyleSwapperCacheClear()
+pythonx << EOF
+from python_style_swapper import vim_swapper
+
+vim_swapper.clear_cache()
+EOF
+endfunction
+
+
+function! s:PythonStyleSwapperStats()
+pythonx << EOF
+from python_style_swapper import vim_swapper
+
+vim_swapper.echo_timing_stats()
+EOF
+endfunction
+
+
+function! s:PythonStyleSwapperProfile(count)
+pythonx << EOF
+import vim
+
+from python_style_swapper import vim_swapper
+
+vim_swapper.profile_next(vim.eval('a:count') or 1)
+EOF
+endfunction
+
+
 let g:style_swapper_loaded = 1
@@ -0,0 +1,13 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Format Python files from the command-line. See <cli> for details.'''
+
+# IMPORT STANDARD LIBRARIES
+import sys
+
+# IMPORT LOCAL LIBRARIES
+from . import cli
+
+
+sys.exit(cli.main())
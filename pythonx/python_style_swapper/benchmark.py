@@ -0,0 +1,372 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Measure how long swaps take, for generated buffers and for real Python files.
+
+Every swap is split into the phases of <timing.PHASES>. Each phase is timed
+on its own, so a slow swap shows whether the time went to parsing, to finding
+the call, to finding where the call ends, to rendering the call or to
+splicing it back in.
+
+Results are written as JSON so that they can be compared between commits.
+
+Example:
+    >>> python -m python_style_swapper.benchmark --lines 1000 10000 --output results.json
+    >>> python -m python_style_swapper.benchmark --corpus path/to/package --backend ast
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+from __future__ import division
+from __future__ import print_function
+
+import collections
+import itertools
+import argparse
+import platform
+import json
+import ast
+import sys
+import io
+import os
+
+# IMPORT LOCAL LIBRARIES
+from . import swapper
+from . import config
+from . import timing
+
+
+PHASES = timing.PHASES
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'vendors', 'astroid')
+_EXTENSION = '.py'
+_FUNCTIONS = collections.OrderedDict((
+    ('make_multi_line', swapper.make_multi_line),
+    ('make_single_line', swapper.make_single_line),
+    ('toggle', lambda code, row: swapper.toggle(code, row)[0]),
+))
+
+
+def _median(values):
+    '''float: Get the middle of some numbers.'''
+    values = sorted(values)
+    middle = len(values) // 2
+
+    if len(values) % 2:
+        return values[middle]
+
+    return (values[middle - 1] + values[middle]) / 2
+
+
+def measure(function, code, row, repeat=3):
+    '''Time each phase of a swap.
+
+    Args:
+        function (callable[str, int]): The swap to run, like <swapper.make_multi_line>.
+        code (str): The code to swap a call of.
+        row (int): The 1-based row of the call to swap.
+        repeat (int, optional): How many times to run the swap. The median of each phase is kept.
+
+    Returns:
+        dict[str, float]: The milliseconds of each phase and of the whole swap, as "total".
+
+    '''
+    runs = []
+
+    for _ in range(max(repeat, 1)):
+        with timing.record(keep=False) as record:
+            function(code, row)
+
+        runs.append(record.get_milliseconds())
+
+    return {phase: round(_median([run[phase] for run in runs]), 4) for phase in PHASES + ('total', )}
+
+
+def _make_call(index, arguments, depth, lambdas):
+    '''str: Write a call with some number of arguments, nested `depth` calls deep.'''
+    values = ['argument_{number}'.format(number=number) for number in range(arguments)]
+
+    if lambdas:
+        # Tokens alone aren't enough for a lambda, so the call must be parsed
+        values.append('lambda: value')
+
+    if depth > 1 and values:
+        values[0] = _make_call(index + 1, arguments, depth - 1, lambdas)
+
+    return 'call_{index}({values})'.format(index=index, values=', '.join(values))
+
+
+def generate_code(lines, density=0.5, arguments=3, depth=1, lambdas=False):
+    '''Write some Python code which has a known number and shape of calls.
+
+    The code is made of functions of 10 lines each. Statements which aren't
+    calls are simple assignments.
+
+    Args:
+        lines (int): Roughly how many lines of code to write.
+        density (float, optional): How many statements are calls, from 0 to 1.
+        arguments (int, optional): How many arguments each call has.
+        depth (int, optional): How deeply calls are nested in the first argument of each other.
+        lambdas (bool, optional): If True, each call also has a lambda argument and must be parsed.
+
+    Returns:
+        tuple[str, list[int]]: The code and the 1-based row of each single-line call.
+
+    '''
+    output = []
+    rows = []
+    statements = itertools.count()
+
+    for function in range(max(lines // 10, 1)):
+        output.append('def function_{function}(value):'.format(function=function))
+        output.append('    """Do something."""')
+
+        for _ in range(7):
+            index = next(statements)
+
+            if int((index + 1) * density) > int(index * density):
+                output.append('    result = {call}'.format(call=_make_call(index, arguments, depth, lambdas)))
+                rows.append(len(output))
+            else:
+                output.append('    result = value + {index}'.format(index=index))
+
+        output.append('')
+
+    return ('\n'.join(output), rows)
+
+
+def _get_case(code, row, repeat):
+    '''dict[str, dict[str, float]]: Time every function on a single-line call and its multi-line equivalent.'''
+    expanded = swapper.make_multi_line(code, row)
+    results = collections.OrderedDict()
+
+    for name, function in _FUNCTIONS.items():
+        results[name] = measure(function, expanded if name == 'make_single_line' else code, row, repeat=repeat)
+
+    return results
+
+
+def run_synthetic(sizes, densities=(0.5, ), arguments=(3, ), depths=(1, ), lambdas=False, repeat=3):
+    '''Time swaps in generated code.
+
+    Every combination of the given sizes, densities, argument counts and
+    depths is generated. The call in the middle of each buffer is swapped.
+
+    Args:
+        sizes (iter[int]): Roughly how many lines each buffer has.
+        densities (iter[float], optional): How many statements are calls, from 0 to 1.
+        arguments (iter[int], optional): How many arguments each call has.
+        depths (iter[int], optional): How deeply calls are nested.
+        lambdas (bool, optional): If True, every call must be parsed. Otherwise, tokens are enough.
+        repeat (int, optional): How many times each swap is run.
+
+    Returns:
+        list[dict[str, object]]: The description and phase timings of each buffer.
+
+    '''
+    results = []
+
+    for lines, density, count, depth in itertools.product(sizes, densities, arguments, depths):
+        code, rows = generate_code(lines, density=density, arguments=count, depth=depth, lambdas=lambdas)
+
+        if not rows:
+            continue
+
+        row = rows[len(rows) // 2]
+        results.append({
+            'case': 'synthetic',
+            'lines': code.count('\n') + 1,
+            'calls': len(rows),
+            'density': density,
+            'arguments': count,
+            'depth': depth,
+            'lambdas': lambdas,
+            'row': row,
+            'timings': _get_case(code, row, repeat),
+        })
+
+    return results
+
+
+def _iter_files(paths):
+    '''Find every Python file in some files and directories, in a stable order.'''
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+
+            continue
+
+        for root, directories, files in os.walk(path):
+            directories[:] = sorted(directories)
+
+            for name in sorted(files):
+                if name.endswith(_EXTENSION):
+                    yield os.path.join(root, name)
+
+
+def _get_call_rows(code, count):
+    '''list[int]: Choose up to `count` rows, spread across `code`, which have a call that starts on a single line.'''
+    lines = code.split('\n')
+    rows = sorted(set(
+        node.lineno for node in ast.walk(ast.parse(code))
+        if isinstance(node, ast.Call) and ')' in lines[node.lineno - 1]
+    ))
+
+    if len(rows) <= count:
+        return rows
+
+    step = len(rows) / count
+
+    return [rows[int(index * step)] for index in range(count)]
+
+
+def run_corpus(paths, calls=5, repeat=3):
+    '''Time swaps in real Python files.
+
+    Args:
+        paths (iter[str]): The Python files and directories to read.
+        calls (int, optional): How many calls of each file to swap.
+        repeat (int, optional): How many times each swap is run.
+
+    Returns:
+        list[dict[str, object]]:
+            The path and phase timings of each swapped call. Any call which
+            couldn't be swapped has an "error" and any file which couldn't be
+            parsed has a "skipped" reason, instead of timings.
+
+    '''
+    results = []
+
+    for path in _iter_files(paths):
+        try:
+            with io.open(path, 'r', encoding='utf-8') as handler:
+                code = handler.read()
+
+            rows = _get_call_rows(code, calls)
+        except (IOError, OSError, UnicodeDecodeError, SyntaxError, ValueError) as error:
+            # Test data may not be valid Python, or not valid in this version of Python
+            results.append({'case': 'corpus', 'path': path, 'skipped': str(error)})
+
+            continue
+
+        for row in rows:
+            result = {'case': 'corpus', 'path': path, 'lines': code.count('\n') + 1, 'row': row}
+
+            try:
+                result['timings'] = _get_case(code, row, repeat)
+            except Exception as error:  # pylint: disable=broad-except
+                # One call which can't be swapped shouldn't stop every other call from being measured
+                result['error'] = '{name}: {error}'.format(name=error.__class__.__name__, error=error)
+
+            results.append(result)
+
+    return results
+
+
+def _summarize(results, stream):
+    '''Print the median total time of each function for each result, as a table.'''
+    print('{:<50} {:>8} {:>18} {:>18} {:>18}'.format('case', 'lines', *_FUNCTIONS), file=stream)
+
+    for result in results:
+        if result['case'] == 'synthetic':
+            name = 'synthetic density={density} arguments={arguments} depth={depth}'.format(**result)
+        else:
+            name = '{path}:{row}'.format(path=os.path.relpath(result['path']), row=result.get('row', '?'))
+
+        if 'timings' in result:
+            totals = ['{:.3f} ms'.format(result['timings'][function]['total']) for function in _FUNCTIONS]
+        else:
+            totals = ['skipped' if 'skipped' in result else 'error'] * len(_FUNCTIONS)
+
+        print('{:<50} {:>8} {:>18} {:>18} {:>18}'.format(name[-50:], result.get('lines', ''), *totals), file=stream)
+
+
+def _make_parser():
+    '''<argparse.ArgumentParser>: Describe every command-line option.'''
+    parser = argparse.ArgumentParser(
+        prog='python -m python_style_swapper.benchmark',
+        description='Time each phase of a swap, in generated code and in real Python files.',
+    )
+    parser.add_argument(
+        '--lines', type=int, nargs='*', default=[1000, 10000, 100000],
+        help='The size of each generated buffer. Give no sizes to skip generated buffers.')
+    parser.add_argument(
+        '--density', type=float, nargs='+', default=[0.5],
+        help='How many statements of each generated buffer are calls, from 0 to 1.')
+    parser.add_argument(
+        '--arguments', type=int, nargs='+', default=[3],
+        help='How many arguments each generated call has.')
+    parser.add_argument(
+        '--depth', type=int, nargs='+', default=[1],
+        help='How deeply each generated call is nested.')
+    parser.add_argument(
+        '--lambdas', action='store_true',
+        help='Give every generated call a lambda, so that it must be parsed.')
+    parser.add_argument(
+        '--corpus', nargs='*', default=[DEFAULT_CORPUS],
+        help='The Python files or directories to swap real calls in. Give no paths to skip them.')
+    parser.add_argument(
+        '--calls', type=int, default=5,
+        help='How many calls of each corpus file are swapped.')
+    parser.add_argument(
+        '-b', '--backend', choices=(config.ASTROID_BACKEND, config.AST_BACKEND), default=config.get_backend(),
+        help='What parses code, whenever its tokens aren\'t enough.')
+    parser.add_argument(
+        '-r', '--repeat', type=int, default=3,
+        help='How many times each swap is run. The median of each phase is reported.')
+    parser.add_argument(
+        '-o', '--output',
+        help='The file to write JSON results to. If no file is given, they are written to stdout.')
+
+    return parser
+
+
+def main(arguments=None):
+    '''Run the benchmarks given on the command-line and write their results as JSON.
+
+    Args:
+        arguments (list[str], optional): The command-line arguments. If none are given, `sys.argv` is used.
+
+    Returns:
+        int: 1 if any call couldn't be swapped. Otherwise, 0.
+
+    '''
+    options = _make_parser().parse_args(arguments)
+    previous = config.get_backend()
+    config.register_backend(options.backend)
+
+    try:
+        results = run_synthetic(
+            options.lines,
+            densities=options.density,
+            arguments=options.arguments,
+            depths=options.depth,
+            lambdas=options.lambdas,
+            repeat=options.repeat,
+        )
+        results.extend(run_corpus(options.corpus, calls=options.calls, repeat=options.repeat))
+    finally:
+        config.register_backend(previous)
+
+    report = {
+        'python': platform.python_version(),
+        'backend': options.backend,
+        'scope': config.get_parse_scope(),
+        'repeat': options.repeat,
+        'phases': list(PHASES),
+        'results': results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+
+    if options.output:
+        with io.open(options.output, 'w', encoding='utf-8') as handler:
+            handler.write(text if isinstance(text, type(u'')) else text.decode('utf-8'))
+    else:
+        print(text)
+
+    _summarize(results, sys.stderr)
+
+    return int(any('error' in result for result in results))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
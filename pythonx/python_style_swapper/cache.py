@@ -0,0 +1,381 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''A bounded cache of parsed code, so that unchanged code isn't parsed again.
+
+Users often swap several calls in a row without editing the buffer in-between.
+Each <session.Session> keeps its parsed trees and found calls so, as long as
+the code hasn't changed, the same session can be used again.
+
+Sessions are stored by a key and a version. In Vim, the key is the buffer
+number and the version is `b:changedtick`. Outside of Vim, <get_session> uses
+a hash of the code, instead.
+
+<RestoreCache> remembers the text that each swap replaced so that swapping
+the same call back restores that text exactly, without parsing anything.
+
+astroid keeps a cache of its own, in `astroid.MANAGER`, of every module that
+it has built or imported while inferring. <trim_astroid_cache> and
+<clear_astroid_cache> keep that cache from growing for as long as Vim is open.
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+import collections
+import hashlib
+import sys
+
+# IMPORT LOCAL LIBRARIES
+from .trimmer import session
+from . import swapper
+from . import config
+
+
+class SessionCache(object):
+
+    '''A least-recently-used cache of <session.Session> objects.
+
+    Only one session is kept for each key. Adding a newer version of a key
+    replaces the older version.
+
+    A session uses more memory as it parses more of its code, which is
+    usually after it was added. Call <SessionCache.trim> once a cached
+    session is done parsing, so that its trees count towards the limit.
+
+    Attributes:
+        hits (int): How many times a session was found in the cache.
+        misses (int): How many times a session wasn't found in the cache.
+
+    '''
+
+    def __init__(self, size=None, memory=None):
+        '''Create the cache.
+
+        Args:
+            size (int, optional):
+                The most sessions that may be cached at once. If no size is
+                given, the user's preferred size is used.
+            memory (int, optional):
+                The most bytes (roughly) that every cached session may use,
+                combined. If no limit is given, the user's preferred limit is used.
+
+        '''
+        super(SessionCache, self).__init__()
+        self._size = size
+        self._memory = memory
+        self._sessions = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self):
+        '''int: The most sessions that may be cached at once.'''
+        if self._size is None:
+            return config.get_cache_size()
+
+        return self._size
+
+    @property
+    def memory(self):
+        '''int: The most bytes (roughly) that every cached session may use, combined.'''
+        if self._memory is None:
+            return config.get_cache_memory()
+
+        return self._memory
+
+    def trim(self):
+        '''Remove the least recently used sessions until this cache is within its limits.'''
+        size = self.size
+        memory = self.memory
+
+        while self._sessions and (len(self._sessions) > size or self.get_memory() > memory):
+            self._sessions.popitem(last=False)
+
+    def get(self, key, version=None):
+        '''Find a cached session.
+
+        Args:
+            key (hashable): The name that the session was cached under.
+            version (hashable, optional): The version of the code that the session must have.
+
+        Returns:
+            <session.Session> or NoneType: The found session, if any.
+
+        '''
+        try:
+            cached_version, context = self._sessions.pop(key)
+        except KeyError:
+            self.misses += 1
+
+            return None
+
+        if cached_version != version:
+            self.misses += 1
+
+            return None
+
+        # Re-add the session so that it becomes the most recently used session
+        self._sessions[key] = (cached_version, context)
+        self.hits += 1
+
+        return context
+
+    def add(self, key, context, version=None):
+        '''Cache a session, replacing any older version of the same key.
+
+        Args:
+            key (hashable): The name to cache the session under.
+            context (<session.Session>): The session to cache.
+            version (hashable, optional): The version of the code that `context` describes.
+
+        '''
+        self._sessions.pop(key, None)
+        self._sessions[key] = (version, context)
+        self.trim()
+
+    def get_memory(self):
+        '''int: Estimate how many bytes every cached session uses, combined.'''
+        return sum(context.get_size() for _, context in self._sessions.values())
+
+    def clear(self):
+        '''Remove every cached session and reset the hit and miss counts.'''
+        self._sessions.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self):
+        '''dict[str, int]: Describe how full this cache is and how often it has been used.'''
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'sessions': len(self._sessions),
+            'size': self.size,
+            'memory': self.get_memory(),
+            'memory_limit': self.memory,
+        }
+
+    def __len__(self):
+        '''int: The number of cached sessions.'''
+        return len(self._sessions)
+
+
+class RestoreCache(object):
+
+    '''A least-recently-used record of the lines that each swap replaced.
+
+    Swapping a call re-renders it, which loses its comments, quoting and
+    spacing. If the same call is swapped back before anything else changes
+    it, the lines that it had before can simply be put back.
+
+    Each record is keyed by a buffer, the 0-based line where the swap's new
+    lines start and a hash of those new lines. A record is only used if the
+    buffer still has exactly those lines, in exactly that place.
+
+    '''
+
+    def __init__(self, size=None):
+        '''Create the cache.
+
+        Args:
+            size (int, optional):
+                The most swaps that may be remembered at once. If no size is
+                given, the user's preferred size is used.
+
+        '''
+        super(RestoreCache, self).__init__()
+        self._size = size
+        self._records = collections.OrderedDict()
+
+    @property
+    def size(self):
+        '''int: The most swaps that may be remembered at once.'''
+        if self._size is None:
+            return config.get_restore_size()
+
+        return self._size
+
+    def add(self, key, edit, original):
+        '''Remember the lines that a swap replaced.
+
+        Args:
+            key (hashable): The name of the buffer that was swapped, like a buffer number.
+            edit (<swapper.Edit>): The swap, which was just applied.
+            original (list[str]): The lines from `edit.start` to `edit.end`, before the swap.
+
+        '''
+        record = (key, edit.start, _get_hash('\n'.join(edit.lines)))
+        self._records.pop(record, None)
+        self._records[record] = (len(edit.lines), list(original))
+
+        while len(self._records) > self.size:
+            self._records.popitem(last=False)
+
+    def add_all(self, key, lines, edits):
+        '''Remember the lines that several swaps replaced.
+
+        Args:
+            key (hashable): The name of the buffer that was swapped, like a buffer number.
+            lines (sequence[str]): Every line of the buffer, before the swaps.
+            edits (iterable[<swapper.Edit>]):
+                The swaps, from the top of the buffer to the bottom. Each swap's
+                lines are found in `lines`, before any swap was applied.
+
+        '''
+        offset = 0
+
+        for edit in edits:
+            # Swaps above this one may have added or removed lines
+            self.add(key, swapper.Edit(edit.start + offset, edit.end + offset, edit.lines), lines[edit.start:edit.end])
+            offset += len(edit.lines) - (edit.end - edit.start)
+
+    def pop(self, key, lines, row):
+        '''Find the swap which puts back the lines that an earlier swap replaced.
+
+        Args:
+            key (hashable): The name of the buffer, like a buffer number.
+            lines (sequence[str]): Every line of the buffer. Only the lines of each candidate swap are read.
+            row (int): The 1-based row which the swapped lines must contain.
+
+        Returns:
+            <swapper.Edit> or NoneType:
+                The swap which restores the original lines, if the buffer
+                still has the lines of an earlier swap around `row`.
+
+        '''
+        for record in reversed(list(self._records.keys())):
+            record_key, start, digest = record
+            count, original = self._records[record]
+
+            if record_key != key or not start < row <= start + count:
+                continue
+
+            if _get_hash('\n'.join(lines[start:start + count])) != digest:
+                continue
+
+            del self._records[record]
+
+            return swapper.Edit(start, start + count, original)
+
+        return None
+
+    def clear(self):
+        '''Forget every swap.'''
+        self._records.clear()
+
+    def __len__(self):
+        '''int: The number of remembered swaps.'''
+        return len(self._records)
+
+
+def _get_hash(code):
+    '''str: Get a unique identifier for some code.'''
+    if not isinstance(code, bytes):
+        code = code.encode('utf-8')
+
+    return hashlib.sha1(code).hexdigest()
+
+
+def get_session(cache, code, key=None, version=None, scope='', backend='', indent=''):
+    '''Get a cached session for some code or create and cache a new session.
+
+    Args:
+        cache (`SessionCache`):
+            The cache to search in and add to.
+        code (str):
+            The Python code which the session must describe.
+        key (hashable, optional):
+            The name to cache the session under, such as a buffer number.
+            If no key is given, a hash of `code` is used.
+        version (hashable, optional):
+            The version of the code, such as `b:changedtick`.
+        scope (str, optional):
+            How much of `code` is parsed to find a call. See <session.Session>.
+        backend (str, optional):
+            What parses `code`, whenever its tokens aren't enough. See <session.Session>.
+        indent (str, optional):
+            The indentation of each argument of a multi-line call. See <session.Session>.
+
+    Returns:
+        <session.Session>:
+            The found or created session. A cached session which has other
+            preferences than the ones given is replaced.
+
+    '''
+    if key is None:
+        key = _get_hash(code)
+
+    scope = scope or config.get_parse_scope()
+    backend = backend or config.get_backend()
+    indent = indent or config.get_indent_preference()
+    context = cache.get(key, version=version)
+
+    if context is None or (context.scope, context.backend, context.indent) != (scope, backend, indent):
+        context = session.Session(code, scope=scope, backend=backend, indent=indent)
+        cache.add(key, context, version=version)
+
+    return context
+
+
+def _get_astroid_modules():
+    '''dict[str, <astroid.Module>]: Get astroid's module cache, if astroid has been imported.'''
+    # astroid is only imported by the "astroid" backend. There's nothing to
+    # manage if it was never imported so don't import it just to check
+    #
+    astroid = sys.modules.get('astroid')
+    manager = getattr(astroid, 'MANAGER', None)
+
+    if manager is None:
+        return dict()
+
+    return manager.astroid_cache
+
+
+def _is_removable(name):
+    '''bool: Check if a module may be removed from astroid's module cache.
+
+    Built-in modules, like `builtins`, are built once when astroid needs them
+    and every inferred constant refers to them, so they are always kept.
+
+    '''
+    return name not in sys.builtin_module_names
+
+
+def get_astroid_module_count():
+    '''int: Count the modules in astroid's module cache.'''
+    return len(_get_astroid_modules())
+
+
+def trim_astroid_cache(size=None):
+    '''Remove modules from astroid's module cache until it is within a limit.
+
+    Modules without a name, which is what astroid names parsed code, are always
+    removed. After that, the oldest modules are removed first.
+
+    Args:
+        size (int, optional):
+            The most modules to keep, not counting built-in modules.
+            If no size is given, the user's preferred size is used.
+
+    Returns:
+        int: How many modules were removed.
+
+    '''
+    if size is None:
+        size = config.get_astroid_cache_size()
+
+    modules = _get_astroid_modules()
+    # Iterate over the keys directly so that astroid doesn't build its builtins module
+    names = [name for name in list(modules.keys()) if _is_removable(name)]
+    removed = [name for name in names if not name]
+    names = [name for name in names if name]
+    removed.extend(names[:max(len(names) - size, 0)])
+
+    for name in removed:
+        modules.pop(name, None)
+
+    return len(removed)
+
+
+def clear_astroid_cache():
+    '''int: Remove every module, except built-in modules, from astroid's module cache.'''
+    return trim_astroid_cache(size=0)
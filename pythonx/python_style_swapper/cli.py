@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Give every call in some files or directories its preferred style, without Vim.
+
+Files are formatted in parallel, by a pool of processes.
+
+Example:
+    >>> python -m python_style_swapper --workers 8 --line-length 99 path/to/package
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+from __future__ import print_function
+
+import contextlib
+import functools
+import argparse
+import time
+import sys
+import io
+import os
+
+try:
+    from concurrent import futures
+except ImportError:
+    # Python 2 needs the "futures" package. Without it, files are formatted one at a time
+    futures = None
+
+# IMPORT LOCAL LIBRARIES
+from . import formatter
+from . import config
+
+
+_EXTENSION = '.py'
+
+
+def iter_files(paths):
+    '''Find every Python file in some files and directories.
+
+    Hidden directories, like ".git", are skipped.
+
+    Args:
+        paths (iter[str]): The files and directories to search.
+
+    Yields:
+        str: The path to each found Python file.
+
+    '''
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+
+            continue
+
+        for root, directories, files in os.walk(path):
+            directories[:] = sorted(name for name in directories if not name.startswith('.'))
+
+            for name in sorted(files):
+                if name.endswith(_EXTENSION):
+                    yield os.path.join(root, name)
+
+
+@contextlib.contextmanager
+def use_preferences(indent=None, backend=None):
+    '''Use some preferences until this context closes. Preferences which are None aren't changed.
+
+    Args:
+        indent (str, optional): The indentation that is used for multi-line calls.
+        backend (str, optional): What parses code, whenever its tokens aren't enough.
+
+    '''
+    previous_indent = config.get_indent_preference()
+    previous_backend = config.get_backend()
+
+    if indent is not None:
+        config.register_indent_preference(indent)
+
+    if backend is not None:
+        config.register_backend(backend)
+
+    try:
+        yield
+    finally:
+        config.register_indent_preference(previous_indent)
+        config.register_backend(previous_backend)
+
+
+def format_file(path, length=None, indent=None, backend=None, check=False):
+    '''Give every call in a file its preferred style.
+
+    The preferences are given as arguments, rather than read from <config>,
+    because this function runs in processes which may not share the
+    preferences of the process which started them.
+
+    Args:
+        path (str): The Python file to change.
+        length (int, optional): The longest that a line may be before its call is expanded.
+        indent (str, optional): The indentation that is used for multi-line calls.
+        backend (str, optional): What parses code, whenever its tokens aren't enough.
+        check (bool, optional): If True, find the changes but don't write them.
+
+    Returns:
+        tuple[str, int, str]:
+            `path`, the number of calls that were (or would be) changed and
+            an error message, which is empty if `path` was formatted.
+
+    '''
+    try:
+        with io.open(path, 'r', encoding='utf-8', newline='') as handler:
+            code = handler.read()
+    except (IOError, OSError, UnicodeDecodeError) as error:
+        return (path, 0, str(error))
+
+    newline = '\r\n' if '\r\n' in code else '\n'
+
+    try:
+        with use_preferences(indent=indent, backend=backend):
+            output, changes = formatter.format_code(code.replace('\r\n', '\n'), length=length)
+    except Exception as error:  # pylint: disable=broad-except
+        # One file that can't be parsed shouldn't stop every other file from being formatted
+        return (path, 0, '{name}: {error}'.format(name=error.__class__.__name__, error=error))
+
+    if not changes:
+        return (path, 0, '')
+
+    try:
+        # Never write a file which some swap broke. `dont_inherit` keeps
+        # this module's `__future__` imports out of the compiled code
+        #
+        compile(output, path, 'exec', dont_inherit=True)
+    except (SyntaxError, ValueError) as error:
+        return (path, 0, 'The formatted code does not compile. {name}: {error}'.format(
+            name=error.__class__.__name__, error=error))
+
+    if not check:
+        with io.open(path, 'w', encoding='utf-8', newline='') as handler:
+            handler.write(output.replace('\n', newline))
+
+    return (path, changes, '')
+
+
+def map_files(function, paths, workers, chunk_size):
+    '''Run a function on every path, using a pool of processes if there's more than one worker.
+
+    Args:
+        function (callable[str]): The function to run. It must be picklable, so that other processes can run it.
+        paths (iter[str]): The files to run `function` on.
+        workers (int): How many processes run `function` at once.
+        chunk_size (int): How many paths are sent to a process at once.
+
+    Yields:
+        object: What `function` returned for each path, in the same order as `paths`.
+
+    '''
+    if workers == 1 or futures is None:
+        for path in paths:
+            yield function(path)
+
+        return
+
+    with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(function, paths, chunksize=chunk_size):
+            yield result
+
+
+def _make_parser():
+    '''<argparse.ArgumentParser>: Describe every command-line option.'''
+    parser = argparse.ArgumentParser(
+        prog='python -m python_style_swapper',
+        description='Expand calls which are too long and collapse multi-line calls which fit on one line.',
+    )
+    parser.add_argument('paths', nargs='+', help='The Python files or directories to format.')
+    parser.add_argument(
+        '-l', '--line-length', type=int, default=config.get_line_length(),
+        help='The longest that a line may be before its call is expanded.')
+    parser.add_argument(
+        '-i', '--indent', default=config.get_indent_preference(),
+        help='The indentation that is used for multi-line calls.')
+    parser.add_argument(
+        '-b', '--backend', choices=(config.ASTROID_BACKEND, config.AST_BACKEND), default=config.AST_BACKEND,
+        help='What parses code, whenever its tokens aren\'t enough.')
+    parser.add_argument(
+        '-w', '--workers', type=int, default=(os.cpu_count() or 1) if hasattr(os, 'cpu_count') else 1,
+        help='How many processes format files at once.')
+    parser.add_argument(
+        '-c', '--chunk-size', type=int, default=16,
+        help='How many files are sent to a process at once.')
+    parser.add_argument(
+        '--check', action='store_true',
+        help='Report which files would change, without changing them.')
+
+    return parser
+
+
+def main(arguments=None):
+    '''Format the files and directories given on the command-line.
+
+    Args:
+        arguments (list[str], optional): The command-line arguments. If none are given, `sys.argv` is used.
+
+    Returns:
+        int:
+            1 if any file couldn't be formatted or, with "--check", if any
+            file would change. Otherwise, 0.
+
+    '''
+    options = _make_parser().parse_args(arguments)
+    function = functools.partial(
+        format_file,
+        length=options.line_length,
+        indent=options.indent,
+        backend=options.backend,
+        check=options.check,
+    )
+
+    started = time.time()
+    files = 0
+    changed = 0
+    failed = 0
+
+    paths = iter_files(options.paths)
+
+    for path, changes, error in map_files(function, paths, max(options.workers, 1), options.chunk_size):
+        files += 1
+
+        if error:
+            failed += 1
+            print('{path}: {error}'.format(path=path, error=error), file=sys.stderr)
+        elif changes:
+            changed += 1
+            print('{path}: {changes} calls'.format(path=path, changes=changes))
+
+    seconds = time.time() - started
+    print(
+        '{files} files, {changed} changed, {failed} failed in {seconds:.2f} seconds '
+        '({rate:.1f} files/sec)'.format(
+            files=files,
+            changed=changed,
+            failed=failed,
+            seconds=seconds,
+            rate=files / seconds if seconds else 0.0,
+        ),
+        file=sys.stderr,
+    )
+
+    return int(bool(failed or (options.check and changed)))
@@ -3,8 +3,25 @@
 
 '''A simple module to store the user's style preferences.'''
 
+# IMPORT STANDARD LIBRARIES
+import tempfile
+import os
+
+
+STATEMENT_SCOPE = 'statement'
+MODULE_SCOPE = 'module'
+ASTROID_BACKEND = 'astroid'
+AST_BACKEND = 'ast'
 
 INDENT_PREFERENCE = {'indent': '    '}
+LINE_LENGTH_PREFERENCE = {'length': 79}
+PARSE_SCOPE_PREFERENCE = {'scope': STATEMENT_SCOPE}
+BACKEND_PREFERENCE = {'backend': ASTROID_BACKEND}
+PRECOMPUTE_PREFERENCE = {'lines': 20000}
+RESTORE_PREFERENCE = {'size': 64}
+TIMING_PREFERENCE = {'enabled': False, 'history': 20}
+PROFILE_PREFERENCE = {'directory': os.path.join(tempfile.gettempdir(), 'python_style_swapper'), 'top': 25}
+CACHE_PREFERENCE = {'size': 16, 'memory': 64 * 1024 * 1024, 'astroid_modules': 32}
 
 
 def get_indent_preference():
@@ -15,3 +32,162 @@ def get_indent_preference():
 def register_indent_preference(text):
     '''Set indentation that will be used for multi-line function calls.'''
     INDENT_PREFERENCE['indent'] = text
+
+
+def get_line_length():
+    '''int: The longest that a line may be before its call is written across multiple lines. Default: 79.'''
+    return LINE_LENGTH_PREFERENCE['length']
+
+
+def register_line_length(length):
+    '''Set the longest that a line may be before its call is written across multiple lines.'''
+    LINE_LENGTH_PREFERENCE['length'] = int(length)
+
+
+def get_parse_scope():
+    '''str: How much code is parsed to find a call. Default: "statement".
+
+    "statement" only parses the logical statement around the user's cursor.
+    "module" parses the entire file.
+
+    '''
+    return PARSE_SCOPE_PREFERENCE['scope']
+
+
+def register_parse_scope(scope):
+    '''Set how much code will be parsed to find a call.
+
+    Args:
+        scope (str): Either "statement" or "module".
+
+    Raises:
+        ValueError: If `scope` is not a recognized option.
+
+    '''
+    if scope not in (STATEMENT_SCOPE, MODULE_SCOPE):
+        raise ValueError('Scope "{scope}" must be "{statement}" or "{module}".'.format(
+            scope=scope, statement=STATEMENT_SCOPE, module=MODULE_SCOPE))
+
+    PARSE_SCOPE_PREFERENCE['scope'] = scope
+
+
+def get_backend():
+    '''str: What parses code, whenever its tokens aren't enough. Default: "astroid".
+
+    "astroid" parses with astroid and re-prints calls from the parsed tree.
+    "ast" parses with the standard library's `ast` module, which is faster,
+    and re-prints calls using slices of the original code.
+
+    '''
+    return BACKEND_PREFERENCE['backend']
+
+
+def register_backend(backend):
+    '''Set what will parse code, whenever its tokens aren't enough.
+
+    Args:
+        backend (str): Either "astroid" or "ast".
+
+    Raises:
+        ValueError: If `backend` is not a recognized option.
+
+    '''
+    if backend not in (ASTROID_BACKEND, AST_BACKEND):
+        raise ValueError('Backend "{backend}" must be "{astroid}" or "{ast}".'.format(
+            backend=backend, astroid=ASTROID_BACKEND, ast=AST_BACKEND))
+
+    BACKEND_PREFERENCE['backend'] = backend
+
+
+def get_cache_size():
+    '''int: The most parsed buffers that may be cached at once. Default: 16.'''
+    return CACHE_PREFERENCE['size']
+
+
+def register_cache_size(size):
+    '''Set the most parsed buffers that may be cached at once.'''
+    CACHE_PREFERENCE['size'] = int(size)
+
+
+def get_cache_memory():
+    '''int: The most bytes that every cached, parsed buffer may use, combined. Default: 64 MiB.'''
+    return CACHE_PREFERENCE['memory']
+
+
+def register_cache_memory(memory):
+    '''Set the most bytes that every cached, parsed buffer may use, combined.'''
+    CACHE_PREFERENCE['memory'] = int(memory)
+
+
+def get_astroid_cache_size():
+    '''int: The most modules that astroid may keep in its own cache. Default: 32.
+
+    Built-in modules, which astroid needs for inference, aren't counted.
+
+    '''
+    return CACHE_PREFERENCE['astroid_modules']
+
+
+def register_astroid_cache_size(size):
+    '''Set the most modules that astroid may keep in its own cache.'''
+    CACHE_PREFERENCE['astroid_modules'] = int(size)
+
+
+def get_precompute_lines():
+    '''int: The most lines that a buffer may have for its swaps to be found ahead of time. Default: 20000.'''
+    return PRECOMPUTE_PREFERENCE['lines']
+
+
+def register_precompute_lines(lines):
+    '''Set the most lines that a buffer may have for its swaps to be found ahead of time.'''
+    PRECOMPUTE_PREFERENCE['lines'] = int(lines)
+
+
+def get_restore_size():
+    '''int: The most swaps whose original lines are remembered, so they can be swapped back exactly. Default: 64.'''
+    return RESTORE_PREFERENCE['size']
+
+
+def register_restore_size(size):
+    '''Set the most swaps whose original lines are remembered, so they can be swapped back exactly.'''
+    RESTORE_PREFERENCE['size'] = int(size)
+
+
+def is_timing_enabled():
+    '''bool: Check if the time of each phase of a swap should be recorded. Default: False.'''
+    return TIMING_PREFERENCE['enabled']
+
+
+def register_timing_enabled(enabled):
+    '''Set whether the time of each phase of a swap should be recorded.'''
+    TIMING_PREFERENCE['enabled'] = bool(int(enabled))
+
+
+def get_timing_history():
+    '''int: The most swaps whose times are kept. Default: 20.'''
+    return TIMING_PREFERENCE['history']
+
+
+def register_timing_history(size):
+    '''Set the most swaps whose times are kept.'''
+    TIMING_PREFERENCE['history'] = int(size)
+
+
+def get_profile_directory():
+    '''str: The folder which profiled swaps are written to. Default: "python_style_swapper", in the temporary folder.'''
+    return PROFILE_PREFERENCE['directory']
+
+
+def register_profile_directory(directory):
+    '''Set the folder which profiled swaps are written to.'''
+    PROFILE_PREFERENCE['directory'] = os.path.expanduser(directory)
+
+
+def get_profile_top():
+    '''int: How many of the slowest functions and largest allocations a profiled swap describes. Default: 25.'''
+    return PROFILE_PREFERENCE['top']
+
+
+def register_profile_top(top):
+    '''Set how many of the slowest functions and largest allocations a profiled swap describes.'''
+    PROFILE_PREFERENCE['top'] = int(top)
@@ -0,0 +1,511 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Swap calls for editors from a long-lived process, over newline-delimited JSON-RPC.
+
+Every Vim instance which swaps calls itself has to import astroid, build its
+builtins module and parse its buffers on Vim's own thread. This module runs
+that work in a separate process instead, which imports everything once and
+keeps the parsed buffers of every editor that talks to it.
+
+Each request and response is one line of JSON-RPC 2.0. By default, requests
+are read from stdin and responses are written to stdout, so an editor can
+start the process with `job_start` / `jobstart`. With "--port", the process
+listens on a local TCP port instead, so that several editors can share it.
+
+Methods:
+    initialize(indent=None, backend=None, scope=None):
+        Set the preferences of every later swap which is requested over the
+        same connection. Other connections, and the process's own defaults,
+        aren't changed.
+    toggle(buffer, version, row, lines=None):
+        Swap the call which contains `row`.
+    toggle_range(buffer, version, first, last, lines=None):
+        Swap the call of every statement between `first` and `last`.
+    applied(buffer, version):
+        A notification which says that the editor applied the last response's
+        edits, so they don't need to be sent again.
+    close(buffer):
+        Forget everything about a buffer.
+    stats():
+        Describe the process's caches.
+    shutdown():
+        Stop the process once the response is sent.
+
+`buffer` is any name which is unique to a buffer across every editor and
+`version` is anything which changes whenever the buffer changes, like
+`b:changedtick`. `lines` only need to be sent if the process doesn't have
+that version of the buffer yet. Otherwise, <STALE_BUFFER> is returned.
+
+Example:
+    >>> python -m python_style_swapper.daemon
+    >>> {"jsonrpc": "2.0", "id": 1, "method": "toggle", "params": {"buffer": "1", "version": 3, "row": 1, "lines": ["foo(bar)"]}}
+    {"jsonrpc": "2.0", "id": 1, "result": {"edits": [{"start": 0, "end": 1, "lines": ["foo(", "    bar,", ")"]}], "row": 1}}
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+import threading
+import argparse
+import json
+import sys
+
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver  # Python 2
+
+# IMPORT LOCAL LIBRARIES
+from . import swapper
+from . import config
+from . import cache
+
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SWAP_ERROR = -32000
+STALE_BUFFER = -32001
+
+try:
+    _STRING_TYPES = (basestring, )  # pylint: disable=undefined-variable
+except NameError:
+    _STRING_TYPES = (str, )  # Python 3
+
+
+class RequestError(Exception):
+
+    '''An exception which is sent back to the editor as a JSON-RPC error.'''
+
+    def __init__(self, code, message):
+        '''Create the instance.
+
+        Args:
+            code (int): The JSON-RPC error code. e.g. <STALE_BUFFER>.
+            message (str): A description of what went wrong.
+
+        '''
+        super(RequestError, self).__init__(message)
+        self.code = code
+
+
+class _Buffer(object):
+
+    '''The last known lines of some editor's buffer.
+
+    Attributes:
+        version (hashable): The version of the buffer that `lines` describe.
+        lines (list[str]): Every line of the buffer.
+        edits (list[<swapper.Edit>]): The edits that were last sent to the editor, but not applied yet.
+
+    '''
+
+    def __init__(self, version, lines):
+        '''Create the instance.
+
+        Args:
+            version (hashable): The version of the buffer that `lines` describe.
+            lines (list[str]): Every line of the buffer.
+
+        '''
+        super(_Buffer, self).__init__()
+        self.version = version
+        self.lines = lines
+        self.edits = []
+
+
+class Server(object):
+
+    '''Answer requests to swap calls, keeping every buffer's parsed code between requests.'''
+
+    def __init__(self):
+        '''Create the instance.'''
+        super(Server, self).__init__()
+        self.running = True
+
+        self._buffers = dict()
+        self._sessions = cache.SessionCache()
+        self._restores = cache.RestoreCache()
+        self._lock = threading.Lock()
+        self._methods = {
+            'applied': self.applied,
+            'close': self.close,
+            'initialize': self.initialize,
+            'shutdown': self.shutdown,
+            'stats': self.stats,
+            'toggle': self.toggle,
+            'toggle_range': self.toggle_range,
+        }
+        # These methods are also given the preferences of the connection that called them
+        self._connection_methods = frozenset(('initialize', 'toggle', 'toggle_range'))
+        self._preferences = dict()
+
+    @staticmethod
+    def warm():
+        '''Import and build everything that the user's backend needs, before the first request.'''
+        if config.get_backend() != config.ASTROID_BACKEND:
+            return
+
+        # This module imports astroid
+        from .trimmer import builder
+
+        builder.parse('foo(bar)')
+
+    def _get_buffer(self, name, version, lines=None):
+        '''Get the lines of some buffer.
+
+        Args:
+            name (str): The name of the buffer.
+            version (hashable): The version that the buffer must have.
+            lines (list[str], optional): The lines of the buffer, if the editor sent them.
+
+        Raises:
+            RequestError: If no lines were sent and this instance doesn't have `version` of the buffer.
+
+        Returns:
+            `_Buffer`: The buffer.
+
+        '''
+        if lines is not None:
+            buffer_ = _Buffer(version, list(lines))
+            self._buffers[name] = buffer_
+
+            return buffer_
+
+        buffer_ = self._buffers.get(name)
+
+        if buffer_ is None or buffer_.version != version:
+            raise RequestError(STALE_BUFFER, 'Buffer "{name}" must be sent again.'.format(name=name))
+
+        return buffer_
+
+    def _get_session(self, name, buffer_, preferences):
+        '''<session.Session>: Get the parsed code of a buffer, re-using a cached parse if possible.'''
+        return cache.get_session(
+            self._sessions,
+            '\n'.join(buffer_.lines),
+            key=name,
+            version=buffer_.version,
+            **preferences
+        )
+
+    @staticmethod
+    def _serialize(edits):
+        '''list[dict[str, object]]: Convert some edits into JSON-compatible objects.'''
+        return [{'start': edit.start, 'end': edit.end, 'lines': edit.lines} for edit in edits]
+
+    @staticmethod
+    def initialize(preferences, indent=None, backend=None, scope=None):
+        '''Set the preferences of every later swap of one connection. Preferences which are None aren't changed.
+
+        Args:
+            preferences (dict[str, str]): The connection's preferences, which are changed in-place.
+            indent (str, optional): The indentation of each argument of a multi-line call.
+            backend (str, optional): What parses code, whenever its tokens aren't enough.
+            scope (str, optional): How much code is parsed to find a call.
+
+        Raises:
+            RequestError: If `backend` or `scope` isn't a recognized option.
+
+        Returns:
+            dict[str, str]: Every preference of the connection, after the change.
+
+        '''
+        if backend not in (None, config.ASTROID_BACKEND, config.AST_BACKEND):
+            raise RequestError(INVALID_PARAMS, 'Backend "{backend}" is not recognized.'.format(backend=backend))
+
+        if scope not in (None, config.STATEMENT_SCOPE, config.MODULE_SCOPE):
+            raise RequestError(INVALID_PARAMS, 'Scope "{scope}" is not recognized.'.format(scope=scope))
+
+        for name, value in (('indent', indent), ('backend', backend), ('scope', scope)):
+            if value is not None:
+                preferences[name] = value
+
+        return {
+            'indent': preferences.get('indent') or config.get_indent_preference(),
+            'backend': preferences.get('backend') or config.get_backend(),
+            'scope': preferences.get('scope') or config.get_parse_scope(),
+        }
+
+    def toggle(self, preferences, buffer, version, row, lines=None):
+        '''Swap the call which contains some row of a buffer.
+
+        Args:
+            preferences (dict[str, str]): The preferences of the connection which asked for the swap.
+            buffer (str): The name of the buffer.
+            version (hashable): The version of the buffer.
+            row (int): The 1-based row which the call must contain.
+            lines (list[str], optional): The lines of the buffer, if they changed.
+
+        Returns:
+            dict[str, object]:
+                The edits to apply to the buffer and the 1-based row which the
+                call starts on. If no call was found, there are no edits and
+                the row is null.
+
+        '''
+        buffer_ = self._get_buffer(buffer, version, lines=lines)
+
+        # If the call was just swapped, put back exactly what it was, without parsing
+        edit = self._restores.pop(buffer, buffer_.lines, row)
+
+        if edit:
+            buffer_.edits = [edit]
+
+            return {'edits': self._serialize(buffer_.edits), 'row': edit.start + 1}
+
+        edit, call = swapper.get_edit(self._get_session(buffer, buffer_, preferences), row)
+        self._sessions.trim()
+        buffer_.edits = [edit] if edit else []
+
+        return {
+            'edits': self._serialize(buffer_.edits),
+            'row': call.fromlineno if call else None,
+        }
+
+    def toggle_range(self, preferences, buffer, version, first, last, lines=None):
+        '''Swap the call of every statement between two rows of a buffer.
+
+        Args:
+            preferences (dict[str, str]): The preferences of the connection which asked for the swap.
+            buffer (str): The name of the buffer.
+            version (hashable): The version of the buffer.
+            first (int): The 1-based row to start changing calls from.
+            last (int): The 1-based row to stop changing calls at, inclusive.
+            lines (list[str], optional): The lines of the buffer, if they changed.
+
+        Returns:
+            dict[str, object]: The edits to apply to the buffer, from top to bottom.
+
+        '''
+        buffer_ = self._get_buffer(buffer, version, lines=lines)
+        edits = swapper.get_range_edits(self._get_session(buffer, buffer_, preferences), first, last)
+        self._sessions.trim()
+        buffer_.edits = [edit for edit, _ in edits]
+
+        return {'edits': self._serialize(buffer_.edits)}
+
+    def applied(self, buffer, version):
+        '''Apply the last edits of a buffer to this instance's copy, so its lines don't need to be sent again.
+
+        Args:
+            buffer (str): The name of the buffer.
+            version (hashable): The version of the buffer, after the edits were applied.
+
+        '''
+        buffer_ = self._buffers.get(buffer)
+
+        if buffer_ is None:
+            return
+
+        self._restores.add_all(buffer, buffer_.lines, buffer_.edits)
+        buffer_.lines = swapper.apply_edits(buffer_.lines, buffer_.edits)
+        buffer_.version = version
+        buffer_.edits = []
+
+    def close(self, buffer):
+        '''Forget the lines of some buffer.'''
+        self._buffers.pop(buffer, None)
+
+    def stats(self):
+        '''dict[str, int]: Describe how full this instance's caches are.'''
+        stats = self._sessions.get_stats()
+        stats['buffers'] = len(self._buffers)
+        stats['restores'] = len(self._restores)
+        stats['astroid_modules'] = cache.get_astroid_module_count()
+
+        return stats
+
+    def shutdown(self):
+        '''Stop answering requests.'''
+        self.running = False
+
+    def _call(self, message, preferences):
+        '''Run the method that a request asks for.
+
+        Args:
+            message (dict[str, object]): The JSON-RPC request.
+            preferences (dict[str, str]): The preferences of the connection which sent `message`.
+
+        Raises:
+            RequestError: If the request is invalid or the method fails.
+
+        Returns:
+            object: The result of the method.
+
+        '''
+        if not isinstance(message, dict) or not isinstance(message.get('method'), _STRING_TYPES):
+            raise RequestError(INVALID_REQUEST, 'A request must be an object with a "method".')
+
+        try:
+            method = self._methods[message['method']]
+        except KeyError:
+            raise RequestError(METHOD_NOT_FOUND, 'Method "{name}" does not exist.'.format(name=message['method']))
+
+        params = message.get('params') or dict()
+
+        if not isinstance(params, dict):
+            raise RequestError(INVALID_PARAMS, 'Params must be an object.')
+
+        arguments = (preferences, ) if message['method'] in self._connection_methods else ()
+
+        try:
+            with self._lock:
+                return method(*arguments, **params)
+        except TypeError as error:
+            raise RequestError(INVALID_PARAMS, str(error))
+        except RequestError:
+            raise
+        except Exception as error:  # pylint: disable=broad-except
+            # A buffer that can't be swapped shouldn't stop the process
+            raise RequestError(SWAP_ERROR, '{name}: {error}'.format(name=error.__class__.__name__, error=error))
+
+    def handle(self, line, preferences=None):
+        '''Answer one line of JSON-RPC.
+
+        Args:
+            line (str):
+                The JSON-encoded request.
+            preferences (dict[str, str], optional):
+                The preferences of the connection which sent `line`. The
+                "initialize" method changes it. If no preferences are given,
+                every request without them shares one set of preferences.
+
+        Returns:
+            str or NoneType: The JSON-encoded response. Notifications, which have no "id", get no response.
+
+        '''
+        try:
+            message = json.loads(line)
+        except ValueError as error:
+            return json.dumps({'jsonrpc': '2.0', 'id': None, 'error': {'code': PARSE_ERROR, 'message': str(error)}})
+
+        identifier = message.get('id') if isinstance(message, dict) else None
+
+        try:
+            result = self._call(message, self._preferences if preferences is None else preferences)
+        except RequestError as error:
+            response = {'jsonrpc': '2.0', 'id': identifier, 'error': {'code': error.code, 'message': str(error)}}
+        else:
+            response = {'jsonrpc': '2.0', 'id': identifier, 'result': result}
+
+        if identifier is None and 'error' not in response:
+            return None
+
+        return json.dumps(response)
+
+
+def serve(server, input_, output):
+    '''Answer every request from a stream until it closes or `server` is shut down.
+
+    Every stream is one connection, which has preferences of its own.
+
+    Args:
+        server (`Server`): The object which answers each request.
+        input_ (file-like): The stream to read newline-delimited requests from.
+        output (file-like): The stream to write newline-delimited responses to.
+
+    '''
+    preferences = dict()
+
+    for line in iter(input_.readline, ''):
+        if not line.strip():
+            continue
+
+        response = server.handle(line, preferences=preferences)
+
+        if response is not None:
+            output.write(response + '\n')
+            output.flush()
+
+        if not server.running:
+            return
+
+
+class _TextStream(object):
+
+    '''Read lines of text from a binary socket stream.'''
+
+    def __init__(self, stream):
+        '''Keep the binary stream to read from.'''
+        super(_TextStream, self).__init__()
+        self._stream = stream
+
+    def readline(self):
+        '''str: Read the next line, as text.'''
+        return self._stream.readline().decode('utf-8')
+
+
+class _TextWriter(object):
+
+    '''Write text into a binary socket stream.'''
+
+    def __init__(self, stream):
+        '''Keep the binary stream to write to.'''
+        super(_TextWriter, self).__init__()
+        self._stream = stream
+
+    def write(self, text):
+        '''Write some text as UTF-8.'''
+        if not isinstance(text, bytes):
+            text = text.encode('utf-8')
+
+        self._stream.write(text)
+
+    def flush(self):
+        '''Send everything that was written.'''
+        self._stream.flush()
+
+
+def serve_tcp(server, host, port):
+    '''Answer requests from every editor which connects to a local TCP port.
+
+    Args:
+        server (`Server`): The object which answers each request.
+        host (str): The address to listen on. e.g. "127.0.0.1".
+        port (int): The port to listen on.
+
+    '''
+    class _Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            input_ = self.rfile if sys.version_info[0] < 3 else _TextStream(self.rfile)
+            output = _TextWriter(self.wfile)
+            serve(server, input_, output)
+
+            if not server.running:
+                threading.Thread(target=listener.shutdown).start()
+
+    listener = socketserver.ThreadingTCPServer((host, port), _Handler)
+    listener.daemon_threads = True
+
+    try:
+        listener.serve_forever()
+    finally:
+        listener.server_close()
+
+
+def main(arguments=None):
+    '''Answer requests until stdin closes, the process is shut down or, with "--port", forever.'''
+    parser = argparse.ArgumentParser(prog='python -m python_style_swapper.daemon', description=__doc__.split('\n')[0])
+    parser.add_argument('--port', type=int, help='Listen on this local TCP port instead of stdin / stdout.')
+    parser.add_argument('--host', default='127.0.0.1', help='The address to listen on, with "--port".')
+    parser.add_argument(
+        '-b', '--backend', choices=(config.ASTROID_BACKEND, config.AST_BACKEND),
+        help='What parses code, whenever its tokens aren\'t enough.')
+    options = parser.parse_args(arguments)
+
+    if options.backend:
+        config.register_backend(options.backend)
+
+    server = Server()
+    server.warm()
+
+    if options.port is not None:
+        serve_tcp(server, options.host, options.port)
+    else:
+        serve(server, sys.stdin, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
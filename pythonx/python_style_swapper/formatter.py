@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Apply one call style to every statement of some code, without Vim.
+
+Calls whose line is longer than the preferred line length are written
+across multiple lines. Multi-line calls which fit within the preferred
+line length are written on a single line, unless they have comments which
+would be lost. Every other call is left alone.
+
+Only the outer-most call which starts each logical statement is changed.
+e.g. In `value = foo(bar(1), 2)`, `foo` may be changed but `bar` won't be.
+When a line is too long, the call which is expanded is the outer-most call
+that contains the first character past the preferred line length, as long
+as that call isn't inside of some other bracket. A change which would still
+leave a line that is too long is never made.
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+import tokenize
+
+# IMPORT LOCAL LIBRARIES
+from .trimmer import statement
+from .trimmer import locator
+from .trimmer import session
+from . import swapper
+from . import config
+
+
+_OPENING_BRACKETS = frozenset('([{')
+_CLOSING_BRACKETS = frozenset(')]}')
+
+
+def _fits(lines, length):
+    '''bool: Check if every line in `lines` is no longer than `length`.'''
+    return all(len(line) <= length for line in lines)
+
+
+def _is_bracketed(context, call):
+    '''bool: Check if `call`, which was found in `context`, is inside of a bracket of its statement.'''
+    if isinstance(call, locator.CallSpan):
+        start = call.start
+    else:
+        start = (call.fromlineno, call.col_offset)
+
+    depth = 0
+
+    try:
+        for type_, text, position, _, _ in statement.generate_tokens(context.lines, start[0], start[0]):
+            if position >= start:
+                break
+
+            if type_ == tokenize.OP and text in _OPENING_BRACKETS:
+                depth += 1
+            elif type_ == tokenize.OP and text in _CLOSING_BRACKETS:
+                depth -= 1
+    except (tokenize.TokenError, SyntaxError):
+        # The row may end in the middle of the statement, after `call`
+        pass
+
+    return depth > 0
+
+
+def get_edit(context, call, row, length=None):
+    '''Find the change which gives a call its preferred style.
+
+    Args:
+        context (<session.Session>):
+            The code to change.
+        call (<locator.CallSpan> or <astroid.Call>):
+            A call which was found in `context`.
+        row (int):
+            The 1-based row where `call` starts.
+        length (int, optional):
+            The longest that a line may be before its call is written across
+            multiple lines. If no length is given, the user's preferred
+            length is used.
+
+    Returns:
+        <swapper.Edit> or NoneType: The change, if the call's style should change.
+
+    '''
+    if length is None:
+        length = config.get_line_length()
+
+    if not _fits([context.lines[row - 1]], length):
+        # Expanding any other call, like one that ends before the line gets
+        # too long or one inside of a list, would leave a partly-expanded
+        # statement behind
+        #
+        call = swapper.get_call(context, row, column=length)
+
+        if not call or call.fromlineno != row or not swapper.is_single_line(context, call):
+            return None
+
+        if _is_bracketed(context, call):
+            return None
+
+        edit = swapper.get_multi_line_edit(context, call, row, column=length)
+    elif swapper.is_single_line(context, call) or swapper.has_comments(context, call):
+        return None
+    else:
+        edit = swapper.get_single_line_edit(context, call, row)
+
+    if not edit or not _fits(edit.lines, length):
+        return None
+
+    return edit
+
+
+def format_code(code, length=None):
+    '''Give every call in some code its preferred style.
+
+    The code is parsed once and every change is applied at the end.
+
+    Args:
+        code (str):
+            The Python code to change.
+        length (int, optional):
+            The longest that a line may be before its call is written across
+            multiple lines. If no length is given, the user's preferred
+            length is used.
+
+    Returns:
+        tuple[str, int]: The changed code and the number of calls that were changed.
+
+    '''
+    context = session.Session(code)
+    edits = swapper.get_range_edits(
+        context,
+        1,
+        len(context.lines),
+        function=lambda context, call, row: get_edit(context, call, row, length=length),
+    )
+
+    if not edits:
+        return (code, 0)
+
+    return ('\n'.join(swapper.apply_edits(context.lines, [edit for edit, _ in edits])), len(edits))
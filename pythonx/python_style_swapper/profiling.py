@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Profile the time and memory of a few swaps, so a slow swap can be reported with hard numbers.
+
+Profiling is off until <arm> is called. Then the next swaps which run in
+<profiled> are run under `cProfile` and, if it exists, `tracemalloc`. Each
+profiled swap writes 2 files to the user's profile directory:
+
+    <name>.pstats: The `cProfile` stats, which `pstats` and `snakeviz` can read.
+    <name>.txt: The slowest functions, the time spent in astroid's
+                TreeRebuilder, TransformVisitor and AsStringVisitor and the
+                lines which allocated the most memory.
+
+Example:
+    >>> python -m python_style_swapper.profiling path/to/file.py 120 --function make_multi_line
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+from __future__ import print_function
+
+import collections
+import contextlib
+import argparse
+import cProfile
+import pstats
+import time
+import sys
+import re
+import io
+import os
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+# IMPORT LOCAL LIBRARIES
+from . import swapper
+from . import config
+
+
+# The astroid classes which build, transform and re-print trees and the
+# module of each. `pstats` only knows the file of each function, not its class
+ASTROID_FUNCTIONS = collections.OrderedDict((
+    ('TreeRebuilder', 'rebuilder.py'),
+    ('TransformVisitor', 'transforms.py'),
+    ('AsStringVisitor', 'as_string.py'),
+))
+_FUNCTIONS = {
+    'make_multi_line': swapper.make_multi_line,
+    'make_single_line': swapper.make_single_line,
+    'toggle': lambda code, row: swapper.toggle(code, row)[0],
+}
+_STATE = {'remaining': 0}
+
+
+def arm(count=1):
+    '''Profile the next `count` swaps which run in <profiled>.'''
+    _STATE['remaining'] = max(int(count), 0)
+
+
+def get_remaining():
+    '''int: Get how many more swaps will be profiled.'''
+    return _STATE['remaining']
+
+
+def _get_stats_text(profile, top):
+    '''str: Describe the slowest functions of a profile and the time spent in astroid's visitors.'''
+    stream = io.StringIO() if sys.version_info[0] > 2 else io.BytesIO()
+    stats = pstats.Stats(profile, stream=stream)
+    stats.strip_dirs().sort_stats('cumulative')
+
+    print('Slowest functions, by cumulative time', file=stream)
+    stats.print_stats(top)
+
+    for name, module in ASTROID_FUNCTIONS.items():
+        print('Functions of {name}'.format(name=name), file=stream)
+        stats.print_stats(r'^{module}:'.format(module=re.escape(module)), top)
+
+    return stream.getvalue()
+
+
+def _get_memory_text(snapshot, top):
+    '''str: Describe the lines which allocated the most memory, from a `tracemalloc` snapshot.'''
+    lines = ['Largest allocations, by line']
+
+    for statistic in snapshot.statistics('lineno')[:top]:
+        lines.append(str(statistic))
+
+    return '\n'.join(lines) + '\n'
+
+
+def _write(directory, name, profile, snapshot, top):
+    '''Write the files of a profiled swap.
+
+    Args:
+        directory (str): The folder to write into. It is created if it doesn't exist.
+        name (str): The name of the swap, which starts the name of each file.
+        profile (<cProfile.Profile>): The swap's time.
+        snapshot (<tracemalloc.Snapshot> or NoneType): The swap's memory, if it was traced.
+        top (int): How many functions and lines to describe.
+
+    Returns:
+        tuple[str, str]: The paths of the written `.pstats` file and of the written report.
+
+    '''
+    try:
+        os.makedirs(directory)
+    except OSError:
+        # The folder may already exist
+        if not os.path.isdir(directory):
+            raise
+
+    base = os.path.join(directory, '{name}-{time}'.format(name=name, time=time.strftime('%Y%m%d-%H%M%S')))
+    index = 0
+
+    # Don't overwrite a swap which was profiled in the same second
+    while os.path.exists(base + ('-{}'.format(index) if index else '') + '.pstats'):
+        index += 1
+
+    if index:
+        base += '-{}'.format(index)
+
+    profile.dump_stats(base + '.pstats')
+    text = _get_stats_text(profile, top)
+
+    if snapshot is not None:
+        text += '\n' + _get_memory_text(snapshot, top)
+    else:
+        text += '\nMemory was not traced because `tracemalloc` could not be imported.\n'
+
+    with io.open(base + '.txt', 'w', encoding='utf-8') as handler:
+        handler.write(text if isinstance(text, type(u'')) else text.decode('utf-8'))
+
+    return (base + '.pstats', base + '.txt')
+
+
+@contextlib.contextmanager
+def profiled(name, force=False):
+    '''Profile the swap which runs in this context, if profiling was armed with <arm>.
+
+    Args:
+        name (str): The name of the swap, like "toggle".
+        force (bool, optional): If True, profile the swap even if profiling wasn't armed.
+
+    Yields:
+        list[str]:
+            The paths of the written `.pstats` file and report. The list is
+            empty until the context closes or if the swap wasn't profiled.
+
+    '''
+    paths = []
+
+    if not force and not _STATE['remaining']:
+        yield paths
+
+        return
+
+    if not force:
+        _STATE['remaining'] -= 1
+
+    # Another tool may already be tracing memory. If so, leave it running
+    tracing = tracemalloc is not None and not tracemalloc.is_tracing()
+
+    if tracing:
+        tracemalloc.start()
+
+    profile = cProfile.Profile()
+    profile.enable()
+
+    try:
+        yield paths
+    finally:
+        profile.disable()
+        snapshot = None
+
+        if tracemalloc is not None and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+
+        if tracing:
+            tracemalloc.stop()
+
+        paths.extend(_write(config.get_profile_directory(), name, profile, snapshot, config.get_profile_top()))
+
+
+def _make_parser():
+    '''<argparse.ArgumentParser>: Describe every command-line option.'''
+    parser = argparse.ArgumentParser(
+        prog='python -m python_style_swapper.profiling',
+        description='Profile the time and memory of a single swap.',
+    )
+    parser.add_argument('path', help='The Python file to swap a call of.')
+    parser.add_argument('row', type=int, help='The 1-based row of the call to swap.')
+    parser.add_argument(
+        '-f', '--function', choices=sorted(_FUNCTIONS), default='toggle',
+        help='How to swap the call.')
+    parser.add_argument(
+        '-b', '--backend', choices=(config.ASTROID_BACKEND, config.AST_BACKEND), default=config.get_backend(),
+        help='What parses code, whenever its tokens aren\'t enough.')
+    parser.add_argument(
+        '-o', '--output', default=config.get_profile_directory(),
+        help='The folder to write the profile into.')
+
+    return parser
+
+
+def main(arguments=None):
+    '''Profile a swap of the file and row given on the command-line.
+
+    Args:
+        arguments (list[str], optional): The command-line arguments. If none are given, `sys.argv` is used.
+
+    Returns:
+        int: Always 0. Any error while swapping is raised.
+
+    '''
+    options = _make_parser().parse_args(arguments)
+
+    with io.open(options.path, 'r', encoding='utf-8') as handler:
+        code = handler.read()
+
+    backend = config.get_backend()
+    directory = config.get_profile_directory()
+    config.register_backend(options.backend)
+    config.register_profile_directory(options.output)
+
+    try:
+        with profiled(options.function, force=True) as paths:
+            _FUNCTIONS[options.function](code, options.row)
+    finally:
+        config.register_backend(backend)
+        config.register_profile_directory(directory)
+
+    for path in paths:
+        print(path)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
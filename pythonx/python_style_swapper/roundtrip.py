@@ -0,0 +1,371 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Swap every call of real Python files back and forth and check that the code still means the same thing.
+
+Each call is written across multiple lines and then back onto a single line.
+After each swap, the code must still parse and its AST must still equal the
+AST of the original code. Swapping a call into the style that it already has
+must change nothing. Toggling a row which is only the inside of a multi-line
+string, or a comment between statements, must change nothing, either.
+
+Files are checked in parallel, by a pool of processes. The results are
+written as JSON.
+
+Example:
+    >>> python -m python_style_swapper.roundtrip --workers 8 --output results.json
+    >>> python -m python_style_swapper.roundtrip path/to/package --backend ast
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+from __future__ import division
+from __future__ import print_function
+
+import functools
+import argparse
+import platform
+import tokenize
+import timeit
+import json
+import ast
+import sys
+import io
+import os
+
+# IMPORT LOCAL LIBRARIES
+from .trimmer import statement
+from .trimmer import session
+from . import benchmark
+from . import swapper
+from . import config
+from . import cli
+
+
+# Ways that a swap can fail
+ERROR = 'error'
+SYNTAX = 'syntax'
+CHANGED_AST = 'changed_ast'
+NOT_IDEMPOTENT = 'not_idempotent'
+SWAPPED_TEXT = 'swapped_text'
+
+
+def _get_rows(tree):
+    '''list[int]: Get the 1-based row of every call in a parsed module, without duplicates.'''
+    return sorted(set(node.lineno for node in ast.walk(tree) if isinstance(node, ast.Call)))
+
+
+def _get_text_rows(code):
+    '''Find every row which only has text that no swap may change.
+
+    Args:
+        code (str): Some valid Python code.
+
+    Returns:
+        list[int]:
+            The 1-based rows which are only the inside of a multi-line string
+            or only a comment, outside of any statement.
+
+    '''
+    lines = code.split('\n')
+    rows = set()
+
+    for type_, _, start, end, _ in tokenize.generate_tokens(io.StringIO(code).readline):
+        if type_ == tokenize.STRING:
+            # The first and last rows of the string may have code around it
+            rows.update(range(start[0] + 1, end[0]))
+        elif type_ == tokenize.COMMENT and not lines[start[0] - 1][:start[1]].strip():
+            # A comment inside of a call's brackets belongs to that call's statement
+            if statement.get_statement_range(lines, start[0]) is statement.OUTSIDE:
+                rows.add(start[0])
+
+    return sorted(rows)
+
+
+def _get_failure(name, code, expected):
+    '''Check that the code which a swap wrote still means the same thing as the original code.
+
+    Args:
+        name (str): The swap which wrote `code`, like "make_multi_line".
+        code (str): The swapped code.
+        expected (str): The dumped AST of the original code.
+
+    Returns:
+        tuple[str, str] or NoneType: The kind of failure and a description of it, if the swap failed.
+
+    '''
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as error:
+        return (SYNTAX, '{name} wrote code which does not parse: {error}'.format(name=name, error=error))
+
+    if ast.dump(tree) != expected:
+        return (CHANGED_AST, '{name} changed what the code means'.format(name=name))
+
+    return None
+
+
+def _check_call(code, row, expected):
+    '''Swap a call to multiple lines and back to a single line, checking the code after each swap.
+
+    Args:
+        code (str): The original code.
+        row (int): The 1-based row of the call to swap.
+        expected (str): The dumped AST of `code`.
+
+    Returns:
+        tuple[str, str] or NoneType: The kind of failure and a description of it, if any swap failed.
+
+    '''
+    expanded = swapper.make_multi_line(code, row)
+    failure = _get_failure('make_multi_line', expanded, expected)
+
+    if failure:
+        return failure
+
+    if swapper.make_multi_line(expanded, row) != expanded:
+        return (NOT_IDEMPOTENT, 'make_multi_line changed a call which was already on multiple lines')
+
+    # `row` may be any row of the call. Once the call is on a single row,
+    # the other rows belong to the code after it, so check the call's first row
+    #
+    call = swapper.get_call(session.Session(expanded), row)
+    start = call.fromlineno if call else row
+
+    collapsed = swapper.make_single_line(expanded, row)
+    failure = _get_failure('make_single_line', collapsed, expected)
+
+    if failure:
+        return failure
+
+    if swapper.make_single_line(collapsed, start) != collapsed:
+        return (NOT_IDEMPOTENT, 'make_single_line changed a call which was already on a single line')
+
+    return None
+
+
+def _check_text_row(code, row):
+    '''Toggle a row which only has text and check that nothing was swapped.
+
+    Args:
+        code (str): The original code.
+        row (int): The 1-based row to toggle. See <_get_text_rows>.
+
+    Returns:
+        tuple[str, str] or NoneType: The kind of failure and a description of it, if the toggle changed anything.
+
+    '''
+    output, _ = swapper.toggle(code, row)
+
+    if output != code:
+        return (SWAPPED_TEXT, 'toggle changed a row which is only a string or a comment')
+
+    return None
+
+
+def check_file(path, backend=None, indent=None, slowest=10):
+    '''Round-trip every call of a Python file and toggle every row which only has text.
+
+    The preferences are given as arguments, rather than read from <config>,
+    because this function runs in processes which may not share the
+    preferences of the process which started them.
+
+    Args:
+        path (str): The Python file to check. It is never changed.
+        backend (str, optional): What parses code, whenever its tokens aren't enough.
+        indent (str, optional): The indentation that is used for multi-line calls.
+        slowest (int, optional): How many of the file's slowest calls to report.
+
+    Returns:
+        dict[str, object]:
+            The path, how many calls and text rows were checked, every
+            failed call or row and the slowest calls. If the file can't be read or isn't valid Python,
+            in this version of Python, it has a "skipped" reason instead.
+
+    '''
+    result = {'path': path, 'calls': 0, 'text_rows': 0, 'failures': [], 'slowest': []}
+
+    try:
+        with io.open(path, 'r', encoding='utf-8') as handler:
+            code = handler.read()
+
+        tree = ast.parse(code)
+        expected = ast.dump(tree)
+        text_rows = _get_text_rows(code)
+    except (IOError, OSError, UnicodeDecodeError, SyntaxError, ValueError, RuntimeError, MemoryError) as error:
+        # Test data may not be valid Python, or not valid in this version of
+        # Python, or be nested too deeply for `ast` to read (a RuntimeError)
+        #
+        result['skipped'] = '{name}: {error}'.format(name=error.__class__.__name__, error=error)
+
+        return result
+
+    times = []
+
+    with cli.use_preferences(indent=indent, backend=backend):
+        for row in _get_rows(tree):
+            started = timeit.default_timer()
+
+            try:
+                failure = _check_call(code, row, expected)
+            except Exception as error:  # pylint: disable=broad-except
+                # One call which can't be swapped shouldn't stop every other call from being checked
+                failure = (ERROR, '{name}: {error}'.format(name=error.__class__.__name__, error=error))
+
+            milliseconds = (timeit.default_timer() - started) * 1000
+            result['calls'] += 1
+            times.append({'path': path, 'row': row, 'milliseconds': round(milliseconds, 3)})
+
+            if failure:
+                kind, message = failure
+                result['failures'].append({'path': path, 'row': row, 'kind': kind, 'message': message})
+
+        for row in text_rows:
+            try:
+                failure = _check_text_row(code, row)
+            except Exception as error:  # pylint: disable=broad-except
+                failure = (ERROR, '{name}: {error}'.format(name=error.__class__.__name__, error=error))
+
+            result['text_rows'] += 1
+
+            if failure:
+                kind, message = failure
+                result['failures'].append({'path': path, 'row': row, 'kind': kind, 'message': message})
+
+    result['slowest'] = sorted(times, key=lambda case: case['milliseconds'], reverse=True)[:slowest]
+
+    return result
+
+
+def run(paths, backend=None, indent=None, workers=1, chunk_size=4, slowest=10):
+    '''Round-trip every call of some Python files and directories.
+
+    Args:
+        paths (iter[str]): The Python files and directories to check.
+        backend (str, optional): What parses code, whenever its tokens aren't enough.
+        indent (str, optional): The indentation that is used for multi-line calls.
+        workers (int, optional): How many processes check files at once.
+        chunk_size (int, optional): How many files are sent to a process at once.
+        slowest (int, optional): How many of the slowest calls to report.
+
+    Returns:
+        dict[str, object]:
+            Every failed call or text row, the slowest calls and how many
+            calls were checked per second.
+
+    '''
+    function = functools.partial(check_file, backend=backend, indent=indent, slowest=slowest)
+    started = timeit.default_timer()
+    files = 0
+    calls = 0
+    text_rows = 0
+    skipped = []
+    failures = []
+    cases = []
+
+    for result in cli.map_files(function, cli.iter_files(paths), max(workers, 1), chunk_size):
+        files += 1
+
+        if 'skipped' in result:
+            skipped.append({'path': result['path'], 'reason': result['skipped']})
+
+            continue
+
+        calls += result['calls']
+        text_rows += result['text_rows']
+        failures.extend(result['failures'])
+        cases.extend(result['slowest'])
+
+    seconds = timeit.default_timer() - started
+
+    return {
+        'files': files,
+        'calls': calls,
+        'text_rows': text_rows,
+        'failed': len(failures),
+        'seconds': round(seconds, 3),
+        'calls_per_second': round(calls / seconds, 1) if seconds else 0.0,
+        'skipped': skipped,
+        'failures': failures,
+        'slowest': sorted(cases, key=lambda case: case['milliseconds'], reverse=True)[:slowest],
+    }
+
+
+def _make_parser():
+    '''<argparse.ArgumentParser>: Describe every command-line option.'''
+    parser = argparse.ArgumentParser(
+        prog='python -m python_style_swapper.roundtrip',
+        description='Swap every call back and forth and check that the code still means the same thing.',
+    )
+    parser.add_argument(
+        'paths', nargs='*', default=[benchmark.DEFAULT_CORPUS],
+        help='The Python files or directories to check. Default: the vendored astroid, including its test data.')
+    parser.add_argument(
+        '-b', '--backend', choices=(config.ASTROID_BACKEND, config.AST_BACKEND), default=config.get_backend(),
+        help='What parses code, whenever its tokens aren\'t enough.')
+    parser.add_argument(
+        '-i', '--indent', default=config.get_indent_preference(),
+        help='The indentation that is used for multi-line calls.')
+    parser.add_argument(
+        '-w', '--workers', type=int, default=(os.cpu_count() or 1) if hasattr(os, 'cpu_count') else 1,
+        help='How many processes check files at once.')
+    parser.add_argument(
+        '-c', '--chunk-size', type=int, default=4,
+        help='How many files are sent to a process at once.')
+    parser.add_argument(
+        '-s', '--slowest', type=int, default=10,
+        help='How many of the slowest calls to report.')
+    parser.add_argument(
+        '-o', '--output',
+        help='The file to write JSON results to. If no file is given, they are written to stdout.')
+
+    return parser
+
+
+def main(arguments=None):
+    '''Round-trip the files and directories given on the command-line and write the results as JSON.
+
+    Args:
+        arguments (list[str], optional): The command-line arguments. If none are given, `sys.argv` is used.
+
+    Returns:
+        int: 1 if any call failed to round-trip. Otherwise, 0.
+
+    '''
+    options = _make_parser().parse_args(arguments)
+    report = run(
+        options.paths,
+        backend=options.backend,
+        indent=options.indent,
+        workers=options.workers,
+        chunk_size=options.chunk_size,
+        slowest=options.slowest,
+    )
+    report['python'] = platform.python_version()
+    report['backend'] = options.backend
+    text = json.dumps(report, indent=2, sort_keys=True)
+
+    if options.output:
+        with io.open(options.output, 'w', encoding='utf-8') as handler:
+            handler.write(text if isinstance(text, type(u'')) else text.decode('utf-8'))
+    else:
+        print(text)
+
+    print(
+        '{files} files, {calls} calls, {failed} failed, {skipped} skipped in {seconds:.2f} seconds '
+        '({calls_per_second:.1f} calls/sec)'.format(
+            files=report['files'],
+            calls=report['calls'],
+            failed=report['failed'],
+            skipped=len(report['skipped']),
+            seconds=report['seconds'],
+            calls_per_second=report['calls_per_second'],
+        ),
+        file=sys.stderr,
+    )
+
+    return int(bool(report['failed']))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,105 +3,152 @@
 
 '''A set of classes and functions needed to parse and print Python callable objects.'''
 
-# IMPORT THIRD-PARTY LIBRARIES
-try:
-    from astroid import as_string
-    import astroid
-except ImportError:
-    import sys
-    import os
-
-    _ROOT = os.path.dirname(os.path.realpath(__file__))
-    sys.path.append(os.path.join(_ROOT, 'vendors'))
-
-    from astroid import as_string
-    import astroid
+# IMPORT STANDARD LIBRARIES
+import functools
+import textwrap
+import tokenize
+import ast
 
 # IMPORT LOCAL LIBRARIES
+from .trimmer import statement
+from .trimmer import session
+from .trimmer import locator
 from .trimmer import parser
+from .trimmer import common
 from . import config
+from . import timing
 
 
-class MultiLineCallVisitor(as_string.AsStringVisitor):
+_OPENING_BRACKETS = frozenset('([{')
+_CLOSING_TEXT = frozenset(')]},')
+_SKIPPED_TOKENS = frozenset((
+    tokenize.COMMENT,
+    tokenize.DEDENT,
+    tokenize.ENDMARKER,
+    tokenize.INDENT,
+    tokenize.NEWLINE,
+    tokenize.NL,
+))
 
-    '''A visitor that re-prints <astroid.Call> nodes in a multi-line style.
 
-    Attributes:
-        _single_line_exceptions (tuple[str]):
-            Any functions, by-name, which should not allowed to be made multi-line.
+def __getattr__(name):
+    '''Find `MultiLineCallVisitor`, which moved to <visitor>, without importing astroid up-front.
+
+    The "ast" backend never needs astroid, so <visitor> is only imported
+    once the old name is actually used (Python 3.7+).
+
+    Args:
+        name (str): The attribute which wasn't found on this module.
+
+    Raises:
+        AttributeError: If `name` isn't an attribute which moved.
+
+    Returns:
+        type: The visitor class.
 
     '''
+    if name == 'MultiLineCallVisitor':
+        from . import visitor
 
-    _single_line_exceptions = ('super', )
+        return visitor.MultiLineCallVisitor
 
-    def _format_args(self, args):
-        '''Change the given arguments into "multi-line" style arguments.
+    raise AttributeError('module {name!r} has no attribute {attribute!r}'.format(name=__name__, attribute=name))
+
+
+def get_indent(text):
+    return text[:len(text) - len(text.lstrip())]
 
-        Args:
-            args (list[str]):
-                The list of args/kwargs to change.
 
-        Returns:
-            list[str]: The multi-line representation of `args`.
+class Edit(object):
+
+    '''A change to a slice of lines, like `lines[start:end] = replacement`.
+
+    Attributes:
+        start (int): The 0-based index of the first line to replace.
+        end (int): The 0-based index of the line after the last line to replace.
+        lines (list[str]): The lines to replace `start` through `end` with.
+
+    '''
+
+    def __init__(self, start, end, lines):
+        '''Create the instance.
+
+        Args:
+            start (int): The 0-based index of the first line to replace.
+            end (int): The 0-based index of the line after the last line to replace.
+            lines (iter[str]): The lines to replace `start` through `end` with.
 
         '''
-        if not args:
-            return ''
+        super(Edit, self).__init__()
+        self.start = start
+        self.end = end
+        self.lines = list(lines)
 
-        # `args` has a chance of being a tuple. We need indexing so convert it to a list
-        args = list(args)
+    @timing.phase('splice')
+    def apply(self, lines):
+        '''list[str]: Get a copy of `lines` with this edit applied to it.'''
+        lines = list(lines)
+        lines[self.start:self.end] = self.lines
 
-        # Add proper indentation to every arg
-        args[0] = '\n{indent}'.format(indent=self.indent) + args[0]
-        args = [args[0]] + ['{indent}{name}'.format(indent=self.indent, name=name) for name in args[1:]]
+        return lines
 
-        # Add commas to every arg, including the last arg
-        args[-1] += ',\n'
-        args = ',\n'.join(args)
+    def __bool__(self):
+        '''bool: Check if this edit changes anything.'''
+        return self.start != self.end or bool(self.lines)
 
-        return args
+    __nonzero__ = __bool__
 
-    def _get_args(self, node):
-        '''list[str]: Add newline and extra space to each arg and kwarg.'''
-        args = [arg.accept(self) for arg in node.args]
+    def __repr__(self):
+        '''str: Show where this edit is and what it replaces those lines with.'''
+        return '{name}({start!r}, {end!r}, {lines!r})'.format(
+            name=self.__class__.__name__, start=self.start, end=self.end, lines=self.lines)
 
-        keywords = []
 
-        if node.keywords:
-            keywords = [kwarg.accept(self) for kwarg in node.keywords]
+@timing.phase('splice')
+def _get_edit(lines, start, end, replacement):
+    '''Describe a replacement of `lines[start:end]`, skipping any lines that stay the same.
 
-        args.extend(keywords)
-        return self._format_args(args)
+    Args:
+        lines (list[str]): The original lines of code. This list is not modified.
+        start (int): The 0-based index of the first line to replace.
+        end (int): The 0-based index of the line after the last line to replace.
+        replacement (list[str]): The lines to replace `start` through `end` with.
 
-    def visit_call(self, node):
-        '''Expand an <astroid.Call> object into a valid Python string.
+    Returns:
+        `Edit`: The smallest edit which has the same result.
 
-        Args:
-            node (<astroid.Call>): The node to create a string representation for.
+    '''
+    first = 0
+    last = 0
+    count = min(end - start, len(replacement))
 
-        Returns:
-            str: The printable representation of the given `node`.
+    while first < count and lines[start + first] == replacement[first]:
+        first += 1
 
-        '''
-        expression = node.func.accept(self)
+    while last < count - first and lines[end - last - 1] == replacement[len(replacement) - last - 1]:
+        last += 1
 
-        try:
-            if node.func.name in self._single_line_exceptions:
-                return node.as_string()
-        except AttributeError:
-            # This only happens if node is a <astroid.Attribute>
-            # An attribute will never be in the list of function exceptions so
-            # just ignore it.
-            #
-            pass
+    return Edit(start + first, end - last, replacement[first:len(replacement) - last])
 
-        args = self._get_args(node)
 
-        return '{expression}({args})'.format(expression=expression, args=args)
+def _splice(lines, node, tolineno, visited_lines):
+    '''Replace the lines of `node` with some other lines.
 
+    Args:
+        lines (list[str]): The original lines of code. This list is not modified.
+        node (`astroid.Node`): The callable object that will be replaced.
+        tolineno (int): The real, 1-based ending line of `node`.
+        visited_lines (iter[str]): The lines to replace `node` with.
 
-def get_indent(text):
-    return text[:len(text) - len(text.lstrip())]
+    Returns:
+        `Edit`: The change which puts `visited_lines` in-place of `node`.
+
+    '''
+    indent = get_indent(lines[node.fromlineno - 1])
+    output_lines = ['{indent}{text}'.format(indent=indent, text=text)
+                    for text in visited_lines]
+
+    return _get_edit(lines, node.fromlineno - 1, tolineno, output_lines)
 
 
 def format_lines(code, node, visited_lines):
@@ -118,15 +165,330 @@ def format_lines(code, node, visited_lines):
 
     '''
     lines = code.split('\n')
-    indent = get_indent(lines[node.fromlineno - 1])
-    output_lines = ['{indent}{text}'.format(indent=indent, text=text)
-                    for text in visited_lines]
 
-    start = node.fromlineno - 1
-    end = parser.get_tolineno(node, lines)
-    lines[start:end] = output_lines
+    return _splice(lines, node, parser.get_tolineno(node, lines), visited_lines).apply(lines)
+
+
+def _get_replaceable_node(node):
+    '''`astroid.Node`: Get the node whose text should be replaced, for some call.
+
+    If the call is the value of a statement, like `return foo(bar)`, the
+    whole statement is replaced so that the text before the call is kept.
+
+    '''
+    if isinstance(node.parent, parser.get_statement_types()) and node.parent.value is node:
+        return node.parent
+
+    return node
+
+
+def _parse_rows(rows):
+    '''str: Dump the syntax tree of some indented rows of code.'''
+    return ast.dump(ast.parse(textwrap.dedent('\n'.join(rows))))
+
+
+def _is_equivalent(before, after):
+    '''bool: Check if two sets of rows of code mean the same thing. Rows which don't parse never match.'''
+    try:
+        return _parse_rows(before) == _parse_rows(after)
+    except (SyntaxError, ValueError, RuntimeError):
+        # RuntimeError is raised if the code is nested too deeply to parse
+        return False
+
+
+def _replace_node(context, node, text):
+    '''Replace the rows of an astroid node with some re-printed text.
+
+    astroid re-prints whole rows. If the rows of `node` have any other code
+    on them, like the "if" and ":" of `if foo(bar):`, that code would be
+    lost. So the rows are only replaced if they still mean the same thing.
 
-    return lines
+    Args:
+        context (<session.Session>): The code that `node` was parsed from.
+        node (<astroid.NodeNG>): The node to replace.
+        text (str): The re-printed `node`.
+
+    Returns:
+        `Edit`: The change which puts `text` in-place of `node`. If the change is unsafe, nothing is changed.
+
+    '''
+    tolineno = context.get_tolineno(node)
+    indent = get_indent(context.lines[node.fromlineno - 1])
+    rows = ['{indent}{text}'.format(indent=indent, text=row) for row in text.split('\n')]
+
+    if tolineno < node.fromlineno or not _is_equivalent(context.lines[node.fromlineno - 1:tolineno], rows):
+        return Edit(0, 0, [])
+
+    return _get_edit(context.lines, node.fromlineno - 1, tolineno, rows)
+
+
+def _get_text(lines, start, end):
+    '''str: Get the text between two (1-based row, 0-based column) positions on the same row.'''
+    return lines[start[0] - 1][start[1]:end[1]]
+
+
+def _join_rows(text):
+    '''Put some code which spans multiple rows onto a single row.
+
+    Comments are removed. The spacing within each row is kept.
+
+    Args:
+        text (str): Some Python code which is complete on its own, like a function argument.
+
+    Returns:
+        str: The joined code. If `text` can't be tokenized, it is returned unchanged.
+
+    '''
+    # Wrap `text` in parentheses so that its rows are tokenized as one logical line
+    rows = '({text})'.format(text=text).split('\n')
+    readline = functools.partial(next, iter([row + '\n' for row in rows]), '')
+    output = []
+    previous = None
+
+    try:
+        for token in tokenize.generate_tokens(readline):
+            type_, string, start, _, _ = token
+
+            if type_ in _SKIPPED_TOKENS:
+                continue
+
+            if previous:
+                previous_text, (previous_row, previous_column) = previous[1], previous[3]
+
+                if previous_row == start[0]:
+                    output.append(rows[start[0] - 1][previous_column:start[1]])
+                elif previous_text not in _OPENING_BRACKETS and string not in _CLOSING_TEXT:
+                    output.append(' ')
+
+            output.append(string)
+            previous = token
+    except (tokenize.TokenError, SyntaxError):
+        return text
+
+    # Remove the parentheses that were added
+    return ''.join(output[1:-1]).strip()
+
+
+def _get_source(lines, start, end):
+    '''str: Get the text between two (1-based row, 0-based column) positions, as a single row.'''
+    if start[0] == end[0]:
+        return _get_text(lines, start, end)
+
+    rows = [lines[start[0] - 1][start[1]:]] + lines[start[0]:end[0] - 1] + [lines[end[0] - 1][:end[1]]]
+
+    return _join_rows('\n'.join(rows))
+
+
+def _is_one_row(span):
+    '''bool: Check if a (start, end) pair of positions begins and ends on the same row.'''
+    start, end = span
+
+    return start[0] == end[0]
+
+
+def _can_collapse(span):
+    '''bool: Check if `span` can be made into a single line without parsing it.'''
+    return not span.has_comments \
+        and span.start[0] == span.opening[0] \
+        and all(_is_one_row(argument) for argument in span.arguments)
+
+
+def _can_expand(span):
+    '''bool: Check if `span` can be made into multiple lines without parsing it.'''
+    return not span.has_generator \
+        and span.start[0] == span.opening[0] \
+        and all(_is_one_row(argument) for argument in span.arguments)
+
+
+@timing.phase('render')
+def _collapse_span(lines, span):
+    '''Put every argument of a call onto the same line as the call.
+
+    Args:
+        lines (list[str]): The original lines of code. This list is not modified.
+        span (<locator.CallSpan>): The call to collapse.
+
+    Returns:
+        `Edit`: The change which puts `span` on a single line.
+
+    '''
+    prefix = lines[span.fromlineno - 1][:span.start[1]]
+    suffix = lines[span.tolineno - 1][span.closing[1] + 1:]
+    arguments = [_get_source(lines, start, end) for start, end in span.arguments]
+
+    output = '{prefix}{expression}({arguments}){suffix}'.format(
+        prefix=prefix,
+        expression=_get_source(lines, span.start, span.opening),
+        arguments=', '.join(arguments),
+        suffix=suffix,
+    )
+
+    # An argument may still span multiple rows if it contains a multi-line string
+    return _get_edit(lines, span.fromlineno - 1, span.tolineno, output.split('\n'))
+
+
+@timing.phase('render')
+def _expand_span(lines, span, indent):
+    '''Put every argument of a call onto its own line.
+
+    Args:
+        lines (list[str]): The original lines of code. This list is not modified.
+        span (<locator.CallSpan>): The call to expand.
+        indent (str): The indentation to add to each argument.
+
+    Returns:
+        `Edit`: The change which writes `span` across multiple lines.
+
+    '''
+    if not span.arguments or span.name in common.SINGLE_LINE_EXCEPTIONS:
+        return Edit(span.fromlineno - 1, span.fromlineno - 1, [])
+
+    first_line = lines[span.fromlineno - 1]
+    line_indent = get_indent(first_line)
+    argument_indent = line_indent + indent
+    arguments = [_get_source(lines, start, end) for start, end in span.arguments]
+
+    if span.has_generator:
+        # `foo(\n    x for x in y,\n)` isn't valid Python but `foo(\n    (x for x in y),\n)` is
+        arguments = ['({argument})'.format(argument=argument) for argument in arguments]
+
+    output_lines = ['{prefix}{expression}('.format(
+        prefix=first_line[:span.start[1]],
+        expression=_get_source(lines, span.start, span.opening),
+    )]
+    output_lines.extend(
+        '{indent}{argument},'.format(indent=argument_indent, argument=argument)
+        for argument in arguments
+    )
+    output_lines.append('{indent}){suffix}'.format(
+        indent=line_indent,
+        suffix=lines[span.tolineno - 1][span.closing[1] + 1:],
+    ))
+
+    return _get_edit(lines, span.fromlineno - 1, span.tolineno, '\n'.join(output_lines).split('\n'))
+
+
+@timing.phase('lookup')
+def get_call(context, row, column=None):
+    '''Find a call in `context` by its tokens or, if tokens aren't enough, by parsing.
+
+    Args:
+        context (<session.Session>): The code to search within.
+        row (int): A 1-based integer which represents the user's cursor position.
+        column (int, optional): A 0-based column which the call must contain, if any.
+
+    Returns:
+        <locator.CallSpan> or <astroid.Call> or NoneType: The found call, if any.
+
+    '''
+    try:
+        return context.get_call_span(row, column=column)
+    except locator.AmbiguousCallError:
+        return _get_parsed_call(context, row, column=column)
+
+
+@timing.phase('lookup')
+def _get_parsed_call(context, row, column=None):
+    '''Find a call in `context` by parsing it with the session's backend.
+
+    Args:
+        context (<session.Session>): The code to search within.
+        row (int): A 1-based integer which represents the user's cursor position.
+        column (int, optional): A 0-based column which the call must contain, if any.
+
+    Returns:
+        <locator.CallSpan> or <astroid.Call> or NoneType:
+            The found call, if any. If the call's tokens can't be found,
+            the "astroid" backend finds an <astroid.Call>, instead.
+
+    '''
+    if context.backend == config.AST_BACKEND:
+        return context.get_syntax_span(row, column=column)
+
+    node = context.get_nearest_call(row, column=column)
+
+    if not node:
+        return None
+
+    # astroid only confirms where the call is. Its arguments are copied from
+    # the source code, which is faster than re-printing each argument's tree
+    # and which keeps the user's own formatting
+    #
+    return context.get_span(node) or node
+
+
+@timing.phase('render')
+def _render_single_line(node, indent):
+    '''str: Re-print an astroid node, putting every call in it onto a single line.'''
+    # This module imports astroid, which isn't needed by the "ast" backend
+    from . import visitor
+
+    return visitor.SingleLineVisitor(indent=indent)(node)
+
+
+@timing.phase('render')
+def _render_multi_line(node, indent):
+    '''str: Re-print an astroid node, putting each argument of its call onto a separate line.'''
+    # This module imports astroid, which isn't needed by the "ast" backend
+    from . import visitor
+
+    return visitor.MultiLineCallVisitor(indent=indent)(node)
+
+
+def get_single_line_edit(context, call, row):
+    '''`Edit`: Collapse `call`, which was found in `context`, into a single line.'''
+    if isinstance(call, locator.CallSpan) and not _can_collapse(call):
+        call = _get_parsed_call(context, row)
+
+    if not call:
+        return Edit(0, 0, [])
+
+    if isinstance(call, locator.CallSpan):
+        return _collapse_span(context.lines, call)
+
+    node = _get_replaceable_node(call)
+
+    return _replace_node(context, node, _render_single_line(node, context.indent))
+
+
+def get_multi_line_edit(context, call, row, column=None):
+    '''`Edit`: Expand `call`, which was found in `context` at `row` (and `column`), into multiple lines.'''
+    if isinstance(call, locator.CallSpan) and not _can_expand(call):
+        call = _get_parsed_call(context, row, column=column)
+
+    if not call:
+        return Edit(0, 0, [])
+
+    if isinstance(call, locator.CallSpan):
+        return _expand_span(context.lines, call, context.indent)
+
+    node = _get_replaceable_node(call)
+
+    return _replace_node(context, node, _render_multi_line(node, context.indent))
+
+
+def is_single_line(context, call):
+    '''bool: Check if `call`, which was found in `context`, is written on one line.'''
+    if isinstance(call, locator.CallSpan):
+        return call.fromlineno == call.tolineno
+
+    return call.fromlineno == context.get_tolineno(call)
+
+
+def has_comments(context, call):
+    '''bool: Check if `call`, which was found in `context`, has any comments on its rows.'''
+    if isinstance(call, locator.CallSpan):
+        return call.has_comments
+
+    try:
+        for token in statement.generate_tokens(context.lines, call.fromlineno, context.get_tolineno(call)):
+            if token[0] == tokenize.COMMENT:
+                return True
+    except (tokenize.TokenError, SyntaxError):
+        # The call's rows may end inside of some other bracket. Every comment was already found
+        pass
+
+    return False
 
 
 def make_single_line(code, row):
@@ -140,15 +502,10 @@ def make_single_line(code, row):
         str: The modified code.
 
     '''
-    node = parser.get_nearest_call(code, row)
+    context = session.Session(code)
+    call = get_call(context, row)
 
-    if isinstance(node.parent, astroid.Assign):
-        node = node.parent
-
-    lines = format_lines(code, node, node.as_string().split('\n'))
-    code = '\n'.join(lines)
-
-    return code
+    return '\n'.join(get_single_line_edit(context, call, row).apply(context.lines))
 
 
 def make_multi_line(code, row):
@@ -162,47 +519,176 @@ def make_multi_line(code, row):
         str: The modified code.
 
     '''
-    node = parser.get_nearest_call(code, row)
+    context = session.Session(code)
+    call = get_call(context, row)
 
-    if isinstance(node.parent, astroid.Assign):
-        node = node.parent
+    return '\n'.join(get_multi_line_edit(context, call, row).apply(context.lines))
 
-    visitor = MultiLineCallVisitor(indent=config.get_indent_preference())
-    output = visitor(node)
 
-    lines = format_lines(code, node, output.split('\n'))
-    code = '\n'.join(lines)
+def get_edit(context, row):
+    '''Find the change which swaps a single-line call into a multiline call or vice-versa.
 
-    return code
+    Only the lines of the call which actually change are part of the edit so
+    an editor can replace just those lines, instead of the whole file.
+
+    Args:
+        context (<session.Session>): The code to change.
+        row (int): A 1-based line number value to search for a call.
+
+    Returns:
+        tuple[`Edit` or NoneType, <locator.CallSpan> or <astroid.Call> or NoneType]:
+            The change and the found call, if any.
+            If no call is found, no edit is returned.
+
+    '''
+    call = get_call(context, row)
+
+    if not call:
+        return (None, None)
+
+    return (get_toggle_edit(context, call, row), call)
+
+
+def get_toggle_edit(context, call, row):
+    '''`Edit`: Swap `call`, which was found in `context`, between a single line and multiple lines.'''
+    if is_single_line(context, call):
+        return get_multi_line_edit(context, call, row)
+
+    return get_single_line_edit(context, call, row)
+
+
+def get_range_edits(context, first, last, function=get_toggle_edit):
+    '''Find the changes for the call of every statement between two rows.
+
+    Every edit describes the original lines of `context` and no two edits
+    overlap, so they can all be applied at once with <apply_edits>.
+
+    Args:
+        context (<session.Session>):
+            The code to change.
+        first (int):
+            The 1-based row to start searching from. If this row is in the
+            middle of a statement, that statement is included.
+        last (int):
+            The 1-based row to stop searching at, inclusive.
+        function (callable[<session.Session>, <locator.CallSpan> or <astroid.Call>, int], optional):
+            Get the change for a call which starts on some row, if any.
+            By default, every call is toggled. See <get_toggle_edit>.
+
+    Returns:
+        list[tuple[`Edit`, <locator.CallSpan> or <astroid.Call>]]:
+            Every change, from the top of the code to the bottom, and the
+            call that it changes.
+
+    '''
+    edits = []
+
+    for start, _ in statement.iter_statement_ranges(context.lines, first, last):
+        call = get_call(context, start)
+
+        # Only the outer-most call which starts the statement is changed
+        if not call or call.fromlineno != start:
+            continue
+
+        edit = function(context, call, start)
+
+        if edit:
+            edits.append((edit, call))
+
+    return edits
+
+
+@timing.phase('splice')
+def apply_edits(lines, edits):
+    '''Apply many changes to some lines at once.
+
+    Args:
+        lines (list[str]): The original lines of code. This list is not modified.
+        edits (iter[`Edit`]): Changes which don't overlap, in any order.
+
+    Returns:
+        list[str]: A copy of `lines`, with every edit applied.
+
+    '''
+    output = []
+    position = 0
+
+    # Copy each unchanged slice of lines once, instead of shifting every line below each edit
+    for edit in sorted(edits, key=lambda edit: edit.start):
+        output.extend(lines[position:edit.start])
+        output.extend(edit.lines)
+        position = edit.end
+
+    output.extend(lines[position:])
+
+    return output
+
+
+def toggle_session(context, row):
+    '''Change a single-line call into a multiline call or vice-versa.
+
+    Args:
+        context (<session.Session>): The code to change.
+        row (int): A 1-based line number value to search for a call.
+
+    Returns:
+        tuple[list[str], <locator.CallSpan> or <astroid.Call> or NoneType]:
+            The changed lines and the found call, if any.
+            If no call is found, the original lines are returned, untouched.
+
+    '''
+    edit, call = get_edit(context, row)
+
+    if not call:
+        return (context.lines, None)
+
+    return (edit.apply(context.lines), call)
 
 
 def toggle(code, row):
     '''Change a single-line call into a multiline call or vice-versa.
 
+    Calls are found and re-written using only their tokens, whenever possible.
+    Otherwise, the code is parsed once and that same parse result is used to
+    find the call, render it and splice it back into `code`.
+
     Args:
         code (str): The code to change.
-        row (int): A 0-based line number value to search for a call.
+        row (int): A 1-based line number value to search for a call.
 
     Returns:
-        tuple[str, <astroid.Call> or NoneType]:
-            The changed code and the found astroid node, if any.
-            If no astroid node is found, the original code is returned, untouched.
+        tuple[str, <locator.CallSpan> or <astroid.Call> or NoneType]:
+            The changed code and the found call, if any.
+            If no call is found, the original code is returned, untouched.
 
     '''
-    call = parser.get_nearest_call(code, row)
+    lines, call = toggle_session(session.Session(code), row)
 
     if not call:
         return (code, None)
 
-    lines = code.split('\n')
-    is_single_line = call.fromlineno == parser.get_tolineno(call, lines)
+    return ('\n'.join(lines), call)
+
+
+def toggle_range(code, first, last):
+    '''Swap the call of every statement between two rows.
+
+    The code is only parsed once and every call is changed in that same
+    parse result, no matter how many calls there are.
 
-    if is_single_line:
-        output = make_multi_line(code, row)
-    else:
-        output = make_single_line(code, row)
+    Args:
+        code (str): The code to change.
+        first (int): The 1-based row to start changing calls from.
+        last (int): The 1-based row to stop changing calls at, inclusive.
+
+    Returns:
+        tuple[str, int]: The changed code and the number of calls that were changed.
+
+    '''
+    context = session.Session(code)
+    edits = [edit for edit, _ in get_range_edits(context, first, last)]
 
-    lines = output.split('\n')
-    code = '\n'.join(lines)
+    if not edits:
+        return (code, 0)
 
-    return (code, call)
+    return ('\n'.join(apply_edits(context.lines, edits)), len(edits))
@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Time each phase of a swap, so a slow swap shows where its time went.
+
+Functions which run a phase are decorated with <phase>. Their time is only
+measured while a swap is recorded with <record>. Otherwise, a decorated
+function only costs one extra check, so timing is cheap to leave in place.
+
+Phases:
+    parse: Parsing code with astroid or `ast`.
+    lookup: Finding the call under the cursor, by tokens or in a parsed tree.
+    walk: Collecting the calls of a parsed tree.
+    tolineno: Finding the real last line of a parsed call.
+    render: Writing the call in its new style.
+    splice: Putting the rendered call back into the code.
+    write: Changing the lines of a Vim buffer.
+    other: Everything else, like copying, splitting and joining lines.
+
+Each phase's time doesn't include the time of any phase which runs inside of
+it. So the time of every phase adds up to the time of the whole swap.
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+from __future__ import division
+
+import collections
+import contextlib
+import functools
+import time
+
+# IMPORT LOCAL LIBRARIES
+from . import config
+
+
+PHASES = ('parse', 'lookup', 'walk', 'tolineno', 'render', 'splice', 'write', 'other')
+PERCENTILES = (50, 95, 99)
+
+# Every swap which is being recorded, inner-most swap last
+_ACTIVE = []
+_HISTORY = collections.deque()
+
+try:
+    _clock = time.perf_counter
+except AttributeError:
+    # Python 2
+    _clock = time.time
+
+
+class Record(object):
+
+    '''The time of each phase of a single swap.
+
+    Attributes:
+        info (dict[str, object]): A description of the swap, like the number of lines that were swapped.
+        phases (dict[str, float]): The seconds of each phase.
+        counts (dict[str, int]): How many of something the swap had, like how many calls were collected.
+        total (float): The seconds of the whole swap.
+
+    '''
+
+    def __init__(self, info):
+        '''Create the instance.
+
+        Args:
+            info (dict[str, object]): A description of the swap.
+
+        '''
+        super(Record, self).__init__()
+        self.info = info
+        self.phases = collections.defaultdict(float)
+        self.counts = collections.defaultdict(int)
+        self.total = 0.0
+        self._nested = []
+
+    def start(self):
+        '''float: Start timing a phase and get the time that it started at.'''
+        self._nested.append(0.0)
+
+        return _clock()
+
+    def stop(self, name, started):
+        '''Stop timing a phase and add its time to this instance.
+
+        Args:
+            name (str): The phase which was being timed.
+            started (float): The time that the phase started at. See <Record.start>.
+
+        '''
+        elapsed = _clock() - started
+        self.phases[name] += elapsed - self._nested.pop()
+
+        if self._nested:
+            # The phase which this phase ran inside of shouldn't count this time, too
+            self._nested[-1] += elapsed
+
+    def get_milliseconds(self):
+        '''dict[str, float]: Get the milliseconds of every phase and of the whole swap, as "total".'''
+        milliseconds = {name: self.phases.get(name, 0.0) * 1000 for name in PHASES}
+        milliseconds['total'] = self.total * 1000
+
+        return milliseconds
+
+
+def phase(name):
+    '''Time every call of a function as a phase of whichever swap is being recorded.
+
+    Args:
+        name (str): The phase which the function runs. See <PHASES>.
+
+    Returns:
+        callable[callable]: A decorator which times a function.
+
+    '''
+    def _decorate(function):
+        @functools.wraps(function)
+        def _timed(*args, **kwargs):
+            if not _ACTIVE:
+                return function(*args, **kwargs)
+
+            record_ = _ACTIVE[-1]
+            started = record_.start()
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record_.stop(name, started)
+
+        return _timed
+
+    return _decorate
+
+
+def count(name, value=1):
+    '''Add to a count of whichever swap is being recorded, like how many calls it collected.'''
+    if _ACTIVE:
+        _ACTIVE[-1].counts[name] += value
+
+
+@contextlib.contextmanager
+def record(keep=True, **info):
+    '''Time each phase of the swap which runs in this context.
+
+    Args:
+        keep (bool, optional):
+            If True, add the record to the history which <get_history>
+            returns, once this context closes.
+        **info (object):
+            A description of the swap, like the number of lines that were swapped.
+
+    Yields:
+        `Record`: The time of each phase. Its total is only set once this context closes.
+
+    '''
+    record_ = Record(info)
+    _ACTIVE.append(record_)
+    started = _clock()
+
+    try:
+        yield record_
+    finally:
+        record_.total = _clock() - started
+        record_.phases['other'] = max(record_.total - sum(record_.phases.values()), 0.0)
+        _ACTIVE.remove(record_)
+
+        if keep:
+            _HISTORY.append(record_)
+
+            while len(_HISTORY) > config.get_timing_history():
+                _HISTORY.popleft()
+
+
+def get_history():
+    '''list[`Record`]: Get the most recently recorded swaps, oldest first.'''
+    return list(_HISTORY)
+
+
+def clear():
+    '''Forget every recorded swap.'''
+    _HISTORY.clear()
+
+
+def get_percentile(values, percentile):
+    '''Find the smallest value which is at least as large as some percent of every value.
+
+    Args:
+        values (iter[float]): The values to search.
+        percentile (float): A percent, from 0 to 100.
+
+    Returns:
+        float: The found value or, if there are no values, 0.
+
+    '''
+    values = sorted(values)
+
+    if not values:
+        return 0.0
+
+    # The nearest-rank method
+    rank = int(-(-len(values) * percentile // 100))
+
+    return values[min(max(rank, 1), len(values)) - 1]
+
+
+def get_percentiles(records, percentiles=PERCENTILES):
+    '''Find the percentiles of each phase's milliseconds, across several swaps.
+
+    Args:
+        records (iter[`Record`]): The recorded swaps.
+        percentiles (iter[int], optional): The percentiles to find, from 0 to 100.
+
+    Returns:
+        dict[int, dict[str, float]]:
+            The milliseconds of every phase and of the whole swaps, as
+            "total", for each percentile.
+
+    '''
+    milliseconds = [record_.get_milliseconds() for record_ in records]
+
+    return {
+        percentile: {
+            name: get_percentile([times[name] for times in milliseconds], percentile)
+            for name in PHASES + ('total', )
+        }
+        for percentile in percentiles
+    }
+
+
+def format_history(records):
+    '''Describe several swaps and the percentiles of their times as a table.
+
+    Args:
+        records (list[`Record`]): The recorded swaps, oldest first.
+
+    Returns:
+        list[str]: Each row of the table. Every time is in milliseconds.
+
+    '''
+    columns = ('total', ) + PHASES
+    template = '{:<12} {:>8} {:>6}' + ' {:>8}' * len(columns)
+    rows = [template.format('swap', 'lines', 'calls', *columns)]
+
+    for record_ in records:
+        times = record_.get_milliseconds()
+        rows.append(template.format(
+            record_.info.get('command', ''),
+            record_.info.get('lines', ''),
+            record_.counts.get('calls', 0),
+            *['{:.2f}'.format(times[name]) for name in columns]
+        ))
+
+    for percentile, times in sorted(get_percentiles(records).items()):
+        rows.append(template.format(
+            'p{percentile}'.format(percentile=percentile),
+            '',
+            '',
+            *['{:.2f}'.format(times[name]) for name in columns]
+        ))
+
+    return rows
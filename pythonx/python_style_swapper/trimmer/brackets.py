@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''A table of matching brackets, built from a single pass of `tokenize`.
+
+astroid doesn't know where a call's closing ")" is. Instead of searching
+forward through the lines for each call, every bracket pair, call and
+argument is found once, up-front. Brackets inside of strings and comments
+are ignored because the table is built from tokens.
+
+'''
+
+# IMPORT LOCAL LIBRARIES
+from . import statement
+from . import locator
+
+
+class BracketTable(object):
+
+    '''Find where brackets and calls close.
+
+    Every position is a (1-based row, 0-based column) pair.
+
+    '''
+
+    def __init__(self, lines, first=1, last=None):
+        '''Tokenize some lines and record every bracket pair.
+
+        If the lines cannot be completely tokenized, every bracket pair up
+        until the error is still recorded.
+
+        Args:
+            lines (list[str]):
+                All lines of some Python file.
+            first (int, optional):
+                The 1-based line to start tokenizing from. This must be the
+                start of a statement.
+            last (int, optional):
+                The 1-based line to stop tokenizing at, inclusive.
+                If no line is given, tokenize to the end of `lines`.
+
+        '''
+        super(BracketTable, self).__init__()
+
+        if last is None:
+            last = len(lines)
+
+        calls, self._pairs = locator.scan_tokens(
+            statement.generate_tokens(lines, first, last),
+            strict=False,
+        )
+
+        self._chains = locator.get_chains(lines, calls)
+
+    def get_closing(self, opening):
+        '''Find the closing bracket of some opening bracket.
+
+        Args:
+            opening (tuple[int, int]): The position of a "(", "[" or "{".
+
+        Returns:
+            tuple[int, int] or NoneType: The position of the matching bracket, if any.
+
+        '''
+        return self._pairs.get(opening)
+
+    def get_call_span(self, start, chain=0):
+        '''Find the tokens of a call.
+
+        Args:
+            start (tuple[int, int]):
+                Where the called expression starts. e.g. where "foo" is in "foo.bar()".
+            chain (int, optional):
+                How many calls come before this call, in the same expression.
+                See <BracketTable.get_call_closing> for details.
+
+        Returns:
+            <locator.CallSpan> or NoneType: The position of the call and of each of its arguments, if any.
+
+        '''
+        try:
+            return self._chains.get(start, [])[chain]
+        except IndexError:
+            return None
+
+    def get_call_closing(self, start, chain=0):
+        '''Find the ")" of a call.
+
+        Args:
+            start (tuple[int, int]):
+                Where the called expression starts. e.g. where "foo" is in "foo.bar()".
+            chain (int, optional):
+                How many calls come before this call, in the same expression.
+                e.g. In `foo(1)(2).bar(3)`, `foo(1)` is 0, `foo(1)(2)` is 1 and
+                `foo(1)(2).bar(3)` is 2.
+
+        Returns:
+            tuple[int, int] or NoneType: The position of the call's ")", if any.
+
+        '''
+        span = self.get_call_span(start, chain=chain)
+
+        if span:
+            return span.closing
+
+        return None
+
+    def __len__(self):
+        '''int: The number of bracket pairs in this table.'''
+        return len(self._pairs)
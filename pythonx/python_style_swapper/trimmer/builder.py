@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Build astroid trees which astroid itself doesn't keep a reference to.
+
+`astroid.parse` stores every module that it builds in `astroid.MANAGER`'s
+module cache. Since every parsed buffer is named "", the first buffer that
+was ever parsed stays in that cache, along with its entire tree, until Vim
+closes. `astroid.parse` also infers the object of every `self.foo = bar`
+assignment, which is never needed to re-print a call.
+
+This module imports astroid as soon as it is imported. Only import it when
+the "astroid" backend is used.
+
+'''
+
+# IMPORT LOCAL LIBRARIES
+from .. import timing
+from . import common
+
+# IMPORT THIRD-PARTY LIBRARIES
+# `common` must be imported first, in case the vendored copy of astroid is needed
+from astroid import builder
+
+
+class SyntaxBuilder(builder.AstroidBuilder):
+
+    '''An astroid builder which only builds syntax trees.
+
+    Unlike <astroid.builder.AstroidBuilder>, built modules aren't cached and
+    nothing is inferred while the module is built. Transforms are still
+    applied, so trees look the same as trees from `astroid.parse`.
+
+    '''
+
+    def _post_build(self, module, *args):
+        '''Finish building a module without caching it or inferring anything.
+
+        Args:
+            module (<astroid.Module>): The module which was just built.
+            *args (str): The encoding of the module's code, which is always the last argument.
+
+        Returns:
+            <astroid.Module>: The finished module.
+
+        '''
+        module.file_encoding = args[-1]
+
+        for node in module._import_from_nodes:
+            if node.modname == '__future__':
+                for symbol, _ in node.names:
+                    module.future_imports.add(symbol)
+
+        if self._apply_transforms:
+            module = self._manager.visit_transforms(module)
+
+        return module
+
+
+@timing.phase('parse')
+def parse(code):
+    '''Parse some code, like `astroid.parse` but without caching or inferring anything.
+
+    Unlike `astroid.parse`, `code` isn't dedented first. Otherwise, code
+    which starts inside of an indented block would be parsed with columns
+    that don't match its lines.
+
+    Args:
+        code (str): The Python code to parse.
+
+    Raises:
+        <astroid.AstroidSyntaxError>: If `code` isn't valid Python.
+
+    Returns:
+        <astroid.Module>: The parsed code.
+
+    '''
+    return SyntaxBuilder().string_build(code)
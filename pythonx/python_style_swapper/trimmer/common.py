@@ -3,6 +3,37 @@
 
 '''Any generic function that is used across multiple modules.'''
 
+# IMPORT STANDARD LIBRARIES
+import sys
+import os
+
+
+# Any functions, by-name, which should not allowed to be made multi-line
+SINGLE_LINE_EXCEPTIONS = ('super', )
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+_VENDORS = os.path.join(_ROOT, 'vendors')
+
+# If astroid isn't installed, the copy that comes with this plugin is used, instead
+if _VENDORS not in sys.path:
+    sys.path.append(_VENDORS)
+
+
+def import_astroid():
+    '''Import astroid, only when it is needed.
+
+    astroid is slow to import and it isn't needed by the "ast" backend.
+    So instead of importing astroid at the top of each module, astroid is
+    imported by the functions that actually use it.
+
+    Returns:
+        module: The astroid package.
+
+    '''
+    import astroid
+
+    return astroid
+
 
 def get_default(text):
     '''Get the default value of some parameter.
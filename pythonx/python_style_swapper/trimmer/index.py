@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''A sorted index of call positions for quickly finding the calls around a cursor.
+
+Calls nest inside of each other but never partially overlap. So calls can be
+stored as a tree where every level is sorted by position and each level can
+be searched with `bisect`. Finding the calls around a cursor takes
+O(depth * log(n)) time instead of checking every call in the file.
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+import bisect
+
+
+# Used as the column of a position when only the row of that position is known
+END_OF_LINE = float('inf')
+
+
+class _Entry(object):
+
+    '''One call in a <CallIndex>.'''
+
+    __slots__ = ('start', 'end', 'depth', 'payload', 'children', 'ends')
+
+    def __init__(self, start, end, depth, payload):
+        '''Create the instance.
+
+        Args:
+            start (tuple[int, int]): The (1-based row, 0-based column) where the call starts.
+            end (tuple[int, int or float]): The (1-based row, 0-based column) where the call ends.
+            depth (int): How many calls this call is nested inside of.
+            payload (object): The call which this entry describes.
+
+        '''
+        super(_Entry, self).__init__()
+        self.start = start
+        self.end = end
+        self.depth = depth
+        self.payload = payload
+        self.children = []
+        self.ends = []
+
+
+def _get_bounds(row, column):
+    '''tuple[tuple, tuple]: Get the lowest and highest positions that `row` and `column` refer to.'''
+    if column is None:
+        return ((row, -1), (row, END_OF_LINE))
+
+    return ((row, column), (row, column))
+
+
+def _find(entries, ends, row, column):
+    '''Find the first entry which contains some position, using a binary search.
+
+    Args:
+        entries (list[`_Entry`]): Sibling entries, sorted by position.
+        ends (list[tuple[int, int]]): The end position of each entry in `entries`.
+        row (int): A 1-based row.
+        column (int or NoneType): A 0-based column. If None, any column in `row` matches.
+
+    Returns:
+        `_Entry` or NoneType: The found entry, if any.
+
+    '''
+    lowest, highest = _get_bounds(row, column)
+    index = bisect.bisect_left(ends, lowest)
+
+    if index < len(entries) and entries[index].start <= highest:
+        return entries[index]
+
+    return None
+
+
+class CallIndex(object):
+
+    '''Find calls by position.
+
+    When a row contains more than one call at the same nesting level, the
+    first call on that row is used unless a column is also given.
+
+    '''
+
+    def __init__(self, calls, get_range):
+        '''Sort and nest some calls.
+
+        Args:
+            calls (iter[object]):
+                The calls to index. These can be any type of object.
+            get_range (callable[object] -> tuple[tuple[int, int], tuple[int, int or float]]):
+                A function that returns the start and end position of a call.
+                If a call's last column is unknown, its end column should be `END_OF_LINE`.
+
+        '''
+        super(CallIndex, self).__init__()
+
+        entries = []
+
+        for call in calls:
+            start, end = get_range(call)
+            entries.append(_Entry(start, end, 0, call))
+
+        entries.sort(key=lambda entry: (entry.start, (-entry.end[0], -entry.end[1])))
+
+        self._entries = entries
+        self._depths = dict()
+        self._starts = [entry.start for entry in entries]
+        self._roots = []
+        self._root_ends = []
+
+        outer = []
+
+        for entry in entries:
+            while outer and outer[-1].end < entry.start:
+                outer.pop()
+
+            entry.depth = len(outer)
+            self._depths[id(entry.payload)] = entry.depth
+
+            if outer:
+                outer[-1].children.append(entry)
+                outer[-1].ends.append(entry.end)
+            else:
+                self._roots.append(entry)
+                self._root_ends.append(entry.end)
+
+            outer.append(entry)
+
+    def _iter_containing(self, row, column=None):
+        '''Yield every entry which contains a position, outer-most entries first.'''
+        entry = _find(self._roots, self._root_ends, row, column)
+
+        while entry:
+            yield entry
+            entry = _find(entry.children, entry.ends, row, column)
+
+    def get_containing(self, row, column=None):
+        '''Find every call which contains some position.
+
+        Args:
+            row (int): A 1-based row.
+            column (int, optional): A 0-based column. If no column is given, any column in `row` matches.
+
+        Returns:
+            list[object]: The found calls, outer-most calls first.
+
+        '''
+        return [entry.payload for entry in self._iter_containing(row, column=column)]
+
+    def get_outermost(self, row, column=None):
+        '''object or NoneType: Find the least-nested call which contains some position.'''
+        for entry in self._iter_containing(row, column=column):
+            return entry.payload
+
+        return None
+
+    def get_innermost(self, row, column=None):
+        '''object or NoneType: Find the most-nested call which contains some position.'''
+        found = None
+
+        for entry in self._iter_containing(row, column=column):
+            found = entry
+
+        if found is None:
+            return None
+
+        return found.payload
+
+    def get_depth(self, call):
+        '''int: Find how many calls `call` is nested inside of.'''
+        try:
+            return self._depths[id(call)]
+        except KeyError:
+            raise ValueError('Call "{call!r}" is not in this index.'.format(call=call))
+
+    def get_calls(self, first=None, last=None):
+        '''Find every call which is entirely within a range of rows.
+
+        Args:
+            first (int, optional): The 1-based row to start searching from. If no row is given, start from the top.
+            last (int, optional): The 1-based row to stop searching at, inclusive. If no row is given, search to the end.
+
+        Returns:
+            list[object]: The found calls, outer-most calls first.
+
+        '''
+        index = 0
+
+        if first is not None:
+            index = bisect.bisect_left(self._starts, (first, -1))
+
+        calls = []
+
+        for entry in self._entries[index:]:
+            if last is not None and entry.start[0] > last:
+                break
+
+            if last is None or entry.end[0] <= last:
+                calls.append(entry.payload)
+
+        return calls
+
+    def __len__(self):
+        '''int: The number of indexed calls.'''
+        return len(self._entries)
@@ -0,0 +1,471 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Find calls and their arguments using only `tokenize`.
+
+Most of the time, the user's cursor is simply inside of a `name(...)` call.
+For that case, the position of the call, its parentheses and each of its
+arguments can all be found by tracking brackets and commas in the token
+stream, which is much cheaper than building an astroid tree.
+
+Whenever the tokens alone cannot be trusted (decorators, lambdas, f-strings
+and the like), <AmbiguousCallError> is raised so that the caller can fall
+back to parsing.
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+import keyword
+import re
+import tokenize
+
+# IMPORT LOCAL LIBRARIES
+from . import statement
+from . import index
+
+
+_ATOM_KEYWORDS = frozenset(('False', 'None', 'True'))
+_KEYWORDS = frozenset(keyword.kwlist) - _ATOM_KEYWORDS
+_DEFINITION_KEYWORDS = frozenset(('class', 'def'))
+_AMBIGUOUS_KEYWORDS = frozenset(('lambda', ))
+_OPENING_BRACKETS = frozenset('([{')
+_CLOSING_BRACKETS = frozenset(')]}')
+_TRAILER_ENDINGS = frozenset(')]}')
+_STRING_PREFIX = re.compile(r'^[a-zA-Z]*')
+_SKIPPED_TOKENS = frozenset((
+    tokenize.DEDENT,
+    tokenize.INDENT,
+    tokenize.NEWLINE,
+    tokenize.NL,
+))
+
+
+class AmbiguousCallError(ValueError):
+
+    '''An exception that is raised when tokens alone can't describe some call.'''
+
+    pass
+
+
+class CallSpan(object):
+
+    '''The position of a call and each of its arguments.
+
+    Every position is a (1-based row, 0-based column) pair.
+
+    Attributes:
+        name (str):
+            The last name before the call's parentheses. e.g. "bar" in "foo.bar()".
+            If the call isn't made on a name, this is an empty string.
+        start (tuple[int, int]):
+            Where the called expression starts. e.g. where "foo" is in "foo.bar()".
+        opening (tuple[int, int]): Where the call's "(" is.
+        closing (tuple[int, int]): Where the call's ")" is.
+        arguments (list[tuple[tuple[int, int], tuple[int, int]]]):
+            The start and (exclusive) end of each argument in the call.
+        depth (int): How many calls this call is nested inside of.
+        has_comments (bool): If there are any comments between the call's parentheses.
+        has_generator (bool): If an argument is an unparenthesized generator expression.
+
+    '''
+
+    def __init__(self, name, start, opening, depth=0):
+        '''Create the instance.
+
+        Args:
+            name (str): The last name before the call's parentheses.
+            start (tuple[int, int]): Where the called expression starts.
+            opening (tuple[int, int]): Where the call's "(" is.
+            depth (int, optional): How many calls this call is nested inside of.
+
+        '''
+        super(CallSpan, self).__init__()
+        self.name = name
+        self.start = start
+        self.opening = opening
+        self.closing = None
+        self.arguments = []
+        self.depth = depth
+        self.has_comments = False
+        self.has_generator = False
+
+    @property
+    def fromlineno(self):
+        '''int: The 1-based line where this call starts.'''
+        return self.start[0]
+
+    @property
+    def tolineno(self):
+        '''int: The 1-based line where this call's ")" is.'''
+        return self.closing[0]
+
+    def contains(self, row, column=None):
+        '''bool: Check if a 1-based row (and optionally, a 0-based column) is in this call.'''
+        if column is None:
+            return self.fromlineno <= row <= self.tolineno
+
+        return self.start <= (row, column) <= self.closing
+
+    def __repr__(self):
+        '''str: A description of this instance.'''
+        return '{self.__class__.__name__}({self.name!r}, {self.start!r}, {self.closing!r})'.format(self=self)
+
+
+class _Bracket(object):
+
+    '''A bracket that was opened but hasn't been closed yet.'''
+
+    def __init__(self, opening, call=None):
+        '''Create the instance.
+
+        Args:
+            opening (tuple[int, int]): The position of this bracket.
+            call (`CallSpan`, optional): The call that this bracket belongs to, if any.
+
+        '''
+        super(_Bracket, self).__init__()
+        self.opening = opening
+        self.call = call
+        self.argument_start = None
+        self.argument_end = None
+        self.lambdas = 0
+        self.is_target = False
+
+    def end_argument(self):
+        '''Add the current argument to this bracket's call.'''
+        if self.argument_start is not None:
+            self.call.arguments.append((self.argument_start, self.argument_end))
+
+        self.argument_start = None
+
+
+def _is_f_string(text):
+    '''bool: Check if a STRING token is an f-string.'''
+    return 'f' in _STRING_PREFIX.match(text).group().lower()
+
+
+def _is_trailer_ending(type_, text):
+    '''bool: Check if a token can be followed by a "(" which calls it.'''
+    if type_ == tokenize.NAME:
+        return text not in _KEYWORDS
+
+    return type_ == tokenize.STRING or text in _TRAILER_ENDINGS
+
+
+def _sort_calls(calls):
+    '''Sort calls so that outer calls come first and set how deeply nested each call is.
+
+    Calls are found in the order of their "(", which puts `foo(bar)` before
+    `foo(bar).fizz(buzz)` even though the first call is a part of the second.
+
+    Args:
+        calls (list[`CallSpan`]): The calls to sort. This list is modified in-place.
+
+    '''
+    calls.sort(key=lambda call: (call.start, (-call.closing[0], -call.closing[1])))
+    outer = []
+
+    for call in calls:
+        while outer and outer[-1].closing < call.start:
+            outer.pop()
+
+        call.depth = len(outer)
+        outer.append(call)
+
+
+def scan_tokens(tokens, strict=True):
+    '''Find every call and every pair of brackets in some tokens.
+
+    Args:
+        tokens (iter[tuple]):
+            The tokens to scan, usually of one logical statement.
+        strict (bool, optional):
+            If True, raise an exception for anything that this module
+            can't handle. If False, keep going and return whatever could be
+            found, instead.
+
+    Raises:
+        AmbiguousCallError: If `strict` and the tokens contain anything that this module can't handle.
+
+    Returns:
+        tuple[list[`CallSpan`], dict[tuple[int, int], tuple[int, int]]]:
+            Every call in `tokens`, outer-most calls first, and the
+            position of every closing bracket, by the position of its
+            opening bracket.
+
+    '''
+    calls = []
+    pairs = dict()
+    brackets = []
+    chains = [None]
+    previous = (None, None)
+    previous_end = None
+    is_definition = False
+
+    try:
+        for type_, text, start, end, _ in tokens:
+            if type_ in _SKIPPED_TOKENS or type_ == tokenize.ENDMARKER:
+                continue
+
+            if type_ == tokenize.ERRORTOKEN:
+                if strict:
+                    raise AmbiguousCallError('Token "{text}" could not be read.'.format(text=text))
+
+                continue
+
+            if type_ == tokenize.COMMENT:
+                for bracket in brackets:
+                    if bracket.call:
+                        bracket.call.has_comments = True
+
+                continue
+
+            if strict and (
+                    (type_ == tokenize.OP and text == '@' and previous == (None, None))
+                    or text in _AMBIGUOUS_KEYWORDS
+                    or (type_ == tokenize.STRING and _is_f_string(text))
+            ):
+                raise AmbiguousCallError('Token "{text}" must be parsed.'.format(text=text))
+
+            if text in _CLOSING_BRACKETS and type_ == tokenize.OP:
+                if not brackets:
+                    if strict:
+                        raise AmbiguousCallError('Bracket "{text}" was never opened.'.format(text=text))
+
+                    continue
+
+                bracket = brackets.pop()
+                chains.pop()
+                pairs[bracket.opening] = start
+
+                if bracket.call:
+                    bracket.call.closing = start
+                    bracket.end_argument()
+
+            current = brackets[-1] if brackets else None
+
+            if current and current.call:
+                # A comma in a lambda's parameters, like `lambda x, y: x`, or
+                # in a generator's targets, like `x for x, y in z`, doesn't end an argument
+                #
+                if text == ',' and type_ == tokenize.OP and not current.lambdas and not current.is_target:
+                    current.end_argument()
+                else:
+                    if current.argument_start is None:
+                        current.argument_start = start
+                    elif text == 'for' and type_ == tokenize.NAME:
+                        current.call.has_generator = True
+                        current.is_target = True
+                    elif text == 'in' and type_ == tokenize.NAME:
+                        current.is_target = False
+
+                    if text == 'lambda' and type_ == tokenize.NAME:
+                        current.lambdas += 1
+                    elif text == ':' and type_ == tokenize.OP and current.lambdas:
+                        current.lambdas -= 1
+
+                    current.argument_end = end
+
+            if text in _OPENING_BRACKETS and type_ == tokenize.OP:
+                call = None
+
+                if text == '(' and not is_definition and _is_trailer_ending(*previous):
+                    name = previous[1] if previous[0] == tokenize.NAME else ''
+                    call = CallSpan(name, chains[-1] or start, start)
+                    calls.append(call)
+                elif not _is_trailer_ending(*previous):
+                    chains[-1] = start
+
+                brackets.append(_Bracket(start, call=call))
+                chains.append(None)
+            elif type_ in (tokenize.NAME, tokenize.NUMBER, tokenize.STRING):
+                is_chained = previous[1] == '.' or (type_ == tokenize.STRING and previous[0] == tokenize.STRING)
+                is_atom = type_ != tokenize.NAME or text not in _KEYWORDS
+
+                if is_atom and not is_chained:
+                    chains[-1] = start
+
+            is_definition = type_ == tokenize.NAME and previous[1] in _DEFINITION_KEYWORDS
+            previous = (type_, text)
+            previous_end = end
+    except (tokenize.TokenError, SyntaxError):
+        if strict:
+            raise
+
+    if strict and (brackets or previous_end is None):
+        raise AmbiguousCallError('The statement is incomplete.')
+
+    calls = [call for call in calls if call.closing]
+    _sort_calls(calls)
+
+    return (calls, pairs)
+
+
+def get_inner_starts(lines, start):
+    '''Find where an expression starts, from outside and from inside of each parenthesis that wraps it.
+
+    The tokens of `(foo)(bar)` say that its call starts at "(" but parsers
+    say that it starts at "foo". Either position may be used to look up the call.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        start (tuple[int, int]): The (1-based row, 0-based column) where the expression starts.
+
+    Returns:
+        list[tuple[int, int]]: `start`, followed by the start inside of each wrapping "(".
+
+    '''
+    starts = [start]
+    row, column = start
+
+    while row <= len(lines) and lines[row - 1][column:column + 1] == '(':
+        column += 1
+
+        while True:
+            line = lines[row - 1]
+            column = len(line) - len(line[column:].lstrip())
+
+            # Comments and line continuations end a line before its last character
+            if column < len(line) and line[column] not in '#\\':
+                break
+
+            if row == len(lines):
+                return starts
+
+            row += 1
+            column = 0
+
+        starts.append((row, column))
+
+    return starts
+
+
+def get_chains(lines, calls):
+    '''Group calls by where their called expressions start.
+
+    Calls which share a start are chained, like `foo(1)(2).bar(3)`. Each
+    call is also grouped under every start inside of the parentheses that
+    wrap its start. See <get_inner_starts>.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        calls (iter[`CallSpan`]): The calls to group.
+
+    Returns:
+        dict[tuple[int, int], list[`CallSpan`]]:
+            Each start and the calls which start there, in the order that
+            they are called. e.g. In `(foo(1))(2)`, "foo" has `foo(1)`
+            followed by `(foo(1))(2)`.
+
+    '''
+    chains = dict()
+
+    for call in calls:
+        chains.setdefault(call.start, []).append(call)
+
+    groups = dict()
+
+    for start, chain in chains.items():
+        for inner in get_inner_starts(lines, start):
+            groups.setdefault(inner, []).extend(chain)
+
+    for chain in groups.values():
+        chain.sort(key=lambda call: call.opening)
+
+    return groups
+
+
+def get_calls(lines, first, last):
+    '''Find every call in a logical statement.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        first (int): The 1-based line where the statement starts.
+        last (int): The 1-based line where the statement ends.
+
+    Raises:
+        AmbiguousCallError: If the statement contains anything that this module can't handle.
+
+    Returns:
+        list[`CallSpan`]: Every call in the statement, outer-most calls first.
+
+    '''
+    try:
+        calls, _ = scan_tokens(statement.generate_tokens(lines, first, last))
+    except (tokenize.TokenError, SyntaxError):
+        raise AmbiguousCallError('Lines "{first}-{last}" could not be tokenized.'.format(first=first, last=last))
+
+    return calls
+
+
+def _is_inside_string(lines, row, tokens):
+    '''bool: Check if `row` only has the text of a multi-line string, which no call is written on.'''
+    for type_, _, start, end, _ in tokens:
+        if start[0] >= row:
+            return False
+
+        if type_ == tokenize.STRING and end[0] >= row:
+            if end[0] > row:
+                return True
+
+            # The string ends on `row`, maybe followed by more code, like a closing parenthesis
+            rest = lines[row - 1][end[1]:].strip()
+
+            return not rest or rest.startswith('#')
+
+    return False
+
+
+def get_nearest_call(lines, row, column=None, innermost=False, range_=None):
+    '''Find the call which contains some row, using only tokens.
+
+    Args:
+        lines (list[str]):
+            All lines of some Python file.
+        row (int):
+            The 1-based row which the call must contain.
+        column (int, optional):
+            A 0-based column which the call must also contain. If no column
+            is given, any call which spans `row` is found.
+        innermost (bool, optional):
+            If True, find the most nested call which contains `row`.
+            If False, find the least nested call which contains `row`.
+            See <index.CallIndex> for details.
+        range_ (tuple[int, int] or object, optional):
+            The statement which contains `row`, if it was already found.
+            See <statement.get_statement_range> for details.
+
+    Raises:
+        AmbiguousCallError: If the call must be found by parsing, instead.
+
+    Returns:
+        `CallSpan` or NoneType:
+            The found call, if any. If `row` is inside of a multi-line
+            string, no call is written on it, so None is returned.
+
+    '''
+    if range_ is None:
+        range_ = statement.get_statement_range(lines, row)
+
+    if range_ is statement.OUTSIDE:
+        return None
+
+    if not range_:
+        raise AmbiguousCallError('No statement could be found for row "{row}".'.format(row=row))
+
+    try:
+        tokens = list(statement.generate_tokens(lines, *range_))
+    except (tokenize.TokenError, SyntaxError):
+        raise AmbiguousCallError(
+            'Lines "{first}-{last}" could not be tokenized.'.format(first=range_[0], last=range_[1]))
+
+    if _is_inside_string(lines, row, tokens):
+        return None
+
+    calls, _ = scan_tokens(tokens)
+    calls = index.CallIndex(calls, lambda call: (call.start, call.closing))
+
+    if innermost:
+        return calls.get_innermost(row, column=column)
+
+    return calls.get_outermost(row, column=column)
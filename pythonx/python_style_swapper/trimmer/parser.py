@@ -4,56 +4,251 @@
 '''A series of helpers that are used to parse Python callable objects.'''
 
 # IMPORT STANDARD LIBRARIES
-import functools
 import re
 
-# IMPORT THIRD-PARTY LIBRARIES
-try:
-    from astroid import as_string
-    import astroid
-except ImportError:
-    import sys
-    import os
+# IMPORT LOCAL LIBRARIES
+from .. import timing
+from . import brackets
+from . import common
+from . import index
 
-    _ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
-    sys.path.append(os.path.join(_ROOT, 'vendors'))
 
-    from astroid import as_string
-    import astroid
+_LINE_ENDING = re.compile(r'\):*(?:\s*#[\w\s]*)?$')
+# The astroid node types which can never have a call inside of them
+_LEAF_NODES = (
+    'AssignName',
+    'Break',
+    'Const',
+    'Continue',
+    'DelName',
+    'Global',
+    'Import',
+    'ImportFrom',
+    'Name',
+    'Nonlocal',
+    'Pass',
+)
+# The function which visits each type of astroid node. See <get_calls>
+_HANDLERS = dict()
 
-# IMPORT LOCAL LIBRARIES
-from . import common
 
+def get_start(node):
+    '''int: Get the 1-based line where a statement starts, including its decorators.'''
+    decorators = getattr(node, 'decorators', None)
+
+    if decorators:
+        return min(node.fromlineno, decorators.fromlineno)
+
+    return node.fromlineno
+
+
+def _get_children(node, row, last):
+    '''Find the children of a node which could contain some row.
+
+    astroid doesn't know which line a statement really ends on but, within a
+    block, a statement always ends before the next statement starts. So any
+    statement which starts after `row` or which is followed by a statement
+    that starts before `row` is skipped, along with everything inside of it.
+
+    Args:
+        node (<astroid.NodeNG>): The node whose children will be checked.
+        row (int or NoneType): The 1-based row to check for. If None, every child is found.
+        last (int or NoneType): The last 1-based row that `node` could span, if it's known.
+
+    Returns:
+        list[tuple[<astroid.NodeNG>, int or NoneType]]:
+            Each child which wasn't skipped and the last row that it could span.
+
+    '''
+    children = list(node.get_children())
+
+    if row is None:
+        return [(child, None) for child in children]
+
+    output = []
+
+    for index, child in enumerate(children):
+        if not child.is_statement:
+            output.append((child, last))
+
+            continue
+
+        if get_start(child) > row:
+            continue
+
+        end = last
+
+        if index + 1 < len(children) and children[index + 1].is_statement:
+            # `foo(); bar()` has 2 statements on the same row, so `end` is inclusive
+            end = get_start(children[index + 1])
+
+        if end is None or end >= row:
+            output.append((child, end))
+
+    return output
+
+
+@timing.phase('walk')
+def get_calls(node, row=None, last=None):
+    '''Find the calls inside of some node, without recursion.
+
+    Args:
+        node (<astroid.NodeNG>):
+            The node to search within.
+        row (int, optional):
+            A 1-based row which the calls should be near. If given, any
+            statement which can't contain `row` isn't searched. Otherwise,
+            every call is found.
+        last (int, optional):
+            The last 1-based row that `node` could span, if it's known.
+
+    Returns:
+        list[<astroid.Call>]: The found calls, outer-most calls first, in the order of the source code.
+
+    '''
+    handlers = _get_handlers()
+    calls = []
+    stack = [(node, last)]
+
+    # Deeply nested code, like generated code, would exceed the recursion limit of a recursive visitor
+    while stack:
+        node, last = stack.pop()
+        handler = handlers.get(type(node), _visit)
+
+        if handler(node, calls):
+            stack.extend(reversed(_get_children(node, row, last)))
+
+    timing.count('calls', len(calls))
+
+    return calls
+
+
+def _visit(node, calls):
+    '''bool: Search inside of any node which isn't a call.'''
+    return True
+
+
+def _visit_call(node, calls):
+    '''bool: Add a call to `calls` and search inside of it.'''
+    calls.append(node)
+
+    return True
+
+
+def _visit_leaf(node, calls):
+    '''bool: Don't search inside a node which can't contain a call.'''
+    return False
+
+
+def _get_handlers():
+    '''dict[type, callable[<astroid.NodeNG>, list[<astroid.Call>]]]: Choose what each type of node does.'''
+    if _HANDLERS:
+        return _HANDLERS
+
+    astroid = common.import_astroid()
+
+    for name in _LEAF_NODES:
+        # Some node types only exist in some versions of Python
+        if hasattr(astroid, name):
+            _HANDLERS[getattr(astroid, name)] = _visit_leaf
+
+    _HANDLERS[astroid.Call] = _visit_call
 
-class CallVisitor(object):
+    return _HANDLERS
 
-    '''A node vistor that finds all calls for a given node.'''
 
-    def __init__(self):
-        '''Create the instance and make a container for <astroid.Call> nodes.'''
-        super(CallVisitor, self).__init__()
-        self.expressions = []
+def get_statement_types():
+    '''tuple[type]: Get the statements whose value may be a call, like `return foo(bar)`.'''
+    astroid = common.import_astroid()
 
-    def visit(self, node):
-        '''Visit the given Node's children.
+    # Some node types only exist in some versions of Python
+    return tuple(
+        getattr(astroid, name) for name in ('AnnAssign', 'Assign', 'AugAssign', 'Expr', 'Return')
+        if hasattr(astroid, name)
+    )
 
-        Args:
-            (<astroid.Node>): The node to visit.
 
-        '''
-        for child in node.get_children():
-            try:
-                child.accept(self)
-            except AttributeError:
-                self.visit(child)
+def _get_call(node):
+    '''<astroid.Call> or NoneType: Get the call that `node` refers to, if any.'''
+    astroid = common.import_astroid()
 
-    def visit_call(self, node):
-        '''Add the found <astroid.Call> node to the current instance.'''
-        self.expressions.append(node)
-        self.visit(node)
+    if isinstance(node, get_statement_types()):
+        node = node.value
 
+    if isinstance(node, astroid.Call):
+        return node
 
-def get_tolineno(node, lines):
+    return None
+
+
+def _get_chain(node):
+    '''int: Count the calls that come before the <astroid.Call> `node` in the same expression.'''
+    astroid = common.import_astroid()
+
+    # e.g. `foo(1)(2).bar(3)` is called after `foo(1)(2)`, which is called after `foo(1)`
+    chain = 0
+    expression = node.func
+
+    while True:
+        if isinstance(expression, astroid.Call):
+            chain += 1
+            expression = expression.func
+        elif isinstance(expression, astroid.Attribute):
+            expression = expression.expr
+        elif isinstance(expression, astroid.Subscript):
+            expression = expression.value
+        else:
+            return chain
+
+
+def get_span(node, brackets):
+    '''Find the tokens of a call, so it can be re-written from slices of its source code.
+
+    Args:
+        node (<astroid.Call> or <astroid.Assign>):
+            The call to check. If `node` assigns a call, that call is used.
+        brackets (<brackets.BracketTable>):
+            Every bracket in the code that `node` was parsed from.
+
+    Returns:
+        <locator.CallSpan> or NoneType:
+            The position of the call and each of its arguments. If `node`
+            isn't a call or its position isn't in `brackets`, return None.
+
+    '''
+    node = _get_call(node)
+
+    if not node:
+        return None
+
+    return brackets.get_call_span((node.fromlineno, node.col_offset), chain=_get_chain(node))
+
+
+def get_closing(node, brackets):
+    '''Find the position of the ")" of a call.
+
+    Args:
+        node (<astroid.Call> or <astroid.Assign>):
+            The call to check. If `node` assigns a call, that call is used.
+        brackets (<brackets.BracketTable>):
+            Every bracket in the code that `node` was parsed from.
+
+    Returns:
+        tuple[int, int] or NoneType:
+            The (1-based row, 0-based column) of the call's ")". If `node`
+            isn't a call or its position isn't in `brackets`, return None.
+
+    '''
+    span = get_span(node, brackets)
+
+    if span:
+        return span.closing
+
+    return None
+
+
+@timing.phase('tolineno')
+def get_tolineno(node, lines, brackets=None):
     '''Find the 'tolineno' of an astroid node.
 
     I'm not sure if this is a bug but astroid doesn't properly give the line numbers
@@ -73,15 +268,26 @@ def get_tolineno(node, lines):
     This function exists to correct that mistake.
 
     Args:
-        node (<astroid.Call>): A called object to parse.
-        lines (list[str]): The lines of source code that `node` is a part of.
+        node (<astroid.Call>):
+            A called object to parse.
+        lines (list[str]):
+            The lines of source code that `node` is a part of.
+        brackets (<brackets.BracketTable>, optional):
+            Every bracket in `lines`. If given, the ending line is looked up
+            from this table. Otherwise, or if `node` isn't in the table,
+            `lines` are searched for a line that ends with ")".
 
     Returns:
         int: The found ending line number. If the line number could not be parsed,
              this function returns back -1, instead.
 
     '''
-    _LINE_ENDING = re.compile('\):*(?:\s*#[\w\s]*)?$')
+    if brackets is not None:
+        closing = get_closing(node, brackets)
+
+        if closing:
+            return closing[0]
+
     # tolineno is 1-based so subtract 1
     zeroed_lineno = node.tolineno - 1
 
@@ -98,33 +304,72 @@ def get_tolineno(node, lines):
     return -1
 
 
+def get_call_range(node, lines, brackets=None):
+    '''Get the start and end position of a call, for <index.CallIndex>.
+
+    Args:
+        node (<astroid.Call>):
+            The call to get the position of.
+        lines (list[str]):
+            The lines of source code that `node` is a part of.
+        brackets (<brackets.BracketTable>, optional):
+            Every bracket in `lines`. See <get_tolineno> for details.
+
+    Returns:
+        tuple[tuple[int, int], tuple[int, int or float]]:
+            The (1-based row, 0-based column) where `node` starts and ends.
+            If the column of the call's ")" isn't known, the end column is
+            `index.END_OF_LINE`.
+
+    '''
+    start = (node.fromlineno, node.col_offset)
+
+    if brackets is not None:
+        closing = get_closing(node, brackets)
+
+        if closing:
+            return (start, closing)
+
+    return (start, (get_tolineno(node, lines), index.END_OF_LINE))
+
+
+def get_call_index(calls, lines, brackets=None):
+    '''<index.CallIndex>: Sort some calls by their position in `lines`.'''
+    astroid = common.import_astroid()
+
+    return index.CallIndex(
+        (node for node in calls if isinstance(node, astroid.Call)),
+        lambda node: get_call_range(node, lines, brackets=brackets),
+    )
+
+
 def get_nearest_call(code, row):
     '''Find the node in some code that is closest to the given row.
 
+    Note:
+        This function parses `code` every time that it is called. If you need
+        to look up more than one thing in the same code, use
+        <session.Session> instead.
+
     Args:
         code (str): The Python code to parse.
-        row (int): The 0-based row where the Call objects is expected to be.
+        row (int): The 1-based row where the Call objects is expected to be.
 
     Returns:
         <astroid.Call> or NoneType: The found node, if any.
 
     '''
-    node = astroid.parse(code)
-    visitor = CallVisitor()
-    visitor.visit(node)
+    # This module imports astroid, which isn't needed by the "ast" backend
+    from . import builder
 
+    node = builder.parse(code)
     lines = code.split('\n')
 
-    get_real_tolineno = functools.partial(get_tolineno, lines=lines)
-
-    for node in visitor.expressions:
-        if isinstance(node, astroid.Call):
-            tolineno = get_real_tolineno(node)
-            is_row_on_single_line_call = (node.fromlineno == tolineno and row == node.fromlineno)
-            is_row_within_multi_line_call = (node.fromlineno != tolineno and row >= node.fromlineno and row <= tolineno)
-
-            if is_row_on_single_line_call or is_row_within_multi_line_call:
-                return node
+    return get_call_index(
+        get_calls(node, row=row),
+        lines,
+        brackets=brackets.BracketTable(lines),
+    ).get_outermost(row)
 
 
 def get_parameter_info(script):
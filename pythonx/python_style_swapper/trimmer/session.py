@@ -0,0 +1,430 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''A parse-once container which is shared by every step of a single swap.
+
+Finding a call, rendering it and splicing it back into the original code all
+need the same parsed module and the same list of lines. Rather than each step
+re-parsing the code, they all read from one <Session>.
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+import bisect
+
+# IMPORT LOCAL LIBRARIES
+from .. import config
+from . import brackets
+from . import common
+from . import statement
+from . import locator
+from . import syntax
+from . import parser
+from . import index
+
+_AMBIGUOUS = object()
+# Roughly how many bytes an astroid tree uses, for each character of parsed code
+_PARSED_SIZE_RATIO = 60
+
+
+class Session(object):
+
+    '''The parsed state of some Python code.
+
+    Everything is computed lazily and, once computed, is kept for the lifetime
+    of the instance.
+
+    Attributes:
+        code (str): The Python code that this instance describes.
+        lines (list[str]): `code`, split into separate lines.
+        scope (str):
+            How much of `code` is parsed to find a call.
+            See <config.get_parse_scope> for details.
+        backend (str):
+            What parses `code`, whenever its tokens aren't enough.
+            See <config.get_backend> for details.
+        indent (str):
+            The indentation of each argument of a multi-line call.
+            See <config.get_indent_preference> for details.
+
+    '''
+
+    def __init__(self, code, scope='', backend='', indent=''):
+        '''Store the code that will be parsed.
+
+        Args:
+            code (str):
+                The Python code to parse.
+            scope (str, optional):
+                How much of `code` is parsed to find a call. If no scope is
+                given, the user's preferred scope is used.
+            backend (str, optional):
+                What parses `code`, whenever its tokens aren't enough. If no
+                backend is given, the user's preferred backend is used.
+            indent (str, optional):
+                The indentation of each argument of a multi-line call. If no
+                indent is given, the user's preferred indent is used.
+
+        '''
+        super(Session, self).__init__()
+        self.code = code
+        self.lines = code.split('\n')
+        self.scope = scope or config.get_parse_scope()
+        self.backend = backend or config.get_backend()
+        self.indent = indent or config.get_indent_preference()
+
+        self._module = None
+        self._calls = None
+        self._index = None
+        self._starts = None
+        self._statement_ranges = dict()
+        self._statements = dict()
+        self._ranges = dict()
+        self._brackets = dict()
+        self._tolinenos = dict()
+        self._nearest = dict()
+        self._spans = dict()
+        self._syntax_spans = dict()
+        self._syntax_module = None
+        self._syntax_calls = dict()
+        self._parsed_characters = 0
+
+    @property
+    def module(self):
+        '''<astroid.Module>: The parsed code. It is only parsed once.'''
+        if self._module is None:
+            # This module imports astroid, which isn't needed by the "ast" backend
+            from . import builder
+
+            self._module = builder.parse(self.code)
+            self._parsed_characters += len(self.code)
+
+        return self._module
+
+    @property
+    def calls(self):
+        '''list[<astroid.Call>]: Every call in the module, outer-most calls first.'''
+        if self._calls is None:
+            self._calls = parser.get_calls(self.module)
+
+        return self._calls
+
+    @property
+    def index(self):
+        '''<index.CallIndex>: Every call in the module, sorted by position.'''
+        if self._index is None:
+            self._index = self._make_index(self.calls)
+
+        return self._index
+
+    def _make_index(self, calls):
+        '''<index.CallIndex>: Sort some calls from this instance's code by their position.'''
+        return index.CallIndex(
+            calls,
+            lambda node: parser.get_call_range(node, self.lines, brackets=self.get_brackets(node)),
+        )
+
+    def get_statement_range(self, row):
+        '''Find the logical statement which contains some row. It is only searched for once.
+
+        Args:
+            row (int): The 1-based row to search from.
+
+        Returns:
+            tuple[int, int] or object or NoneType:
+                The 1-based first and last lines of the statement.
+                See <statement.get_statement_range> for details.
+
+        '''
+        try:
+            return self._statement_ranges[row]
+        except KeyError:
+            range_ = statement.get_statement_range(self.lines, row)
+            self._statement_ranges[row] = range_
+
+            return range_
+
+    def _get_statement_index(self, row):
+        '''Parse only the statement around `row` and index its calls.
+
+        Args:
+            row (int): The 1-based row to get a statement for.
+
+        Returns:
+            <index.CallIndex> or NoneType:
+                Every call in the statement, sorted by position. If `row`
+                isn't part of any statement, the index is empty. If the
+                statement could not be found or parsed, return None.
+
+        '''
+        range_ = self.get_statement_range(row)
+
+        if range_ is statement.OUTSIDE:
+            return self._make_index([])
+
+        if not range_:
+            return None
+
+        try:
+            return self._statements[range_]
+        except KeyError:
+            pass
+
+        astroid = common.import_astroid()
+
+        try:
+            module = statement.parse(self.lines, *range_)
+        except astroid.AstroidSyntaxError:
+            calls = None
+        else:
+            self._parsed_characters += sum(len(line) for line in self.lines[range_[0] - 1:range_[1]])
+            self._ranges[id(module)] = range_
+            calls = self._make_index(parser.get_calls(module))
+
+        self._statements[range_] = calls
+
+        return calls
+
+    def _get_block(self, row):
+        '''Find the top-level statement of the module which contains some row.
+
+        Args:
+            row (int): The 1-based row which the statement must contain.
+
+        Returns:
+            tuple[int, int, int] or NoneType:
+                The statement's index in the module's body and the first and
+                last 1-based rows that it could span. If `row` comes before
+                every statement, return None.
+
+        '''
+        if self._starts is None:
+            self._starts = [parser.get_start(node) for node in self.module.body]
+
+        position = bisect.bisect_right(self._starts, row) - 1
+
+        if position < 0:
+            return None
+
+        first = self._starts[position]
+        last = len(self.lines)
+
+        if position + 1 < len(self._starts):
+            # `foo(); bar()` has 2 statements on the same row, so the next row is inclusive
+            last = max(first, self._starts[position + 1] - 1)
+
+        return (position, first, last)
+
+    def _get_block_index(self, row):
+        '''Index only the calls of the module which could contain `row`.
+
+        Args:
+            row (int): The 1-based row to find calls for.
+
+        Returns:
+            <index.CallIndex>:
+                The calls of the top-level statement which contains `row`,
+                except for the calls of any inner statement which can't.
+
+        '''
+        block = self._get_block(row)
+
+        if not block:
+            return self._make_index([])
+
+        position, _, last = block
+
+        return self._make_index(parser.get_calls(self.module.body[position], row=row, last=last))
+
+    def get_brackets(self, node):
+        '''Get every bracket in the code that `node` was parsed from.
+
+        Only the lines that were parsed are tokenized. So a node from a
+        single statement only tokenizes that statement, not the whole file.
+        A node from the whole module only tokenizes its top-level statement.
+
+        Args:
+            node (<astroid.NodeNG>): Some node from this instance's code.
+
+        Returns:
+            <brackets.BracketTable>: The brackets of the parsed lines.
+
+        '''
+        range_ = self._ranges.get(id(node.root()))
+
+        if range_ is None:
+            # Only tokenize the top-level statement of the module which `node` is in
+            block = self._get_block(node.fromlineno)
+            range_ = block[1:] if block else (1, len(self.lines))
+
+        try:
+            return self._brackets[range_]
+        except KeyError:
+            table = brackets.BracketTable(self.lines, *range_)
+            self._brackets[range_] = table
+
+            return table
+
+    def get_size(self):
+        '''int: Estimate how many bytes this instance uses.
+
+        The estimate counts the code, its lines and every astroid tree that
+        has been built so far. It is meant for enforcing cache limits, not
+        for precise measurement.
+
+        '''
+        return len(self.code) * 2 + self._parsed_characters * _PARSED_SIZE_RATIO
+
+    def get_span(self, node):
+        '''<locator.CallSpan> or NoneType: Find the tokens of a parsed call. See <parser.get_span>.'''
+        return parser.get_span(node, self.get_brackets(node))
+
+    def get_tolineno(self, node):
+        '''int: Find the real, 1-based ending line of `node`. See <parser.get_tolineno>.'''
+        try:
+            return self._tolinenos[node]
+        except KeyError:
+            tolineno = parser.get_tolineno(node, self.lines, brackets=self.get_brackets(node))
+            self._tolinenos[node] = tolineno
+
+            return tolineno
+
+    def get_nearest_call(self, row, column=None):
+        '''Find the call which is closest to the given row.
+
+        Args:
+            row (int): The 1-based row where the call is expected to be.
+            column (int, optional): A 0-based column which the call must contain, if any.
+
+        Returns:
+            <astroid.Call> or NoneType: The found node, if any.
+
+        '''
+        try:
+            return self._nearest[(row, column)]
+        except KeyError:
+            calls = None
+
+            if self.scope == config.STATEMENT_SCOPE:
+                calls = self._get_statement_index(row)
+
+            if calls is None:
+                calls = self._get_block_index(row)
+
+            node = calls.get_outermost(row, column=column)
+            self._nearest[(row, column)] = node
+
+            return node
+
+    def get_call_span(self, row, column=None):
+        '''Find the call which is closest to the given row, without parsing.
+
+        Args:
+            row (int): The 1-based row where the call is expected to be.
+            column (int, optional): A 0-based column which the call must contain, if any.
+
+        In module scope, the whole module is parsed anyway, so the call and
+        its span always come from the module itself instead of a statement
+        that was searched for. See <Session.get_nearest_call>.
+
+        Raises:
+            <locator.AmbiguousCallError>:
+                If the call can only be found by parsing.
+                Use <Session.get_nearest_call> instead.
+
+        Returns:
+            <locator.CallSpan> or NoneType: The found call, if any.
+
+        '''
+        if self.scope == config.MODULE_SCOPE:
+            raise locator.AmbiguousCallError('Row "{row}" is found by parsing the whole module.'.format(row=row))
+
+        try:
+            span = self._spans[(row, column)]
+        except KeyError:
+            try:
+                span = locator.get_nearest_call(self.lines, row, column=column, range_=self.get_statement_range(row))
+            except locator.AmbiguousCallError:
+                span = _AMBIGUOUS
+
+            self._spans[(row, column)] = span
+
+        if span is _AMBIGUOUS:
+            raise locator.AmbiguousCallError('Row "{row}" must be parsed.'.format(row=row))
+
+        return span
+
+    @property
+    def syntax_module(self):
+        '''<ast.Module>: The code, parsed with `ast`. It is only parsed once.'''
+        if self._syntax_module is None:
+            self._syntax_module = syntax.parse(self.lines, 1, len(self.lines))
+
+        return self._syntax_module
+
+    def _get_syntax_calls(self, row):
+        '''Find the calls around `row` with `ast`, re-using earlier parses whenever possible.
+
+        Args:
+            row (int): The 1-based row which the calls must be near.
+
+        Raises:
+            SyntaxError: If the code around `row` cannot be parsed.
+
+        Returns:
+            <index.CallIndex>: The calls of the statement or top-level block which contains `row`.
+
+        '''
+        if self.scope == config.STATEMENT_SCOPE:
+            range_ = self.get_statement_range(row)
+
+            if range_ is statement.OUTSIDE:
+                return syntax.make_index([])
+
+            if range_:
+                key = ('statement', range_)
+
+                if key not in self._syntax_calls:
+                    try:
+                        calls = syntax.get_calls(self.lines, *range_)
+                    except SyntaxError:
+                        # e.g. A decorator can't be parsed without the definition below it
+                        self._syntax_calls[key] = None
+                    else:
+                        self._syntax_calls[key] = syntax.make_index(calls)
+
+                if self._syntax_calls[key] is not None:
+                    return self._syntax_calls[key]
+
+        block = syntax.get_block_range(self.lines, self.syntax_module, row)
+        key = ('block', block[:2] if block else None)
+
+        if key not in self._syntax_calls:
+            self._syntax_calls[key] = syntax.make_index(syntax.get_spans(self.lines, *block) if block else [])
+
+        return self._syntax_calls[key]
+
+    def get_syntax_span(self, row, column=None):
+        '''Find the call which is closest to the given row, by parsing with `ast`.
+
+        The whole code is parsed at most once, no matter how many rows are
+        searched, and the calls of each statement are only found once.
+
+        Args:
+            row (int): The 1-based row where the call is expected to be.
+            column (int, optional): A 0-based column which the call must contain, if any.
+
+        Raises:
+            SyntaxError: If the code around `row` cannot be parsed.
+
+        Returns:
+            <locator.CallSpan> or NoneType: The found call, if any.
+
+        '''
+        try:
+            return self._syntax_spans[(row, column)]
+        except KeyError:
+            span = self._get_syntax_calls(row).get_outermost(row, column=column)
+            self._syntax_spans[(row, column)] = span
+
+            return span
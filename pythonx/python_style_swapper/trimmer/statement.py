@@ -0,0 +1,672 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Find and parse only the logical statement which surrounds some row.
+
+Parsing a whole file gets slower as the file gets larger even though a swap
+only ever changes one statement. The functions in this module find the lines
+of the statement under the user's cursor, using `tokenize`, and parse just
+those lines. Every parsed node keeps the line numbers that it would have had
+if the whole file was parsed.
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+import functools
+import tokenize
+import re
+
+# IMPORT LOCAL LIBRARIES
+from .. import timing
+from . import common
+
+
+MAX_LOOKBEHIND = 200
+MAX_LOOKAHEAD = 1000
+WINDOW_SIZE = 32
+# The statement "range" of a row which isn't part of any statement, like a blank line
+OUTSIDE = object()
+
+_OPENING_BRACKETS = frozenset('([{')
+_CLOSING_BRACKETS = frozenset(')]}')
+_IGNORED_TOKENS = frozenset((
+    tokenize.COMMENT,
+    tokenize.DEDENT,
+    tokenize.INDENT,
+    tokenize.NL,
+))
+# If the line above ends with any of these, the current line must be a continuation
+_CONTINUATION_ENDINGS = tuple('\\,([{')
+_TRIPLE_QUOTES = ("'''", '"""')
+# A statement which starts with one of these continues the compound statement above it
+_CLAUSE = re.compile(r'(elif|else|except|finally)\b')
+
+
+def _is_code(line):
+    '''bool: Check if `line` could start a statement. Blank lines and comments can't.'''
+    text = line.strip()
+
+    return bool(text) and not text.startswith('#')
+
+
+def _is_continuation(lines, index):
+    '''bool: Check if the 0-based `index` line obviously continues an earlier line.'''
+    line = lines[index].lstrip()
+
+    if line and line[0] in _CLOSING_BRACKETS:
+        return True
+
+    if not index:
+        return False
+
+    return lines[index - 1].rstrip().endswith(_CONTINUATION_ENDINGS)
+
+
+def _iter_lines(lines, index, stop):
+    '''Yield each line from the 0-based `index` until `stop`, with newlines added.'''
+    for line in lines[index:stop]:
+        yield line + '\n'
+
+
+def generate_tokens(lines, first, last):
+    '''Tokenize some lines of a Python file.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        first (int): The 1-based line to start tokenizing from.
+        last (int): The 1-based line to stop tokenizing at, inclusive.
+
+    Raises:
+        tokenize.TokenError: If `last` is reached in the middle of a statement.
+
+    Yields:
+        tuple[int, str, tuple[int, int], tuple[int, int], str]:
+            Each token's type, text, start, end and physical line. Every start
+            and end row is a 1-based row of `lines`.
+
+    '''
+    readline = functools.partial(next, _iter_lines(lines, first - 1, last), '')
+    offset = first - 1
+
+    for type_, text, (start_row, start_column), (end_row, end_column), line in \
+            tokenize.generate_tokens(readline):
+        yield (
+            type_,
+            text,
+            (start_row + offset, start_column),
+            (end_row + offset, end_column),
+            line,
+        )
+
+
+def _get_opening_line(text, quote, position, index):
+    '''Find the line where a string opens, if no earlier string is still open at the start of that line.
+
+    A line like `''', '''` closes one string and opens another, so it's
+    never the start of a statement. The line which opened the earlier
+    string is used instead.
+
+    Args:
+        text (str): Every line above `index`, joined by newlines.
+        quote (str): The triple quote which opens the string.
+        position (int): The index of the string's opening quote in `text`.
+        index (int): The 0-based line which comes right after `text`.
+
+    Returns:
+        int: The 0-based line where the string, or an earlier string on the same line, opens.
+
+    '''
+    while True:
+        start = text.rfind('\n', 0, position) + 1
+
+        if not text.count(quote, 0, start) % 2:
+            return index - 1 - text.count('\n', position)
+
+        position = text.rfind(quote, 0, start)
+
+
+def _find_last_string(lines, index):
+    '''Find the last multi-line string above some line, by counting triple quotes from the first line.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        index (int): The 0-based line to find the string above.
+
+    Returns:
+        tuple[int, int or NoneType] or NoneType:
+            The 0-based lines where the string opens and closes, if there
+            are any strings. If `index` may be inside of the string, the
+            closing line is None.
+
+    '''
+    text = '\n'.join(lines[:index])
+    strings = []
+
+    for quote in _TRIPLE_QUOTES:
+        count = text.count(quote)
+
+        if not count:
+            continue
+
+        # The quotes are usually close to `index`, so count the lines below them
+        end = text.rfind(quote)
+        last = index - 1 - text.count('\n', end)
+
+        if count % 2:
+            strings.append((_get_opening_line(text, quote, end, index), None))
+        else:
+            strings.append((_get_opening_line(text, quote, text.rfind(quote, 0, end), index), last))
+
+    if not strings:
+        return None
+
+    unclosed = [string for string in strings if string[1] is None]
+
+    if unclosed:
+        return min(unclosed)
+
+    return max(strings, key=lambda string: string[1])
+
+
+def _iter_tokens(lines, index, last):
+    '''Tokenize from a possible statement start and yield every token that a statement is made of.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        index (int): The 0-based line to start tokenizing from.
+        last (int): The 1-based line to stop tokenizing at, inclusive.
+
+    Yields:
+        tuple[int, str, int]:
+            Each token's type, text and 1-based starting row. Tokens stop as
+            soon as they show that `index` isn't the start of a statement or
+            once `last` is reached.
+
+    '''
+    depth = 0
+
+    try:
+        for type_, text, (start, _), _, _ in generate_tokens(lines, index + 1, last):
+            if type_ in _IGNORED_TOKENS:
+                continue
+
+            if type_ in (tokenize.ERRORTOKEN, tokenize.ENDMARKER):
+                return
+
+            if text in _OPENING_BRACKETS:
+                depth += 1
+            elif text in _CLOSING_BRACKETS:
+                depth -= 1
+
+                if depth < 0:
+                    return
+
+            yield (type_, text, start)
+    except (tokenize.TokenError, SyntaxError):
+        # `SyntaxError` includes `IndentationError`, which tokenize raises
+        # when a dedent doesn't match the indentation of the starting line.
+        #
+        return
+
+
+def _is_decorator(lines, row):
+    '''bool: Check if the logical line which starts on the 1-based `row` is a decorator.'''
+    return lines[row - 1].lstrip().startswith('@')
+
+
+def _iter_logical_lines(lines, index, last):
+    '''Tokenize from a statement start and yield the lines of every logical line, from top to bottom.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        index (int): The 0-based line where a statement starts.
+        last (int): The 1-based line to stop tokenizing at, inclusive.
+
+    Yields:
+        tuple[int, int]: The 1-based first and last lines of each logical line.
+
+    '''
+    first = None
+
+    for type_, _, start in _iter_tokens(lines, index, last):
+        if type_ == tokenize.NEWLINE:
+            yield (first, start)
+            first = None
+        elif first is None:
+            first = start
+
+
+def _iter_statements(lines, index, last):
+    '''Tokenize from a statement start and yield the lines of that statement and of every statement after it.
+
+    A decorator can't be parsed on its own, so its statement continues
+    through the header of the function or class that it decorates.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        index (int): The 0-based line where a statement starts.
+        last (int): The 1-based line to stop tokenizing at, inclusive.
+
+    Yields:
+        tuple[int, int]: The 1-based first and last lines of each statement, from top to bottom.
+
+    '''
+    decorator = None
+
+    for first, end in _iter_logical_lines(lines, index, last):
+        if _is_decorator(lines, first):
+            decorator = decorator or first
+        else:
+            yield (decorator or first, end)
+            decorator = None
+
+
+def _find_statement_from(lines, index, row):
+    '''Tokenize from a possible statement start and find the statement containing `row`.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        index (int): The 0-based line to start tokenizing from.
+        row (int): The 1-based row which the statement must contain.
+
+    Returns:
+        tuple[int, int] or object or NoneType:
+            The 1-based first and last lines of the statement. If `row` is
+            between two statements, return `OUTSIDE`. If `index` is not the
+            start of a statement, return None.
+
+    '''
+    first = None
+    decorator = None
+
+    for type_, _, start in _iter_tokens(lines, index, row + MAX_LOOKAHEAD):
+        if type_ == tokenize.NEWLINE:
+            if _is_decorator(lines, first):
+                # The statement continues through the definition below. See <_iter_statements>
+                decorator = decorator or first
+            elif (decorator or first) <= row <= start:
+                return (decorator or first, start)
+            else:
+                decorator = None
+
+            first = None
+
+            continue
+
+        if first is None:
+            if start > row and decorator is None:
+                # `row` is a blank or comment-only line
+                return OUTSIDE
+
+            first = start
+
+    return None
+
+
+def _search_upwards(lines, index, stop, row):
+    '''Tokenize from every possible statement start, going up from `index`, until the statement of `row` is found.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        index (int): The 0-based line to start searching from.
+        stop (int): The 0-based line to stop searching at, exclusive.
+        row (int): The 1-based row which the statement must contain.
+
+    Returns:
+        tuple[int, tuple[int, int] or object] or NoneType:
+            The 0-based line that was tokenized from and the statement, if one was found.
+
+    '''
+    for index in range(index, stop, -1):
+        # A statement can't start on a blank line, a comment or a continued line
+        if not _is_code(lines[index]) or _is_continuation(lines, index):
+            continue
+
+        statement = _find_statement_from(lines, index, row)
+
+        if statement:
+            # If `statement` is OUTSIDE, tokenizing from a real start went
+            # past `row` between two statements. Any start further up
+            # would only tokenize the same lines again, to find the same thing
+            #
+            return (index, statement)
+
+    return None
+
+
+def _search_statement(lines, row):
+    '''Find the logical statement which contains some row and where tokenizing started.
+
+    A line inside of a multi-line string looks like code, too. So a start is
+    only trusted if there are no multi-line strings above it or if
+    tokenizing the statement of the last of those strings shows that the
+    string ends above the start. Otherwise, the search starts again from the
+    line which opened that string.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        row (int): The 1-based row to search from.
+
+    Returns:
+        tuple[int, tuple[int, int] or object] or NoneType:
+            The 0-based line that was tokenized from and the 1-based first
+            and last lines of the statement, if one was found. If `row`
+            isn't part of any statement, the lines are `OUTSIDE`, instead.
+
+    '''
+    if row < 1 or row > len(lines):
+        return None
+
+    stop = max(row - 1 - MAX_LOOKBEHIND, -1)
+    found = _search_upwards(lines, row - 1, stop, row)
+
+    if found:
+        string = _find_last_string(lines, found[0])
+
+        if not string:
+            return found
+
+        # The string may start above `MAX_LOOKBEHIND`, like a module's
+        # docstring, so search from it for as far up as it takes
+        #
+        opening, closing = string
+
+        if closing is not None:
+            enclosing = _search_upwards(lines, opening, -1, closing + 1)
+
+            if enclosing and enclosing[1] is not OUTSIDE and enclosing[1][1] <= found[0]:
+                return found
+
+        return _search_upwards(lines, opening, -1, row)
+
+    if not any(_is_code(line) for line in lines[stop + 1:row]):
+        # Only blank lines and comments, back to the search limit
+        return (stop + 1, OUTSIDE)
+
+    return None
+
+
+def get_statement_range(lines, row):
+    '''Find the logical statement which contains some row.
+
+    A logical statement may span many lines because of brackets,
+    multi-line strings or backslash continuations.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        row (int): The 1-based row to search from.
+
+    Returns:
+        tuple[int, int] or object or NoneType:
+            The 1-based first and last lines of the statement. If `row` is
+            a blank line or a comment between statements, return `OUTSIDE`.
+            If no statement could be found within `MAX_LOOKBEHIND` lines of
+            `row`, return None.
+
+    '''
+    found = _search_statement(lines, row)
+
+    if not found:
+        return None
+
+    return found[1]
+
+
+def iter_statement_ranges(lines, first, last):
+    '''Find every logical statement between two rows.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        first (int):
+            The 1-based row to start searching from. If this row is in the
+            middle of a statement, that whole statement is included.
+        last (int): The 1-based row to stop searching at, inclusive.
+
+    Yields:
+        tuple[int, int]: The 1-based first and last lines of each statement, from top to bottom.
+
+    '''
+    row = max(first, 1)
+    last = min(last, len(lines))
+
+    while row <= last:
+        if not _is_code(lines[row - 1]):
+            row += 1
+
+            continue
+
+        found = _search_statement(lines, row)
+
+        if not found or found[1] is OUTSIDE:
+            row += 1
+
+            continue
+
+        # Tokenize once, from the start that was found, instead of searching
+        # again for every statement. If the tokens stop making sense, like in
+        # the middle of an edit, search again from the next statement
+        #
+        start = row
+
+        for range_ in _iter_statements(lines, found[0], len(lines)):
+            if range_[0] > last:
+                return
+
+            if range_[1] >= start:
+                yield range_
+                row = range_[1] + 1
+
+        row = max(row, start + 1)
+
+
+def get_top_level_start(lines, row):
+    '''Find where the top-level statement which contains some row starts.
+
+    A top-level statement isn't indented, so the lines from its first row
+    onward can be parsed without the rest of the file. The decorators of a
+    function and clauses like `else:` belong to the statement above them.
+
+    Args:
+        lines (sequence[str]): All lines of some Python file.
+        row (int): The 1-based row which the statement must contain.
+
+    Returns:
+        int: The 1-based first row of the statement. If no statement could be found, 1 is returned.
+
+    '''
+    found = None
+
+    for number in range(row, 0, -1):
+        line = lines[number - 1]
+
+        if not _is_code(line) or line[0].isspace() or line[0] in _CLOSING_BRACKETS:
+            continue
+
+        if found is not None:
+            if not line.startswith('@'):
+                break
+
+            found = number
+
+            continue
+
+        # Text which isn't indented may still be inside of a string or a bracket
+        range_ = get_statement_range(lines, number)
+
+        if range_ and range_ is not OUTSIDE and range_[0] == number and not _CLAUSE.match(line):
+            found = number
+
+    return found or 1
+
+
+def get_complete_end(lines, row):
+    '''Find the last row that must be parsed along with the statement of some row.
+
+    A decorator can't be parsed without the definition below it and the
+    header of a compound statement, like `if foo:`, needs the first
+    statement of its body.
+
+    Args:
+        lines (sequence[str]): All lines of some Python file.
+        row (int): The 1-based row of the statement.
+
+    Returns:
+        int: The 1-based last row to parse. If no statement could be found, `row` is returned.
+
+    '''
+    end = row
+
+    # A decorator's statement already ends with the header of its definition
+    for _, last in iter_statement_ranges(lines, row, len(lines)):
+        end = last
+
+        if not lines[last - 1].split('#')[0].rstrip().endswith(':'):
+            break
+
+    return end
+
+
+def get_window(lines, row, size=WINDOW_SIZE):
+    '''Copy only the lines around `row` which are needed to find its statement.
+
+    `lines` only needs to support `len` and slicing, like a Vim buffer, so
+    that only the copied lines are ever read. The window starts `size` lines
+    above and below `row` and doubles until the whole statement that
+    contains `row` is inside it, without touching the edges of the window.
+
+    If `row` isn't part of any statement, like a blank line between two
+    functions, the window stops growing as soon as that is known. If no
+    statement could be found, the window stops growing once it is larger
+    than the most lines that <get_statement_range> would search through, anyway.
+
+    Args:
+        lines (sequence[str]): All lines of some Python file.
+        row (int): The 1-based row to search from.
+        size (int, optional): How many lines above and below `row` to copy, at first.
+
+    Returns:
+        tuple[list[str], int]:
+            The copied lines and how many lines of `lines` come before them.
+
+    '''
+    total = len(lines)
+
+    while True:
+        first = max(row - size, 1)
+        last = min(row + size, total)
+        window = lines[first - 1:last]
+
+        if first == 1 and last == total:
+            return (window, 0)
+
+        found = _search_statement(window, row - first + 1)
+
+        if found:
+            index, range_ = found
+
+            # The first line of the window can't be checked for being a
+            # continuation of the line above it so it can't be trusted to
+            # start a statement. And the statement might continue past the
+            # last line of the window. But `OUTSIDE` was found by reading
+            # past `row`, inside of the window, so its end is always known.
+            #
+            if (first == 1 or index > 0) and (
+                    range_ is OUTSIDE or last == total or range_[1] < len(window)):
+                return (window, first - 1)
+        elif size > MAX_LOOKBEHIND + MAX_LOOKAHEAD:
+            return (window, first - 1)
+
+        size *= 2
+
+
+def dedent(lines, first, last):
+    '''Copy the lines of a statement, without the indentation that the statement starts with.
+
+    Usually only the first line is dedented. Any later lines are inside of
+    brackets, strings or continuations so their indentation doesn't matter.
+    But a decorator's statement has the definition below it as another
+    logical line, which must be dedented, too. See <_iter_statements>.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        first (int): The 1-based line where the statement starts.
+        last (int): The 1-based line where the statement ends.
+
+    Returns:
+        tuple[list[str], list[int]]:
+            The copied lines and how many characters were removed from the
+            start of each line.
+
+    '''
+    code = lines[first - 1:last]
+    prefix = code[0][:len(code[0]) - len(code[0].lstrip())]
+    removed = [0] * len(code)
+    starts = [first]
+
+    if _is_decorator(lines, first) and last > first:
+        starts = [start for start, _ in _iter_logical_lines(lines, first - 1, last)]
+
+    for start in starts:
+        if code[start - first].startswith(prefix):
+            code[start - first] = code[start - first][len(prefix):]
+            removed[start - first] = len(prefix)
+
+    return (code, removed)
+
+
+def _get_nodes(node):
+    '''Yield `node` and every node below it.'''
+    stack = [node]
+
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.get_children())
+
+
+@timing.phase('parse')
+def parse(lines, first, last):
+    '''Parse a statement as if it were still part of the file that it came from.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        first (int): The 1-based line where the statement starts.
+        last (int): The 1-based line where the statement ends.
+
+    Raises:
+        astroid.AstroidSyntaxError: If the statement cannot be parsed on its own.
+
+    Returns:
+        <astroid.Module>:
+            The parsed statement. Every node's `lineno` and `col_offset`
+            match the position of that node in `lines`.
+
+    '''
+    astroid = common.import_astroid()
+    statement, removed = dedent(lines, first, last)
+
+    if statement[-1].split('#')[0].rstrip().endswith(':'):
+        # A compound statement's header, like `if foo(bar):`, needs a body
+        statement.append('    pass')
+
+    # This module imports astroid, which isn't needed by the "ast" backend
+    from . import builder
+
+    module = builder.parse('\n'.join(statement))
+    offset = first - 1
+
+    for node in _get_nodes(module):
+        if isinstance(node, astroid.Module):
+            continue
+
+        if node.lineno is not None:
+            if node.lineno <= len(removed) and node.col_offset is not None:
+                node.col_offset += removed[node.lineno - 1]
+
+            node.lineno += offset
+
+        # In case something read these properties while the module was built
+        node.__dict__.pop('fromlineno', None)
+        node.__dict__.pop('tolineno', None)
+
+    return module
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Find calls by parsing with the standard library's `ast` module.
+
+This is the "ast" backend. `ast` parses much faster than astroid and needs
+no brain plugins, transforms or module cache. It is used whenever the tokens
+of a statement alone can't be trusted (decorators, lambdas, f-strings and the
+like), to make sure that the statement is valid Python and that each call
+that the tokens describe is a real call.
+
+Calls are still returned as <locator.CallSpan> objects so they are rendered
+from slices of the original source code, not from the parsed tree.
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+import bisect
+import ast
+
+# IMPORT LOCAL LIBRARIES
+from .. import timing
+from . import statement
+from . import locator
+from . import index
+
+
+def _encode(text):
+    '''bytes: Get `text` as UTF-8 bytes. Python 2 lines are already bytes.'''
+    if isinstance(text, bytes):
+        return text
+
+    return text.encode('utf-8')
+
+
+def _get_column(line, offset):
+    '''Convert a column from `ast`, which counts UTF-8 bytes, into a column of characters.
+
+    Args:
+        line (str): The line which contains the column.
+        offset (int): The 0-based UTF-8 byte offset of a node in `line`.
+
+    Returns:
+        int: The 0-based character column of the node.
+
+    '''
+    if isinstance(line, bytes):
+        # Python 2 lines are already bytes so `tokenize` counts bytes, too
+        return offset
+
+    return len(_encode(line)[:offset].decode('utf-8', 'replace'))
+
+
+def _get_chain(node):
+    '''int: Count the calls that come before `node` in the same expression. e.g. `foo(1)(2)` is 1.'''
+    chain = 0
+    expression = node.func
+
+    while True:
+        if isinstance(expression, ast.Call):
+            chain += 1
+            expression = expression.func
+        elif isinstance(expression, (ast.Attribute, ast.Subscript)):
+            expression = expression.value
+        else:
+            return chain
+
+
+@timing.phase('parse')
+def parse(lines, first, last):
+    '''Parse a statement with `ast`, as if it were still part of the file that it came from.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        first (int): The 1-based line where the statement starts.
+        last (int): The 1-based line where the statement ends.
+
+    Raises:
+        SyntaxError: If the statement cannot be parsed on its own.
+
+    Returns:
+        <ast.Module>:
+            The parsed statement. Every node's `lineno` matches the position
+            of that node in `lines`. Columns are left as UTF-8 byte offsets.
+
+    '''
+    # Only whitespace is removed, so the removed characters are also the removed bytes
+    code, removed = statement.dedent(lines, first, last)
+
+    if code[-1].split('#')[0].rstrip().endswith(':'):
+        # A compound statement's header, like `if foo(bar):`, needs a body
+        code.append('    pass')
+
+    module = ast.parse('\n'.join(code))
+    offset = first - 1
+
+    if not offset and not any(removed):
+        return module
+
+    for node in ast.walk(module):
+        if getattr(node, 'lineno', None) is None:
+            continue
+
+        if node.lineno <= len(removed):
+            node.col_offset += removed[node.lineno - 1]
+
+        node.lineno += offset
+
+        if getattr(node, 'end_lineno', None) is not None:
+            node.end_lineno += offset
+
+    return module
+
+
+def _get_start(node):
+    '''int: Get the 1-based line where a statement starts, including its decorators.'''
+    return min([node.lineno] + [decorator.lineno for decorator in getattr(node, 'decorator_list', [])])
+
+
+@timing.phase('walk')
+def get_spans(lines, first, last, node):
+    '''Find the calls in some lines that `ast` agrees are calls.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        first (int): The 1-based line where the statement starts.
+        last (int): The 1-based line where the statement ends.
+        node (<ast.AST>): The parsed statement.
+
+    Returns:
+        list[<locator.CallSpan>]: Every call in `node`, outer-most calls first.
+
+    '''
+    starts = set()
+
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call):
+            column = _get_column(lines[child.lineno - 1], child.col_offset)
+            starts.add(((child.lineno, column), _get_chain(child)))
+
+    spans, _ = locator.scan_tokens(statement.generate_tokens(lines, first, last), strict=False)
+    calls = set()
+
+    for start, chain in locator.get_chains(lines, spans).items():
+        for position, span in enumerate(chain):
+            if (start, position) in starts:
+                calls.add(span)
+
+    calls = list(calls)
+    calls.sort(key=lambda span: (span.start, (-span.closing[0], -span.closing[1])))
+    timing.count('calls', len(calls))
+
+    return calls
+
+
+def get_calls(lines, first, last):
+    '''Find every call in a logical statement.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        first (int): The 1-based line where the statement starts.
+        last (int): The 1-based line where the statement ends.
+
+    Raises:
+        SyntaxError: If the statement cannot be parsed on its own.
+
+    Returns:
+        list[<locator.CallSpan>]: Every call in the statement, outer-most calls first.
+
+    '''
+    return get_spans(lines, first, last, parse(lines, first, last))
+
+
+def get_block_range(lines, module, row):
+    '''Find the top-level statement of a parsed module which contains some row.
+
+    Args:
+        lines (list[str]): All lines of some Python file.
+        module (<ast.Module>): All of `lines`, parsed by <parse>.
+        row (int): The 1-based row which the statement must contain.
+
+    Returns:
+        tuple[int, int, <ast.AST>] or NoneType:
+            The 1-based first and last lines of the statement, including its
+            decorators, and the statement's node. If `row` comes before every
+            statement, return None.
+
+    '''
+    starts = [_get_start(node) for node in module.body]
+    position = bisect.bisect_right(starts, row) - 1
+
+    if position < 0:
+        return None
+
+    if position + 1 < len(starts):
+        last = starts[position + 1] - 1
+    else:
+        last = len(lines)
+
+    return (starts[position], last, module.body[position])
+
+
+def make_index(calls):
+    '''<index.CallIndex>: Sort some calls by their position.'''
+    return index.CallIndex(calls, lambda call: (call.start, call.closing))
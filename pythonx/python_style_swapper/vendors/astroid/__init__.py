@@ -62,6 +62,7 @@ from astroid import inference
 # more stuff available
 from astroid import raw_building
 from astroid.bases import BaseInstance, Instance, BoundMethod, UnboundMethod
+from astroid import node_classes
 from astroid.node_classes import are_exclusive, unpack_infer
 from astroid.scoped_nodes import builtin_lookup
 from astroid.builder import parse, extract_node
@@ -147,10 +148,49 @@ def register_module_extender(manager, module_name, get_extension_mod):
 
 # load brain plugins
 BRAIN_MODULES_DIR = os.path.join(os.path.dirname(__file__), 'brain')
-if BRAIN_MODULES_DIR not in sys.path:
-    # add it to the end of the list so user path take precedence
-    sys.path.append(BRAIN_MODULES_DIR)
-# load modules in this directory
-for module in os.listdir(BRAIN_MODULES_DIR):
-    if module.endswith('.py'):
-        __import__(module[:-3])
+# Importing with ASTROID_SYNTAX_ONLY=0 loads the brain plugins and builds
+# the builtins module right away. Otherwise, both are deferred until
+# something is inferred, which makes importing much faster for code that
+# only needs syntax trees.
+SYNTAX_ONLY = os.environ.get('ASTROID_SYNTAX_ONLY', '1') != '0'
+_BRAIN_STATE = {'loaded': False}
+
+
+def load_brain_plugins():
+    """Import every brain plugin, once.
+
+    Modules which were parsed before the plugins were loaded are visited by
+    the plugins' transforms, too. Trees that aren't in MANAGER's cache
+    never get the plugins' transforms.
+    """
+    if _BRAIN_STATE['loaded']:
+        return
+    _BRAIN_STATE['loaded'] = True
+
+    built = [module for module in dict.values(MANAGER.astroid_cache)
+             if module.pure_python]
+
+    if BRAIN_MODULES_DIR not in sys.path:
+        # add it to the end of the list so user path take precedence
+        sys.path.append(BRAIN_MODULES_DIR)
+    # load modules in this directory
+    for module in os.listdir(BRAIN_MODULES_DIR):
+        if module.endswith('.py'):
+            __import__(module[:-3])
+
+    for module in built:
+        MANAGER.visit_transforms(module)
+
+
+def prepare_inference():
+    """Build the builtins module and load the brain plugins, if needed.
+
+    This is called automatically the first time that anything is inferred.
+    """
+    node_classes._INFERENCE_STATE['prepared'] = True
+    raw_building.bootstrap()
+    load_brain_plugins()
+
+
+if not SYNTAX_ONLY:
+    prepare_inference()
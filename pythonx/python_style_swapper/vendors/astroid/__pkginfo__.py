@@ -7,11 +7,9 @@
 
 """astroid packaging information"""
 
+import sys
 from sys import version_info as py_version
 
-from pkg_resources import parse_version
-from setuptools import __version__ as setuptools_version
-
 distname = 'astroid'
 
 modname = 'astroid'
@@ -30,15 +28,19 @@ def has_environment_marker_range_operators_support():
     The first known release to support environment marker with range operators
     it is 17.1, see: https://setuptools.readthedocs.io/en/latest/history.html#id113
     """
+    from pkg_resources import parse_version
+    from setuptools import __version__ as setuptools_version
     return parse_version(setuptools_version) >= parse_version('17.1')
 
 
-if has_environment_marker_range_operators_support():
-    extras_require[':python_version<"3.4"'] = ['enum34>=1.1.3',
-                                               'singledispatch',
-                                               'backports.functools_lru_cache']
-else:
-    if py_version < (3, 4):
+# Importing setuptools is slow and the requirements are only needed when
+# packaging, in which case setuptools is already imported.
+if 'setuptools' in sys.modules:
+    if has_environment_marker_range_operators_support():
+        extras_require[':python_version<"3.4"'] = ['enum34>=1.1.3',
+                                                   'singledispatch',
+                                                   'backports.functools_lru_cache']
+    elif py_version < (3, 4):
         install_requires.extend(['enum34',
                                  'singledispatch',
                                  'backports.functools_lru_cache'])
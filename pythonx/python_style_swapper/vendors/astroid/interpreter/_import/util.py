@@ -1,12 +1,12 @@
 # Copyright (c) 2016 Claudiu Popa <pcmanticore@gmail.com>
 
-try:
-    import pkg_resources
-except ImportError:
-    pkg_resources = None
-
 
 def is_namespace(modname):
+    # pkg_resources is slow to import and it's only needed to resolve imports,
+    # so it is imported the first time that it is needed.
+    try:
+        import pkg_resources
+    except ImportError:
+        return False
     # pylint: disable=no-member; astroid issue #290, modifying globals at runtime.
-    return (pkg_resources is not None
-            and modname in pkg_resources._namespace_packages)
+    return modname in pkg_resources._namespace_packages
@@ -31,6 +31,34 @@ def safe_repr(obj):
         return '???'
 
 
+_BUILTINS_NAME = six.moves.builtins.__name__
+
+
+class _AstroidCache(dict):
+    """a cache of modules which builds the builtins module the first time
+    that it is looked up
+    """
+
+    def _bootstrap(self, modname):
+        if modname == _BUILTINS_NAME and not dict.__contains__(self, modname):
+            from astroid import raw_building
+            raw_building.bootstrap()
+
+    def __missing__(self, modname):
+        self._bootstrap(modname)
+        if dict.__contains__(self, modname):
+            return dict.__getitem__(self, modname)
+        raise KeyError(modname)
+
+    def __contains__(self, modname):
+        self._bootstrap(modname)
+        return dict.__contains__(self, modname)
+
+    def get(self, modname, default=None):
+        self._bootstrap(modname)
+        return dict.get(self, modname, default)
+
+
 class AstroidManager(object):
     """the astroid manager, responsible to build astroid from files
      or modules.
@@ -45,7 +73,7 @@ class AstroidManager(object):
         self.__dict__ = AstroidManager.brain
         if not self.__dict__:
             # NOTE: cache entries are added by the [re]builder
-            self.astroid_cache = {}
+            self.astroid_cache = _AstroidCache()
             self._mod_file_cache = {}
             self._failed_import_hooks = []
             self.always_load_extensions = False
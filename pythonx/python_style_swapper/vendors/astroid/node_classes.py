@@ -33,6 +33,15 @@ from astroid import util
 
 BUILTINS = six.moves.builtins.__name__
 MANAGER = manager.AstroidManager()
+_INFERENCE_STATE = {'prepared': False}
+
+
+def _prepare_inference():
+    """load what inference needs (see astroid.prepare_inference), the first
+    time that anything is inferred
+    """
+    import astroid
+    astroid.prepare_inference()
 
 
 @decorators.raise_if_nothing_inferred
@@ -288,6 +297,9 @@ class NodeNG(object):
         :returns: The inferred values.
         :rtype: iterable
         """
+        if not _INFERENCE_STATE['prepared']:
+            _prepare_inference()
+
         if self._explicit_inference is not None:
             # explicit_inference is not bound, give it self explicitly
             try:
@@ -390,28 +390,53 @@ def _astroid_bootstrapping(astroid_builtin=None):
         else:
             _CONST_PROXY[cls] = proxy
 
-_astroid_bootstrapping()
-
 # TODO : find a nicer way to handle this situation;
 # However __proxied introduced an
 # infinite recursion (see https://bugs.launchpad.net/pylint/+bug/456870)
 def _set_proxied(const):
+    bootstrap()
     return _CONST_PROXY[const.value.__class__]
 nodes.Const._proxied = property(_set_proxied)
 
-_GeneratorType = nodes.ClassDef(types.GeneratorType.__name__, types.GeneratorType.__doc__)
-_GeneratorType.parent = MANAGER.astroid_cache[six.moves.builtins.__name__]
-bases.Generator._proxied = _GeneratorType
-Astroid_BUILDER.object_build(bases.Generator._proxied, types.GeneratorType)
-
-_builtins = MANAGER.astroid_cache[six.moves.builtins.__name__]
 BUILTIN_TYPES = (types.GetSetDescriptorType, types.GeneratorType,
                  types.MemberDescriptorType, type(None), type(NotImplemented),
                  types.FunctionType, types.MethodType,
                  types.BuiltinFunctionType, types.ModuleType, types.TracebackType)
-for _type in BUILTIN_TYPES:
-    if _type.__name__ not in _builtins:
-        cls = nodes.ClassDef(_type.__name__, _type.__doc__)
-        cls.parent = MANAGER.astroid_cache[six.moves.builtins.__name__]
-        Astroid_BUILDER.object_build(cls, _type)
-        _builtins[_type.__name__] = cls
+
+
+def _build_builtin_types():
+    """add the types which aren't in the builtins module to the builtins module"""
+    _GeneratorType = nodes.ClassDef(types.GeneratorType.__name__, types.GeneratorType.__doc__)
+    _GeneratorType.parent = MANAGER.astroid_cache[six.moves.builtins.__name__]
+    bases.Generator._proxied = _GeneratorType
+    Astroid_BUILDER.object_build(bases.Generator._proxied, types.GeneratorType)
+
+    _builtins = MANAGER.astroid_cache[six.moves.builtins.__name__]
+    for _type in BUILTIN_TYPES:
+        if _type.__name__ not in _builtins:
+            cls = nodes.ClassDef(_type.__name__, _type.__doc__)
+            cls.parent = MANAGER.astroid_cache[six.moves.builtins.__name__]
+            Astroid_BUILDER.object_build(cls, _type)
+            _builtins[_type.__name__] = cls
+
+
+_BOOTSTRAP_STATE = {'started': False}
+
+
+def bootstrap():
+    """build the builtins module, the first time that it is needed
+
+    Building the builtins module is slow and only inference needs it, so
+    it is deferred until then, unless astroid was imported with
+    ASTROID_SYNTAX_ONLY=0.
+    """
+    if _BOOTSTRAP_STATE['started']:
+        return
+    _BOOTSTRAP_STATE['started'] = True
+    _astroid_bootstrapping()
+    _build_builtin_types()
+
+
+def is_bootstrapped():
+    """check if the builtins module was built"""
+    return _BOOTSTRAP_STATE['started']
@@ -1,12 +1,27 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+# IMPORT STANDARD LIBRARIES
+import functools
+import sys
+
 # IMPORT THIRD-PARTY LIBRARIES
 import vim
 
 # IMPORT LOCAL LIBRARIES
+from .trimmer import statement
+from .trimmer import session
 from . import swapper
+from . import profiling
 from . import config
+from . import timing
+from . import cache
+
+
+_CACHE = cache.SessionCache()
+# The most recent swap which was found ahead of time, for each buffer
+_PRECOMPUTED = dict()
+_RESTORES = cache.RestoreCache()
 
 
 def _to_vim(cursor):
@@ -25,7 +40,7 @@ def _set_cursor(cursor):
     vim.current.window.cursor = _to_vim(cursor)
 
 
-def init():
+def _init_indent():
     '''Get the user's preferred indentation, if they have it defined.'''
     try:
         indent = vim.eval('g:vim_python_style_swapper_indent')
@@ -43,26 +58,514 @@ def init():
     config.register_indent_preference(default_indent)
 
 
-def toggle():
-    code = '\n'.join(vim.current.window.buffer)
+def _init_parse_scope():
+    '''Get the user's preferred parse scope, if they have it defined.'''
+    try:
+        scope = vim.eval('g:vim_python_style_swapper_parse_scope')
+    except Exception:
+        return
+
+    config.register_parse_scope(scope)
+
+
+def _init_backend():
+    '''Get the user's preferred parse backend, if they have it defined.'''
+    try:
+        backend = vim.eval('g:vim_python_style_swapper_backend')
+    except Exception:
+        return
+
+    config.register_backend(backend)
+
+
+def _init_cache():
+    '''Get the user's preferred cache limits, if they have them defined.'''
+    try:
+        config.register_cache_size(vim.eval('g:vim_python_style_swapper_cache_size'))
+    except Exception:
+        pass
+
+    try:
+        config.register_cache_memory(vim.eval('g:vim_python_style_swapper_cache_memory'))
+    except Exception:
+        pass
+
+    try:
+        config.register_astroid_cache_size(vim.eval('g:vim_python_style_swapper_astroid_cache_size'))
+    except Exception:
+        pass
+
+    try:
+        config.register_restore_size(vim.eval('g:vim_python_style_swapper_restore_size'))
+    except Exception:
+        pass
+
+
+def _init_timing():
+    '''Check if the user wants the time of each swap to be recorded, if they have it defined.'''
+    try:
+        config.register_timing_enabled(vim.eval('g:vim_python_style_swapper_timing'))
+    except Exception:
+        pass
+
+    try:
+        config.register_timing_history(vim.eval('g:vim_python_style_swapper_timing_history'))
+    except Exception:
+        pass
+
+
+def _init_profile():
+    '''Get where the user wants profiled swaps to be written, if they have it defined.'''
+    try:
+        config.register_profile_directory(vim.eval('g:vim_python_style_swapper_profile_directory'))
+    except Exception:
+        pass
+
+    try:
+        config.register_profile_top(vim.eval('g:vim_python_style_swapper_profile_top'))
+    except Exception:
+        pass
+
+
+def _init_precompute():
+    '''Get the user's preferred limit for finding swaps ahead of time, if they have it defined.'''
+    try:
+        lines = vim.eval('g:vim_python_style_swapper_precompute_lines')
+    except Exception:
+        return
+
+    config.register_precompute_lines(lines)
+
+
+def init():
+    '''Read the user's preferences, if they have any defined.'''
+    _init_indent()
+    _init_parse_scope()
+    _init_backend()
+    _init_cache()
+    _init_precompute()
+    _init_timing()
+    _init_profile()
+
+
+def _get_session(buffer, lines, offset):
+    '''Get the parsed code of some lines of `buffer`, re-using a cached parse if possible.
+
+    Args:
+        buffer (<vim.Buffer>): The buffer that `lines` were copied from.
+        lines (list[str]): Some or all of the lines of `buffer`.
+        offset (int): How many lines of `buffer` come before `lines`.
+
+    Returns:
+        <session.Session>: The parsed code of `lines`.
+
+    '''
+    key = buffer.number
+    version = (int(vim.eval('b:changedtick')), offset, len(lines))
+    context = _CACHE.get(key, version=version)
+
+    if context is None:
+        context = session.Session('\n'.join(lines))
+        _CACHE.add(key, context, version=version)
+
+    return context
+
+
+def _get_parse_errors():
+    '''tuple[type]: Get every exception that parsing some lines of a buffer may raise.'''
+    errors = (SyntaxError, )
+    # astroid is only imported by the "astroid" backend. Don't import it just to check
+    astroid = sys.modules.get('astroid')
+
+    if astroid is not None:
+        errors += (astroid.AstroidSyntaxError, )
+
+    return errors
+
+
+def _iter_windows(buffer, first, last):
+    '''Copy the lines of `buffer` around two rows, from the fewest lines to every line.
+
+    Every window after the first is only copied if the one before it couldn't
+    be parsed. A window which starts inside of an indented block can't be
+    parsed as a module, so the next window starts at the top-level statement
+    which contains the first window and stops once the statement of `last`
+    is complete. If even that can't be parsed, the last window is the whole
+    buffer.
+
+    Args:
+        buffer (<vim.Buffer>): The buffer to copy lines from.
+        first (int): The 1-based first row which every window must contain.
+        last (int): The 1-based last row which every window must contain.
+
+    Yields:
+        tuple[list[str], int]: The copied lines and how many lines of `buffer` come before them.
+
+    '''
+    top, offset = statement.get_window(buffer, first)
+    end = offset + len(top)
+
+    if last != first:
+        bottom, bottom_offset = statement.get_window(buffer, last)
+        end = max(end, bottom_offset + len(bottom))
+
+    yield (top + buffer[offset + len(top):end], offset)
+
+    start = statement.get_top_level_start(buffer, first) - 1
+    complete = statement.get_complete_end(buffer, last)
+
+    if (start, complete) != (0, len(buffer)):
+        yield (buffer[start:complete], start)
+
+    yield (buffer[:], 0)
+
+
+def _find_edit(buffer, row):
+    '''Find the change which toggles the call on `row` of `buffer`, and the parsed code it came from.
+
+    Only the lines around `row` are copied out of `buffer`. If those lines
+    aren't enough to parse, like a decorator which needs the function below
+    it, more lines are copied and parsed instead. See <_iter_windows>.
+
+    Args:
+        buffer (<vim.Buffer>): The buffer to search within.
+        row (int): The 1-based row which the call must contain.
+
+    Returns:
+        tuple[<swapper.Edit> or NoneType, <locator.CallSpan> or <astroid.Call> or NoneType, int, <session.Session>]:
+            The change, the found call, how many lines of `buffer` come
+            before the lines that the change and call describe and the
+            parsed lines.
+
+    '''
+    for lines, offset in _iter_windows(buffer, row, row):
+        context = _get_session(buffer, lines, offset)
+
+        try:
+            edit, call = swapper.get_edit(context, row - offset)
+        except _get_parse_errors():
+            if len(lines) == len(buffer):
+                raise
+        else:
+            break
+
+    # The session was cached before it parsed anything
+    _CACHE.trim()
+
+    return (edit, call, offset, context)
+
+
+def _get_edit(buffer, row):
+    '''Find the change which toggles the call on `row` of `buffer`.
+
+    Args:
+        buffer (<vim.Buffer>): The buffer to search within.
+        row (int): The 1-based row which the call must contain.
+
+    Returns:
+        tuple[<swapper.Edit> or NoneType, <locator.CallSpan> or <astroid.Call> or NoneType, int]:
+            The change, the found call and how many lines of `buffer` come
+            before the lines that the change and call describe.
+
+    '''
+    return _find_edit(buffer, row)[:3]
+
+
+def _get_range_edits(buffer, first, last):
+    '''Find the changes which toggle the call of every statement between two rows of `buffer`.
+
+    Only the lines from the window around `first` to the window around
+    `last` are copied out of `buffer`, unless they can't be parsed on their
+    own. See <_iter_windows>.
+
+    Args:
+        buffer (<vim.Buffer>): The buffer to search within.
+        first (int): The 1-based row to start changing calls from.
+        last (int): The 1-based row to stop changing calls at, inclusive.
+
+    Returns:
+        tuple[list[<swapper.Edit>], int]:
+            Every change, from top to bottom, and how many lines of `buffer`
+            come before the lines that the changes describe.
+
+    '''
+    for lines, offset in _iter_windows(buffer, first, last):
+        try:
+            edits = swapper.get_range_edits(_get_session(buffer, lines, offset), first - offset, last - offset)
+        except _get_parse_errors():
+            if len(lines) == len(buffer):
+                raise
+        else:
+            break
+
+    # The session was cached before it parsed anything
+    _CACHE.trim()
+
+    return ([edit for edit, _ in edits], offset)
+
+
+def _get_reusable_rows(context, row, edit, offset):
+    '''Find the rows of a buffer where a swap, which was found from `row`, would be found again.
+
+    Any row of the call's statement finds the same call, as long as the call
+    spans the entire statement. Otherwise, another call could share some of
+    the statement's rows, so only `row` can be trusted.
+
+    Args:
+        context (<session.Session>): The lines of the buffer that the swap was found in.
+        row (int): The 1-based row of the buffer that the swap was found from.
+        edit (<swapper.Edit>): The swap's change.
+        offset (int): How many lines of the buffer come before the lines of `context` and `edit`.
+
+    Returns:
+        tuple[int, int]: The first and last 1-based rows of the buffer, inclusive.
+
+    '''
+    # The session already searched for this statement, to find the swap
+    range_ = context.get_statement_range(row - offset)
+
+    if range_ == (edit.start + 1, edit.end):
+        return (range_[0] + offset, range_[1] + offset)
+
+    return (row, row)
+
+
+def precompute():
+    '''Find the swap of the call under the cursor, before the user asks for it.
+
+    This is meant to run while Vim is idle, like on `CursorHold`. The swap
+    is kept until the buffer changes, so that <toggle> only needs to apply it.
+    Buffers which are longer than <config.get_precompute_lines> are skipped.
+
+    A row which has no call, or which can't be parsed, is remembered too, so
+    it isn't searched again until the buffer changes or the cursor moves.
+
+    '''
+    buffer = vim.current.window.buffer
+
+    if len(buffer) > config.get_precompute_lines():
+        return
 
     (row, _) = vim.current.window.cursor
+    version = int(vim.eval('b:changedtick'))
+    cached = _PRECOMPUTED.get(buffer.number)
+
+    if cached and cached[0] == version and cached[1][0] <= row <= cached[1][1]:
+        return
 
-    output, call = swapper.toggle(code, row)
+    _PRECOMPUTED.pop(buffer.number, None)
+
+    try:
+        edit, call, offset, context = _find_edit(buffer, row)
+    except Exception:  # pylint: disable=broad-except
+        # The user may be in the middle of typing. <toggle> searches
+        # again and reports the error, if they ask for a swap
+        #
+        _PRECOMPUTED[buffer.number] = (version, (row, row), None)
 
-    if not call:
         return
 
-    lines = output.splitlines()
+    rows = _get_reusable_rows(context, row, edit, offset) if edit else (row, row)
+    _PRECOMPUTED[buffer.number] = (version, rows, (edit, call, offset))
 
-    # TODO : Consider making this better by NOT replacing the entire buffer and
-    # instead just replacing the part of the buffer where the function text was
-    # changed. Or not! https://ubiquity.acm.org/article.cfm?id=1513451
-    #
-    vim.current.window.buffer[:] = lines
 
-    first_non_whitespace_character_column = \
-        len(lines[call.fromlineno - 1]) - \
-        len(lines[call.fromlineno - 1].lstrip())
+def _pop_precomputed(buffer, row):
+    '''Get the swap that <precompute> found for `row` of `buffer`, if it's still valid.
+
+    Args:
+        buffer (<vim.Buffer>): The buffer to get a swap for.
+        row (int): The 1-based row of the call to swap.
+
+    Returns:
+        tuple[<swapper.Edit>, <locator.CallSpan> or <astroid.Call>, int] or NoneType:
+            The change, the swapped call and how many lines of `buffer` come
+            before the lines that the change and call describe. The call is
+            None if `row` has no call. If nothing was found ahead of time,
+            the search failed or the buffer changed since, return None.
+
+    '''
+    try:
+        version, (first, last), result = _PRECOMPUTED.pop(buffer.number)
+    except KeyError:
+        return None
+
+    if version != int(vim.eval('b:changedtick')) or not first <= row <= last:
+        return None
+
+    return result
+
+
+def get_cache_stats():
+    '''dict[str, int]: Describe how full the parse caches are and how often they have been used.'''
+    stats = _CACHE.get_stats()
+    stats['astroid_modules'] = cache.get_astroid_module_count()
+    stats['astroid_size'] = config.get_astroid_cache_size()
+
+    return stats
+
+
+def echo_cache_stats():
+    '''Print the parse cache's hit and miss counts and its memory usage.'''
+    stats = get_cache_stats()
+    message = 'hits: {hits}, misses: {misses}, sessions: {sessions}/{size}, ' \
+              'memory: {memory}/{memory_limit} bytes, ' \
+              'astroid modules: {astroid_modules}/{astroid_size}'.format(**stats)
+
+    vim.command('echo {message!r}'.format(message=message))
+
+
+def clear_cache():
+    '''Remove every cached parse, including the modules that astroid cached.'''
+    _CACHE.clear()
+    _PRECOMPUTED.clear()
+    _RESTORES.clear()
+    cache.clear_astroid_cache()
+
+
+def get_timing_stats():
+    '''list[str]: Describe the time of each phase of the most recent swaps, as rows of a table.'''
+    return timing.format_history(timing.get_history())
+
+
+def echo_timing_stats():
+    '''Print the time of each phase of the most recent swaps, in milliseconds.'''
+    if not timing.get_history():
+        message = 'No swaps were timed. To time them, use `let g:vim_python_style_swapper_timing = 1`'
+        vim.command('echo {message!r}'.format(message=message))
+
+        return
+
+    for row in get_timing_stats():
+        vim.command('echo {row!r}'.format(row=row))
+
+
+def _recorded(command):
+    '''Time each phase of a swap, if the user wants swaps to be timed.
+
+    Args:
+        command (str): The name of the swap, like "toggle".
+
+    Returns:
+        callable[callable]: A decorator which times the function which swaps.
+
+    '''
+    def _decorate(function):
+        @functools.wraps(function)
+        def _wrapper(*args, **kwargs):
+            if not config.is_timing_enabled():
+                return function(*args, **kwargs)
+
+            with timing.record(command=command, lines=len(vim.current.window.buffer)):
+                return function(*args, **kwargs)
+
+        return _wrapper
+
+    return _decorate
+
+
+def profile_next(count=1):
+    '''Profile the time and memory of the next `count` swaps and print where they will be written.'''
+    profiling.arm(count)
+    message = 'The next {count} swap(s) will be profiled into "{directory}"'.format(
+        count=profiling.get_remaining(), directory=config.get_profile_directory())
+
+    vim.command('echo {message!r}'.format(message=message))
+
+
+def _profiled(command):
+    '''Profile a swap with `cProfile` and `tracemalloc`, if the user asked for it with <profile_next>.
+
+    Args:
+        command (str): The name of the swap, like "toggle".
+
+    Returns:
+        callable[callable]: A decorator which profiles the function which swaps.
+
+    '''
+    def _decorate(function):
+        @functools.wraps(function)
+        def _wrapper(*args, **kwargs):
+            if not profiling.get_remaining():
+                return function(*args, **kwargs)
+
+            with profiling.profiled(command) as paths:
+                result = function(*args, **kwargs)
+
+            for path in paths:
+                vim.command('echo {message!r}'.format(message='Profiled "{path}"'.format(path=path)))
+
+            return result
+
+        return _wrapper
+
+    return _decorate
+
+
+@timing.phase('write')
+def _apply(buffer, edit):
+    '''Apply a swap to `buffer` and remember the lines that it replaced, so it can be swapped back exactly.'''
+    _RESTORES.add(buffer.number, edit, buffer[edit.start:edit.end])
+    buffer[edit.start:edit.end] = edit.lines
+
+
+@timing.phase('write')
+def _apply_all(buffer, edits):
+    '''Apply several swaps to `buffer`, from the bottom to the top, and remember the lines that they replaced.'''
+    _RESTORES.add_all(buffer.number, buffer, edits)
+
+    for edit in reversed(edits):
+        buffer[edit.start:edit.end] = edit.lines
+
+
+@_profiled('toggle')
+@_recorded('toggle')
+def toggle():
+    '''Swap the call under the user's cursor between single-line and multi-line.'''
+    buffer = vim.current.window.buffer
+    (row, _) = vim.current.window.cursor
+
+    # If the call was just swapped, put back exactly what it was, without parsing
+    edit = _RESTORES.pop(buffer.number, buffer, row)
+
+    if edit:
+        _apply(buffer, edit)
+        row = edit.start + 1
+    else:
+        edit, call, offset = _pop_precomputed(buffer, row) or _get_edit(buffer, row)
+        cache.trim_astroid_cache()
+
+        if not call:
+            return
+
+        # Only replace the lines that changed. Replacing the whole buffer makes
+        # a huge undo entry and resets marks, signs and folds across the file
+        #
+        if edit:
+            _apply(buffer, swapper.Edit(edit.start + offset, edit.end + offset, edit.lines))
+
+        row = call.fromlineno + offset
+
+    line = buffer[row - 1]
+    first_non_whitespace_character_column = len(line) - len(line.lstrip())
+
+    _set_cursor((row - 1, first_non_whitespace_character_column))
+
+
+@_profiled('toggle_range')
+@_recorded('toggle_range')
+def toggle_range(first, last):
+    '''Swap the call of every statement between two rows of the current buffer.
+
+    The buffer is only parsed once. Changes are applied from the bottom of
+    the buffer to the top so that each change never moves the lines of
+    the changes which are still left to apply.
+
+    Args:
+        first (int): The 1-based row to start changing calls from.
+        last (int): The 1-based row to stop changing calls at, inclusive.
 
-    _set_cursor((call.fromlineno - 1, first_non_whitespace_character_column))
+    '''
+    buffer = vim.current.window.buffer
+    edits, offset = _get_range_edits(buffer, int(first), int(last))
+    cache.trim_astroid_cache()
+    _apply_all(buffer, [swapper.Edit(edit.start + offset, edit.end + offset, edit.lines) for edit in edits])
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''The astroid visitor which re-prints calls in a multi-line style.
+
+This module imports astroid as soon as it is imported. Only import it when
+the "astroid" backend is used.
+
+'''
+
+# IMPORT LOCAL LIBRARIES
+from .trimmer import common
+
+# IMPORT THIRD-PARTY LIBRARIES
+# `common` must be imported first, in case the vendored copy of astroid is needed
+from astroid import as_string
+import astroid
+
+
+# Expressions which must be wrapped in parentheses before they can be called,
+# subscripted or have an attribute taken. e.g. `(a + b).c`
+#
+_OPERATORS = tuple(
+    getattr(astroid, name) for name in (
+        'Await', 'BinOp', 'BoolOp', 'Compare', 'IfExp', 'Lambda', 'UnaryOp', 'Yield', 'YieldFrom')
+    if hasattr(astroid, name)
+)
+
+
+class SingleLineVisitor(as_string.AsStringVisitor):
+
+    '''A visitor that re-prints nodes, keeping the parentheses that operators need.
+
+    astroid's own visitor prints `(a + b).c` as `(a) + (b).c`, which means
+    something else.
+
+    '''
+
+    def _wrap(self, node):
+        '''str: Print `node`, wrapping it in parentheses if it couldn't be followed by ".", "(" or "[".'''
+        text = node.accept(self)
+        # e.g. `1.real` is a syntax error but `(1).real` isn't
+        is_number = isinstance(node, astroid.Const) and type(node.value) in (int, float, complex)
+
+        if isinstance(node, _OPERATORS) or is_number:
+            return '({text})'.format(text=text)
+
+        return text
+
+    def visit_attribute(self, node):
+        '''str: Print an <astroid.Attribute>, like `foo.bar`.'''
+        return '{expression}.{name}'.format(expression=self._wrap(node.expr), name=node.attrname)
+
+    def visit_subscript(self, node):
+        '''str: Print an <astroid.Subscript>, like `foo[bar]`.'''
+        return '{value}[{slice_}]'.format(value=self._wrap(node.value), slice_=node.slice.accept(self))
+
+    def visit_call(self, node):
+        '''str: Print an <astroid.Call>, like `foo(bar)`.'''
+        arguments = [argument.accept(self) for argument in node.args]
+        arguments.extend(keyword.accept(self) for keyword in node.keywords or [])
+
+        return '{expression}({arguments})'.format(expression=self._wrap(node.func), arguments=', '.join(arguments))
+
+
+class MultiLineCallVisitor(SingleLineVisitor):
+
+    '''A visitor that re-prints <astroid.Call> nodes in a multi-line style.
+
+    Attributes:
+        _single_line_exceptions (tuple[str]):
+            Any functions, by-name, which should not allowed to be made multi-line.
+
+    '''
+
+    _single_line_exceptions = common.SINGLE_LINE_EXCEPTIONS
+
+    def _format_args(self, args):
+        '''Change the given arguments into "multi-line" style arguments.
+
+        Args:
+            args (list[str]):
+                The list of args/kwargs to change.
+
+        Returns:
+            list[str]: The multi-line representation of `args`.
+
+        '''
+        if not args:
+            return ''
+
+        # `args` has a chance of being a tuple. We need indexing so convert it to a list
+        args = list(args)
+
+        # Add proper indentation to every arg
+        args[0] = '\n{indent}'.format(indent=self.indent) + args[0]
+        args = [args[0]] + ['{indent}{name}'.format(indent=self.indent, name=name) for name in args[1:]]
+
+        # Add commas to every arg, including the last arg
+        args[-1] += ',\n'
+        args = ',\n'.join(args)
+
+        return args
+
+    def _get_args(self, node):
+        '''list[str]: Add newline and extra space to each arg and kwarg.'''
+        args = [arg.accept(self) for arg in node.args]
+
+        keywords = []
+
+        if node.keywords:
+            keywords = [kwarg.accept(self) for kwarg in node.keywords]
+
+        args.extend(keywords)
+        return self._format_args(args)
+
+    def visit_call(self, node):
+        '''Expand an <astroid.Call> object into a valid Python string.
+
+        Args:
+            node (<astroid.Call>): The node to create a string representation for.
+
+        Returns:
+            str: The printable representation of the given `node`.
+
+        '''
+        expression = self._wrap(node.func)
+
+        try:
+            if node.func.name in self._single_line_exceptions:
+                return super(MultiLineCallVisitor, self).visit_call(node)
+        except AttributeError:
+            # This only happens if node is a <astroid.Attribute>
+            # An attribute will never be in the list of function exceptions so
+            # just ignore it.
+            #
+            pass
+
+        args = self._get_args(node)
+
+        return '{expression}({args})'.format(expression=expression, args=args)
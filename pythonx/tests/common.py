@@ -0,0 +1,25 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Helpers which are shared by several test modules.'''
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper.trimmer import locator
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class Parsed(object):
+
+    '''A mix-in which forces calls to be found by parsing, instead of using tokens.'''
+
+    def setUp(self):
+        '''Make the token-only call locator give up on every call.'''
+        super(Parsed, self).setUp()
+
+        patcher = mock.patch.object(locator, 'get_nearest_call', side_effect=locator.AmbiguousCallError)
+        patcher.start()
+        self.addCleanup(patcher.stop)
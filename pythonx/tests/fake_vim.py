@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''A stand-in for the `vim` module, which only exists inside of Vim.
+
+It has just enough of Vim's Python interface for <vim_swapper>: one window
+with a buffer and a cursor, `b:changedtick` and `vim.command`. Like Vim,
+changing the buffer's lines increments `b:changedtick`.
+
+Example:
+    >>> sys.modules.setdefault('vim', fake_vim)
+    >>> fake_vim.reset(['foo(bar)'], cursor=(1, 0))
+
+'''
+
+
+# Every `vim.command` which was run, in order
+commands = []
+# Every variable that `vim.eval` can read. Anything else raises `error`
+variables = dict()
+
+
+class error(Exception):  # pylint: disable=invalid-name
+
+    '''The exception that Vim raises for any failed command or expression.'''
+
+    pass
+
+
+class Buffer(list):
+
+    '''The lines of a Vim buffer, which counts each change in `b:changedtick`.'''
+
+    def __init__(self, lines=(), number=1):
+        '''Create the buffer.
+
+        Args:
+            lines (iter[str], optional): The buffer's text.
+            number (int, optional): The buffer's unique number.
+
+        '''
+        super(Buffer, self).__init__(lines)
+        self.number = number
+
+    def __setitem__(self, index, value):
+        '''Change some lines, like `buffer[0:2] = ['foo']`.'''
+        super(Buffer, self).__setitem__(index, value)
+        _change()
+
+    def __delitem__(self, index):
+        '''Remove some lines.'''
+        super(Buffer, self).__delitem__(index)
+        _change()
+
+    def __setslice__(self, start, end, value):
+        '''Change some lines, in Python 2.'''
+        self.__setitem__(slice(start, end), value)
+
+    def __delslice__(self, start, end):
+        '''Remove some lines, in Python 2.'''
+        self.__delitem__(slice(start, end))
+
+
+class Window(object):
+
+    '''A Vim window, which shows a buffer and has a (1-based row, 0-based column) cursor.'''
+
+    def __init__(self, buffer):
+        '''Show `buffer`, with the cursor on its first line.'''
+        super(Window, self).__init__()
+        self.buffer = buffer
+        self.cursor = (1, 0)
+
+
+class Current(object):
+
+    '''The window that has focus.'''
+
+    def __init__(self):
+        '''Create an empty window.'''
+        super(Current, self).__init__()
+        self.window = Window(Buffer())
+
+    @property
+    def buffer(self):
+        '''`Buffer`: The buffer of the current window.'''
+        return self.window.buffer
+
+
+current = Current()  # pylint: disable=invalid-name
+
+
+def _change():
+    '''Increment `b:changedtick`, like Vim does for every change to a buffer.'''
+    variables['b:changedtick'] = str(int(variables.get('b:changedtick', '0')) + 1)
+
+
+def reset(lines=(), cursor=(1, 0), number=1):
+    '''Show a new buffer and forget every variable and command.
+
+    Args:
+        lines (iter[str], optional): The buffer's text.
+        cursor (tuple[int, int], optional): The 1-based row and 0-based column of the cursor.
+        number (int, optional): The buffer's unique number.
+
+    '''
+    del commands[:]
+    variables.clear()
+    variables['b:changedtick'] = '1'
+    current.window = Window(Buffer(lines, number=number))
+    current.window.cursor = cursor
+
+
+def eval(expression):  # pylint: disable=redefined-builtin
+    '''str: Get a variable, as a string, like Vim does.
+
+    Raises:
+        error: If the variable doesn't exist.
+
+    '''
+    try:
+        return variables[expression]
+    except KeyError:
+        raise error('E121: Undefined variable: {expression}'.format(expression=expression))
+
+
+def command(text):
+    '''Remember a command, instead of running it.'''
+    commands.append(text)
+
+
+reset()
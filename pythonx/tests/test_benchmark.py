@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that the benchmarks generate the code they describe and report every phase.'''
+
+# IMPORT STANDARD LIBRARIES
+import tempfile
+import unittest
+import shutil
+import json
+import ast
+import os
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper import benchmark
+from python_style_swapper import swapper
+from python_style_swapper import config
+
+
+class GenerateCode(unittest.TestCase):
+
+    '''Write code with a known number and shape of calls.'''
+
+    def test_calls(self):
+        '''Write valid Python with a call on every reported row.'''
+        code, rows = benchmark.generate_code(100, density=0.5, arguments=2, depth=3)
+        lines = code.split('\n')
+
+        ast.parse(code)
+        self.assertEqual(35, len(rows))
+        self.assertEqual('    result = call_1(call_2(call_3(argument_0, argument_1), argument_1), argument_1)', lines[rows[0] - 1])
+
+    def test_density(self):
+        '''Only write calls when the density allows it.'''
+        _, rows = benchmark.generate_code(100, density=0.0)
+
+        self.assertEqual([], rows)
+
+
+class Measure(unittest.TestCase):
+
+    '''Time each phase of a swap.'''
+
+    def test_phases(self):
+        '''Report every phase.'''
+        timings = benchmark.measure(swapper.make_multi_line, 'foo(lambda: 1, bar)', 1, repeat=1)
+
+        self.assertEqual(set(benchmark.PHASES + ('total', )), set(timings))
+        self.assertGreater(timings['parse'], 0)
+
+    def test_total(self):
+        '''Split the whole swap into its phases, without counting any time twice.'''
+        timings = benchmark.measure(swapper.toggle, 'foo(lambda: 1, bar)', 1, repeat=1)
+
+        self.assertAlmostEqual(timings['total'], sum(timings[phase] for phase in benchmark.PHASES), delta=0.01)
+
+
+class Main(unittest.TestCase):
+
+    '''Write results as JSON.'''
+
+    def setUp(self):
+        '''Make a directory for the results.'''
+        super(Main, self).setUp()
+
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def test_output(self):
+        '''Time generated buffers and real files.'''
+        path = os.path.join(self.root, 'results.json')
+        corpus = os.path.join(benchmark.DEFAULT_CORPUS, 'exceptions.py')
+        backend = config.get_backend()
+
+        self.assertEqual(0, benchmark.main(
+            ['--lines', '100', '--corpus', corpus, '--calls', '1', '--repeat', '1', '-b', 'ast', '-o', path]))
+
+        with open(path, 'r') as handler:
+            report = json.load(handler)
+
+        self.assertEqual(backend, config.get_backend())
+        self.assertEqual('ast', report['backend'])
+        self.assertEqual(['synthetic', 'corpus'], [result['case'] for result in report['results']])
+        self.assertEqual({'make_multi_line', 'make_single_line', 'toggle'}, set(report['results'][1]['timings']))
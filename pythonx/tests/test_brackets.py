@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that the ending bracket of every call can be found from one table.'''
+
+# IMPORT STANDARD LIBRARIES
+import textwrap
+import unittest
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper.trimmer import brackets
+from python_style_swapper.trimmer import parser
+from python_style_swapper.trimmer import session
+
+
+def _get_lines(code):
+    '''list[str]: Dedent some code and split it into lines.'''
+    return textwrap.dedent(code).split('\n')
+
+
+class Table(unittest.TestCase):
+
+    '''Find matching brackets.'''
+
+    def test_pairs(self):
+        '''Match each opening bracket with its closing bracket.'''
+        lines = _get_lines(
+            '''\
+            foo([1, 2], {
+                'bar': (3,),
+            })'''
+        )
+        table = brackets.BracketTable(lines)
+
+        self.assertEqual((3, 1), table.get_closing((1, 3)))
+        self.assertEqual((1, 9), table.get_closing((1, 4)))
+        self.assertEqual((3, 0), table.get_closing((1, 12)))
+        self.assertEqual((2, 14), table.get_closing((2, 11)))
+        self.assertEqual(None, table.get_closing((2, 0)))
+
+    def test_ignore_text(self):
+        '''Don't count brackets that are inside of strings or comments.'''
+        lines = _get_lines(
+            '''\
+            foo(
+                ')',  # )
+                """
+                )
+                """,
+            )'''
+        )
+        table = brackets.BracketTable(lines)
+
+        self.assertEqual((6, 0), table.get_call_closing((1, 0)))
+
+    def test_chained_calls(self):
+        '''Find the ")" of every call in a chain of calls.'''
+        lines = _get_lines('foo(1)(2).bar(3)')
+        table = brackets.BracketTable(lines)
+
+        self.assertEqual((1, 5), table.get_call_closing((1, 0)))
+        self.assertEqual((1, 8), table.get_call_closing((1, 0), chain=1))
+        self.assertEqual((1, 15), table.get_call_closing((1, 0), chain=2))
+        self.assertEqual(None, table.get_call_closing((1, 0), chain=3))
+
+    def test_incomplete_code(self):
+        '''Record every bracket before code that can't be tokenized.'''
+        table = brackets.BracketTable(_get_lines('foo(bar())\nfizz(\n'))
+
+        self.assertEqual((1, 9), table.get_call_closing((1, 0)))
+        self.assertEqual((1, 8), table.get_call_closing((1, 4)))
+        self.assertEqual(None, table.get_call_closing((2, 0)))
+
+
+class Tolineno(unittest.TestCase):
+
+    '''Find the ending line of astroid calls, using a table.'''
+
+    def test_comment_bracket(self):
+        '''Find the ending line even if a comment ends with ")".'''
+        context = session.Session(textwrap.dedent(
+            '''\
+            foo(
+                bar,  # Something (like this)
+                fizz,
+            )
+            thing = buzz(1)'''
+        ))
+        foo, buzz = context.calls
+
+        self.assertEqual(4, parser.get_tolineno(foo, context.lines, brackets=context.get_brackets(foo)))
+        self.assertEqual(5, context.get_tolineno(buzz))
+
+    def test_call_range(self):
+        '''Get the exact start and end position of calls.'''
+        context = session.Session('thing = foo(bar(1), fizz(2)).buzz()')
+        ranges = [parser.get_call_range(node, context.lines, brackets=context.get_brackets(node))
+                  for node in context.calls]
+
+        self.assertEqual(
+            sorted([((1, 8), (1, 27)), ((1, 12), (1, 17)), ((1, 20), (1, 26)), ((1, 8), (1, 34))]),
+            sorted(ranges),
+        )
+
+    def test_statement(self):
+        '''Only tokenize the statement that was parsed.'''
+        context = session.Session('foo(1)\n\nbar(\n    2,\n)', scope='statement')
+        node = context.get_nearest_call(4)
+
+        self.assertEqual(5, context.get_tolineno(node))
+        self.assertEqual(1, len(context.get_brackets(node)))
+
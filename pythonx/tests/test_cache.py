@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that parsed code is cached and that the cache stays within its limits.'''
+
+# IMPORT STANDARD LIBRARIES
+import unittest
+import sys
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper.trimmer import session
+from python_style_swapper.trimmer import builder
+from python_style_swapper import swapper
+from python_style_swapper import cache
+import astroid
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class SessionCache(unittest.TestCase):
+
+    '''Store and look up sessions.'''
+
+    def test_version(self):
+        '''Only find a session if its version matches.'''
+        sessions = cache.SessionCache(size=4, memory=1024)
+        context = session.Session('foo(bar)')
+        sessions.add(1, context, version=10)
+
+        self.assertIs(context, sessions.get(1, version=10))
+        self.assertEqual(None, sessions.get(1, version=11))
+        self.assertEqual(None, sessions.get(2, version=10))
+        self.assertEqual((1, 2), (sessions.hits, sessions.misses))
+
+    def test_replace_version(self):
+        '''Keep only the newest version of each key.'''
+        sessions = cache.SessionCache(size=4, memory=1024)
+        sessions.add(1, session.Session('foo(bar)'), version=10)
+        sessions.add(1, session.Session('foo(bar, fizz)'), version=11)
+
+        self.assertEqual(1, len(sessions))
+
+    def test_size(self):
+        '''Remove the least recently used session once the cache is full.'''
+        sessions = cache.SessionCache(size=2, memory=1024)
+        sessions.add(1, session.Session('foo(bar)'))
+        sessions.add(2, session.Session('foo(bar)'))
+        sessions.get(1)
+        sessions.add(3, session.Session('foo(bar)'))
+
+        self.assertNotEqual(None, sessions.get(1))
+        self.assertEqual(None, sessions.get(2))
+        self.assertNotEqual(None, sessions.get(3))
+
+    def test_memory(self):
+        '''Remove sessions once they use too much memory.'''
+        context = session.Session('foo(bar)')
+        sessions = cache.SessionCache(size=10, memory=context.get_size() * 2)
+
+        for key in range(3):
+            sessions.add(key, session.Session('foo(bar)'))
+
+        self.assertEqual(2, len(sessions))
+        self.assertLessEqual(sessions.get_memory(), sessions.memory)
+
+    def test_parsed_memory(self):
+        '''Count the trees that a session parsed after it was cached.'''
+        sessions = cache.SessionCache(size=10, memory=session.Session('foo(bar)').get_size() * 2)
+        sessions.add(1, session.Session('foo(bar)'))
+        context = session.Session('foo(bar)')
+        sessions.add(2, context)
+        context.module
+        sessions.trim()
+
+        self.assertEqual(None, sessions.get(1))
+        self.assertLessEqual(sessions.get_memory(), sessions.memory)
+
+    def test_clear(self):
+        '''Remove every session and reset the counters.'''
+        sessions = cache.SessionCache(size=2, memory=1024)
+        sessions.add(1, session.Session('foo(bar)'))
+        sessions.get(1)
+        sessions.clear()
+
+        self.assertEqual({'hits': 0, 'misses': 0, 'sessions': 0, 'size': 2, 'memory': 0, 'memory_limit': 1024},
+                         sessions.get_stats())
+
+
+class GetSession(unittest.TestCase):
+
+    '''Find sessions by the hash of their code.'''
+
+    def test_same_code(self):
+        '''Re-use the session of code which hasn't changed.'''
+        sessions = cache.SessionCache(size=2, memory=1024)
+        context = cache.get_session(sessions, 'foo(bar)')
+
+        self.assertIs(context, cache.get_session(sessions, 'foo(bar)'))
+        self.assertIsNot(context, cache.get_session(sessions, 'foo(bar, fizz)'))
+
+
+class RestoreCache(unittest.TestCase):
+
+    '''Put back the exact lines that a swap replaced.'''
+
+    def _swap(self, restores, lines, edit):
+        '''list[str]: Apply `edit` to `lines` and remember what it replaced.'''
+        restores.add(1, edit, lines[edit.start:edit.end])
+
+        return edit.apply(lines)
+
+    def test_restore(self):
+        '''Restore comments and spacing which re-rendering the call would lose.'''
+        restores = cache.RestoreCache(size=4)
+        original = ['x = 1', 'foo(', '    bar,  # A comment', "    'fizz',", ')']
+        lines = self._swap(restores, original, swapper.Edit(1, 5, ["foo(bar, 'fizz')"]))
+
+        edit = restores.pop(1, lines, 2)
+
+        self.assertEqual(original, edit.apply(lines))
+        self.assertEqual(0, len(restores))
+
+    def test_changed(self):
+        '''Don't restore lines if the swapped lines were edited since.'''
+        restores = cache.RestoreCache(size=4)
+        lines = self._swap(restores, ['foo(', '    bar,', ')'], swapper.Edit(0, 3, ['foo(bar)']))
+
+        self.assertEqual(None, restores.pop(1, ['foo(bar, fizz)'], 1))
+        self.assertEqual(None, restores.pop(2, lines, 1))
+
+    def test_outside(self):
+        '''Only restore the swap which contains the row.'''
+        restores = cache.RestoreCache(size=4)
+        lines = self._swap(restores, ['foo(', '    bar,', ')', 'x = 1'], swapper.Edit(0, 3, ['foo(bar)']))
+
+        self.assertEqual(None, restores.pop(1, lines, 2))
+        self.assertNotEqual(None, restores.pop(1, lines, 1))
+
+    def test_size(self):
+        '''Forget the least recently swapped calls first.'''
+        restores = cache.RestoreCache(size=2)
+
+        for index in range(3):
+            restores.add(1, swapper.Edit(index, index + 1, ['foo({index})'.format(index=index)]), ['foo(', ')'])
+
+        self.assertEqual(2, len(restores))
+        self.assertEqual(None, restores.pop(1, ['foo(0)', 'foo(1)', 'foo(2)'], 1))
+        self.assertNotEqual(None, restores.pop(1, ['foo(0)', 'foo(1)', 'foo(2)'], 3))
+
+    def test_add_all(self):
+        '''Remember several swaps, even after the swaps above them moved their lines.'''
+        restores = cache.RestoreCache(size=4)
+        original = ['foo(', '    1,', ')', 'bar(', '    2,', ')']
+        edits = [swapper.Edit(0, 3, ['foo(1)']), swapper.Edit(3, 6, ['bar(2)'])]
+        restores.add_all(1, original, edits)
+        lines = swapper.apply_edits(original, edits)
+
+        self.assertEqual(['foo(1)', 'bar(', '    2,', ')'], restores.pop(1, lines, 2).apply(lines))
+
+
+class AstroidCache(unittest.TestCase):
+
+    '''Keep astroid's own module cache from growing forever.'''
+
+    def setUp(self):
+        '''Remember astroid's cached modules so that they can be restored, later.'''
+        super(AstroidCache, self).setUp()
+
+        modules = astroid.MANAGER.astroid_cache
+        cached = dict(modules.items())
+        self.addCleanup(lambda: (modules.clear(), modules.update(cached)))
+
+    def test_not_cached(self):
+        '''Parse code without adding it to astroid's module cache.'''
+        astroid.MANAGER.astroid_cache.pop('', None)
+        builder.parse('foo(bar)')
+
+        self.assertNotIn('', list(astroid.MANAGER.astroid_cache.keys()))
+
+    def test_not_inferred(self):
+        '''Parse code without inferring its attribute assignments.'''
+        with mock.patch.object(builder.SyntaxBuilder, 'delayed_assattr') as patch:
+            session.Session('self.foo = bar(fizz)').module
+
+        self.assertEqual(0, patch.call_count)
+
+    def test_trim(self):
+        '''Remove unnamed modules and then the oldest modules.'''
+        modules = astroid.MANAGER.astroid_cache
+
+        for name in ('', 'first', 'second', 'third'):
+            modules[name] = astroid.parse('foo(bar)', module_name='parsed')
+
+        cache.trim_astroid_cache(size=2)
+        names = list(modules.keys())
+
+        self.assertEqual((False, False, True, True),
+                         tuple(name in names for name in ('', 'first', 'second', 'third')))
+
+    def test_clear(self):
+        '''Remove every module except for built-in modules.'''
+        astroid.MANAGER.astroid_cache['something'] = astroid.parse('foo(bar)', module_name='parsed')
+        cache.clear_astroid_cache()
+
+        self.assertTrue(all(name in sys.builtin_module_names for name in astroid.MANAGER.astroid_cache.keys()))
+        self.assertEqual(0, cache.clear_astroid_cache())
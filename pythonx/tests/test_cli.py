@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that whole files and directories can be formatted from the command-line.'''
+
+# IMPORT STANDARD LIBRARIES
+import contextlib
+import tempfile
+import textwrap
+import unittest
+import shutil
+import sys
+import io
+import os
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper import formatter
+from python_style_swapper import cli
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+_LONG = 'value = foo(first_argument, second_argument)\n'
+_EXPANDED = textwrap.dedent(
+    '''\
+    value = foo(
+        first_argument,
+        second_argument,
+    )
+    '''
+)
+
+
+class _DirectoryCase(unittest.TestCase):
+
+    '''A test case which writes files into a temporary directory.'''
+
+    def setUp(self):
+        '''Make the temporary directory.'''
+        super(_DirectoryCase, self).setUp()
+
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def _write(self, name, code):
+        '''str: Write `code` into a file in the temporary directory and return its path.'''
+        path = os.path.join(self.root, name)
+
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+
+        with io.open(path, 'w', encoding='utf-8', newline='') as handler:
+            handler.write(code)
+
+        return path
+
+    @staticmethod
+    def _read(path):
+        '''str: Get the contents of a file, without converting its newlines.'''
+        with io.open(path, 'r', encoding='utf-8', newline='') as handler:
+            return handler.read()
+
+    @staticmethod
+    def _main(arguments):
+        '''int: Run the command-line and hide what it prints.'''
+        stream = io.StringIO() if sys.version_info[0] > 2 else io.BytesIO()
+
+        with _redirect(stream):
+            return cli.main(arguments)
+
+
+@contextlib.contextmanager
+def _redirect(stream):
+    '''Send everything that is printed to `stream`, while this context is open.'''
+    stdout = sys.stdout
+    stderr = sys.stderr
+    sys.stdout = stream
+    sys.stderr = stream
+
+    try:
+        yield
+    finally:
+        sys.stdout = stdout
+        sys.stderr = stderr
+
+
+class FormatFile(_DirectoryCase):
+
+    '''Format one file at a time.'''
+
+    def test_write(self):
+        '''Write the changed code back to the file.'''
+        path = self._write('module.py', _LONG)
+
+        self.assertEqual((path, 1, ''), cli.format_file(path, length=20))
+        self.assertEqual(_EXPANDED, self._read(path))
+
+    def test_check(self):
+        '''Don't change the file if only checking.'''
+        path = self._write('module.py', _LONG)
+
+        self.assertEqual((path, 1, ''), cli.format_file(path, length=20, check=True))
+        self.assertEqual(_LONG, self._read(path))
+
+    def test_newlines(self):
+        '''Keep Windows newlines.'''
+        path = self._write('module.py', _LONG.replace('\n', '\r\n'))
+        cli.format_file(path, length=20)
+
+        self.assertEqual(_EXPANDED.replace('\n', '\r\n'), self._read(path))
+
+    def test_syntax_error(self):
+        '''Report files which can't be parsed instead of raising an exception.'''
+        path = self._write('module.py', '@decorate(foo, lambda: 1)\nclass\n')
+        _, changes, error = cli.format_file(path, length=10)
+
+        self.assertEqual(0, changes)
+        self.assertTrue(error)
+
+
+    def test_broken_output(self):
+        '''Leave the file unchanged if the formatted code doesn't compile.'''
+        path = self._write('module.py', _LONG)
+
+        with mock.patch.object(formatter, 'format_code', return_value=('value = foo(\n', 1)):
+            _, changes, error = cli.format_file(path, length=20)
+
+        self.assertEqual(0, changes)
+        self.assertIn('does not compile', error)
+        self.assertEqual(_LONG, self._read(path))
+
+class Main(_DirectoryCase):
+
+    '''Format whole directories.'''
+
+    def test_directory(self):
+        '''Format every Python file of a directory but skip hidden directories and other files.'''
+        paths = [
+            self._write(os.path.join('package', 'module.py'), _LONG),
+            self._write(os.path.join('package', 'inner', 'module.py'), _LONG),
+        ]
+        skipped = [
+            self._write(os.path.join('.hidden', 'module.py'), _LONG),
+            self._write(os.path.join('package', 'notes.txt'), _LONG),
+        ]
+
+        self.assertEqual(0, self._main(['--line-length', '20', '--workers', '1', self.root]))
+        self.assertEqual([_EXPANDED] * 2, [self._read(path) for path in paths])
+        self.assertEqual([_LONG] * 2, [self._read(path) for path in skipped])
+
+    def test_workers(self):
+        '''Format files in several processes.'''
+        paths = [self._write('module_{index}.py'.format(index=index), _LONG) for index in range(6)]
+
+        self.assertEqual(0, self._main(['-l', '20', '--workers', '2', '--chunk-size', '2', self.root]))
+        self.assertEqual([_EXPANDED] * 6, [self._read(path) for path in paths])
+
+    def test_check(self):
+        '''Fail if any file would change.'''
+        self._write('module.py', _LONG)
+
+        self.assertEqual(1, self._main(['--check', '-l', '20', '-w', '1', self.root]))
+        self.assertEqual(0, self._main(['--check', '-l', '79', '-w', '1', self.root]))
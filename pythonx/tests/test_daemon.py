@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that the daemon answers JSON-RPC requests and keeps each buffer between them.'''
+
+# IMPORT STANDARD LIBRARIES
+import subprocess
+import unittest
+import json
+import sys
+import io
+import os
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper import daemon
+from python_style_swapper import config
+
+
+class _ServerCase(unittest.TestCase):
+
+    '''A test case which sends requests to a new server.'''
+
+    def setUp(self):
+        '''Create the server.'''
+        super(_ServerCase, self).setUp()
+
+        self.server = daemon.Server()
+        self._identifier = 0
+
+    def _request(self, method, **params):
+        '''dict[str, object]: Send a request and get its decoded response.'''
+        self._identifier += 1
+
+        return json.loads(self.server.handle(json.dumps(
+            {'jsonrpc': '2.0', 'id': self._identifier, 'method': method, 'params': params})))
+
+    def _notify(self, method, **params):
+        '''Send a request which doesn't get a response.'''
+        self.assertEqual(None, self.server.handle(json.dumps({'jsonrpc': '2.0', 'method': method, 'params': params})))
+
+
+class Toggle(_ServerCase):
+
+    '''Swap calls of buffers which the server already has or which are sent to it.'''
+
+    def test_toggle(self):
+        '''Send back the edits of a swap and the row where the call starts.'''
+        response = self._request('toggle', buffer='1', version=1, row=2, lines=['x = 1', 'foo(bar)'])
+
+        self.assertEqual({'edits': [{'start': 1, 'end': 2, 'lines': ['foo(', '    bar,', ')']}], 'row': 2},
+                         response['result'])
+
+    def test_stale(self):
+        '''Ask for the buffer's lines if the server doesn't have its current version.'''
+        self.assertEqual(daemon.STALE_BUFFER, self._request('toggle', buffer='1', version=1, row=1)['error']['code'])
+
+        self._request('toggle', buffer='1', version=1, row=1, lines=['foo(bar)'])
+
+        self.assertEqual(daemon.STALE_BUFFER, self._request('toggle', buffer='1', version=2, row=1)['error']['code'])
+
+    def test_applied(self):
+        '''Keep the buffer's lines in sync with the editor once it applies the edits.'''
+        self._request('toggle', buffer='1', version=1, row=1, lines=['foo(bar)'])
+        self._notify('applied', buffer='1', version=2)
+        response = self._request('toggle', buffer='1', version=2, row=1)
+
+        self.assertEqual([{'start': 0, 'end': 3, 'lines': ['foo(bar)']}], response['result']['edits'])
+
+    def test_restore(self):
+        '''Swap a call back to exactly the lines it had before, comments included.'''
+        lines = ['foo(', '    bar,  # A comment', ')']
+        self._request('toggle', buffer='1', version=1, row=1, lines=lines)
+        self._notify('applied', buffer='1', version=2)
+        response = self._request('toggle', buffer='1', version=2, row=1)
+
+        self.assertEqual({'edits': [{'start': 0, 'end': 1, 'lines': lines}], 'row': 1}, response['result'])
+
+    def test_toggle_range(self):
+        '''Swap every call in a range of rows.'''
+        response = self._request('toggle_range', buffer='1', version=1, first=1, last=3, lines=['foo(', '    1,', ')', 'bar(2)'])
+
+        self.assertEqual([{'start': 0, 'end': 3, 'lines': ['foo(1)']}], response['result']['edits'])
+
+    def test_buffers(self):
+        '''Keep the buffers of different editors apart.'''
+        self._request('toggle', buffer='1:1', version=1, row=1, lines=['foo(bar)'])
+        self._request('toggle', buffer='2:1', version=1, row=1, lines=['fizz(buzz)'])
+
+        self.assertEqual(2, self._request('stats')['result']['buffers'])
+
+        self._request('close', buffer='1:1')
+
+        self.assertEqual(1, self._request('stats')['result']['buffers'])
+
+
+class Errors(_ServerCase):
+
+    '''Answer bad requests with JSON-RPC errors, instead of stopping.'''
+
+    def test_parse_error(self):
+        '''Report requests which aren't JSON.'''
+        self.assertEqual(daemon.PARSE_ERROR, json.loads(self.server.handle('not json'))['error']['code'])
+
+    def test_method_not_found(self):
+        '''Report methods which don't exist.'''
+        self.assertEqual(daemon.METHOD_NOT_FOUND, self._request('something')['error']['code'])
+
+    def test_invalid_params(self):
+        '''Report requests which are missing parameters.'''
+        self.assertEqual(daemon.INVALID_PARAMS, self._request('toggle', buffer='1')['error']['code'])
+
+    def test_swap_error(self):
+        '''Report code which can't be swapped.'''
+        response = self._request('toggle', buffer='1', version=1, row=1, lines=['@decorate(lambda: 1)', 'class'])
+
+        self.assertEqual(daemon.SWAP_ERROR, response['error']['code'])
+
+
+class Preferences(_ServerCase):
+
+    '''Keep the preferences of each connection apart from every other connection's.'''
+
+    def _toggle(self, preferences, buffer):
+        '''list[str]: Expand a call, using a connection's preferences, and get the changed lines.'''
+        response = json.loads(self.server.handle(
+            json.dumps({
+                'jsonrpc': '2.0',
+                'id': 1,
+                'method': 'toggle',
+                'params': {'buffer': buffer, 'version': 1, 'row': 1, 'lines': ['foo(bar)']},
+            }),
+            preferences=preferences,
+        ))
+
+        return response['result']['edits'][0]['lines']
+
+    def test_connections(self):
+        '''Swap with each connection's own indent, without changing the process's defaults.'''
+        tabs = dict()
+        spaces = dict()
+        indent = config.get_indent_preference()
+        initialize = {'jsonrpc': '2.0', 'id': 1, 'method': 'initialize', 'params': {'indent': '\t'}}
+
+        self.server.handle(json.dumps(initialize), preferences=tabs)
+
+        self.assertEqual(['foo(', '\tbar,', ')'], self._toggle(tabs, 'tabs'))
+        self.assertEqual(['foo(', indent + 'bar,', ')'], self._toggle(spaces, 'spaces'))
+        self.assertEqual(indent, config.get_indent_preference())
+        self.assertEqual({}, spaces)
+
+    def test_invalid(self):
+        '''Report preferences which aren't recognized.'''
+        self.assertEqual(daemon.INVALID_PARAMS, self._request('initialize', backend='something')['error']['code'])
+
+
+class Serve(_ServerCase):
+
+    '''Read requests from a stream until it closes or the server is shut down.'''
+
+    def test_serve(self):
+        '''Write one response for each request, except notifications, and stop once shut down.'''
+        requests = [
+            {'jsonrpc': '2.0', 'id': 1, 'method': 'toggle', 'params': {'buffer': '1', 'version': 1, 'row': 1, 'lines': ['foo(bar)']}},
+            {'jsonrpc': '2.0', 'method': 'applied', 'params': {'buffer': '1', 'version': 2}},
+            {'jsonrpc': '2.0', 'id': 2, 'method': 'shutdown'},
+            {'jsonrpc': '2.0', 'id': 3, 'method': 'stats'},
+        ]
+        input_ = io.StringIO(u''.join(json.dumps(request) + u'\n' for request in requests))
+        output = io.StringIO()
+
+        daemon.serve(self.server, input_, _Writer(output))
+        responses = [json.loads(line) for line in output.getvalue().splitlines()]
+
+        self.assertEqual([1, 2], [response['id'] for response in responses])
+        self.assertFalse(self.server.running)
+
+
+class Process(unittest.TestCase):
+
+    '''Talk to a separate daemon process through its stdin and stdout, the way an editor's job does.'''
+
+    def setUp(self):
+        '''Start the process.'''
+        super(Process, self).setUp()
+
+        root = os.path.dirname(os.path.dirname(os.path.abspath(daemon.__file__)))
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'python_style_swapper.daemon'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=root,
+            env=dict(os.environ, PYTHONPATH=root),
+            universal_newlines=True,
+        )
+        self.addCleanup(self._stop)
+        self._identifier = 0
+
+    def _stop(self):
+        '''Close the pipes and make sure that the process is gone.'''
+        if self.process.poll() is None:
+            self.process.kill()
+
+        self.process.stdin.close()
+        self.process.stdout.close()
+        self.process.wait()
+
+    def _send(self, method, notify=False, **params):
+        '''dict[str, object] or NoneType: Write one request and read its response, unless it's a notification.'''
+        request = {'jsonrpc': '2.0', 'method': method, 'params': params}
+
+        if not notify:
+            self._identifier += 1
+            request['id'] = self._identifier
+
+        self.process.stdin.write(json.dumps(request) + '\n')
+        self.process.stdin.flush()
+
+        if notify:
+            return None
+
+        response = json.loads(self.process.stdout.readline())
+        self.assertEqual(self._identifier, response['id'])
+
+        return response
+
+    def test_pipe(self):
+        '''Answer requests in order, ask again for stale buffers and exit once shut down.'''
+        response = self._send('toggle', buffer='1', version=1, row=1, lines=['foo(bar)'])
+
+        self.assertEqual({'edits': [{'start': 0, 'end': 1, 'lines': ['foo(', '    bar,', ')']}], 'row': 1},
+                         response['result'])
+
+        # The editor changed the buffer without telling the process
+        self.assertEqual(daemon.STALE_BUFFER, self._send('toggle', buffer='1', version=5, row=1)['error']['code'])
+
+        self._send('applied', notify=True, buffer='1', version=2)
+        response = self._send('toggle', buffer='1', version=2, row=2)
+
+        self.assertEqual({'edits': [{'start': 0, 'end': 3, 'lines': ['foo(bar)']}], 'row': 1}, response['result'])
+        self.assertNotIn('error', self._send('shutdown'))
+        self.assertEqual('', self.process.stdout.readline())
+        self.assertEqual(0, self.process.wait())
+
+
+class _Writer(object):
+
+    '''Write `str` into a text stream, on Python 2 and 3.'''
+
+    def __init__(self, stream):
+        '''Keep the stream to write into.'''
+        super(_Writer, self).__init__()
+        self._stream = stream
+
+    def write(self, text):
+        '''Write some text.'''
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+
+        self._stream.write(text)
+
+    def flush(self):
+        '''Do nothing. Everything is already written.'''
+        pass
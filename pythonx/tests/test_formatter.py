@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that every call in some code gets the preferred style.'''
+
+# IMPORT STANDARD LIBRARIES
+import textwrap
+import unittest
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper import formatter
+from python_style_swapper import config
+
+# IMPORT LOCAL LIBRARIES
+from tests import common
+
+
+class FormatCode(unittest.TestCase):
+
+    '''Expand calls which are too long and collapse calls which fit.'''
+
+    def test_expand(self):
+        '''Write a call across multiple lines if its line is too long.'''
+        code = 'value = foo(first_argument, second_argument)'
+        expected = textwrap.dedent(
+            '''\
+            value = foo(
+                first_argument,
+                second_argument,
+            )'''
+        )
+
+        self.assertEqual((expected, 1), formatter.format_code(code, length=20))
+
+    def test_collapse(self):
+        '''Write a multi-line call on one line if it fits.'''
+        code = textwrap.dedent(
+            '''\
+            def function():
+                value = foo(
+                    bar,
+                    fizz,
+                )
+                return value'''
+        )
+        expected = textwrap.dedent(
+            '''\
+            def function():
+                value = foo(bar, fizz)
+                return value'''
+        )
+
+        self.assertEqual((expected, 1), formatter.format_code(code, length=79))
+
+    def test_unchanged(self):
+        '''Leave calls alone if they already have the preferred style.'''
+        code = textwrap.dedent(
+            '''\
+            # A comment
+            foo(bar)
+
+            value = foo(
+                first_argument,
+                second_argument,
+            )'''
+        )
+
+        self.assertEqual((code, 0), formatter.format_code(code, length=30))
+
+    def test_many_calls(self):
+        '''Change every statement's call, even after earlier calls changed the line numbers.'''
+        code = textwrap.dedent(
+            '''\
+            foo(
+                1,
+            )
+            bar(first_argument, second_argument)
+            fizz(
+                2,
+            )'''
+        )
+        expected = textwrap.dedent(
+            '''\
+            foo(1)
+            bar(
+                first_argument,
+                second_argument,
+            )
+            fizz(2)'''
+        )
+
+        self.assertEqual((expected, 3), formatter.format_code(code, length=20))
+
+    def test_comments(self):
+        '''Leave a multi-line call alone if collapsing it would delete its comments.'''
+        code = 'result = foo(\n    a,  # the first thing\n    b,  # TODO: remove\n)\n'
+        backend = config.get_backend()
+        self.addCleanup(config.register_backend, backend)
+
+        for name in (config.AST_BACKEND, config.ASTROID_BACKEND):
+            config.register_backend(name)
+
+            self.assertEqual((code, 0), formatter.format_code(code, 79))
+
+
+class NestedCalls(unittest.TestCase):
+
+    '''Only expand the call which holds the part of a line that is too long.'''
+
+    def _format(self, code, length):
+        '''str: Format `code` with every backend and make sure that they all agree.'''
+        self.addCleanup(config.register_backend, config.get_backend())
+        outputs = set()
+
+        for name in (config.AST_BACKEND, config.ASTROID_BACKEND):
+            config.register_backend(name)
+            outputs.add(formatter.format_code(code, length=length)[0])
+
+        output, = outputs
+
+        return output
+
+    def test_outer_call(self):
+        '''Expand the outer call, not the first call which is nested inside of it.'''
+        code = 'value = foo(bar(first_argument, second_argument), fizz)'
+        expected = textwrap.dedent(
+            '''\
+            value = foo(
+                bar(first_argument, second_argument),
+                fizz,
+            )'''
+        )
+
+        self.assertEqual(expected, self._format(code, 50))
+
+    def test_bracketed_call(self):
+        '''Leave a call alone if it's inside of some other bracket, like a list.'''
+        code = 'value = [foo(a), bar(first_argument, second_argument)]'
+
+        self.assertEqual(code, self._format(code, 30))
+
+    def test_outside_call(self):
+        '''Leave a line alone if the part of it which is too long isn't in any call.'''
+        code = 'value = [foo(a, b), some_long_name_here]'
+
+        self.assertEqual(code, self._format(code, 25))
+
+    def test_still_too_long(self):
+        '''Leave a call alone if expanding it would still leave a line which is too long.'''
+        code = 'value = foo(bar(first_argument, second_argument), fizz)'
+
+        self.assertEqual(code, self._format(code, 30))
+
+
+class ParsedNestedCalls(common.Parsed, NestedCalls):
+
+    '''Run <NestedCalls> by parsing.'''
+
+    pass
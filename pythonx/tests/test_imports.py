@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that importing astroid only loads what parsing needs.'''
+
+# IMPORT STANDARD LIBRARIES
+import subprocess
+import textwrap
+import unittest
+import json
+import sys
+import os
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper.trimmer import common
+import astroid
+
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+_IMPORT = textwrap.dedent(
+    '''\
+    import json
+    import sys
+    import time
+
+    started = time.time()
+
+    from python_style_swapper.trimmer import common
+    astroid = common.import_astroid()
+
+    imported = time.time()
+    astroid.parse('foo(bar, thing=None)')
+    parsed = time.time()
+
+    json.dump(
+        {
+            'import': imported - started,
+            'parse': parsed - imported,
+            'brain': any(name.startswith('brain_') for name in sys.modules),
+            'builtins': astroid.raw_building.is_bootstrapped(),
+        },
+        sys.stdout,
+    )
+    '''
+)
+
+
+def _import(syntax_only):
+    '''Import astroid in a new Python process.
+
+    Args:
+        syntax_only (bool): If True, defer astroid's brain plugins and builtins module.
+
+    Returns:
+        dict[str, float or bool]:
+            How many seconds it took to import astroid and parse a call,
+            whether any brain plugin was imported and whether the builtins
+            module was built.
+
+    '''
+    environment = dict(os.environ)
+    environment['ASTROID_SYNTAX_ONLY'] = '1' if syntax_only else '0'
+    environment['PYTHONPATH'] = os.pathsep.join([_ROOT, environment.get('PYTHONPATH', '')])
+
+    output = subprocess.check_output([sys.executable, '-c', _IMPORT], env=environment, cwd=_ROOT)
+
+    return json.loads(output.decode('utf-8'))
+
+
+@unittest.skipIf(not hasattr(astroid, 'SYNTAX_ONLY'), 'The installed astroid is not the vendored copy.')
+class SyntaxOnly(unittest.TestCase):
+
+    '''Import astroid without its brain plugins or builtins module.'''
+
+    def test_deferred(self):
+        '''Don't load brain plugins or build the builtins module just to parse code.'''
+        deferred = _import(syntax_only=True)
+        eager = _import(syntax_only=False)
+
+        self.assertEqual((False, False), (deferred['brain'], deferred['builtins']))
+        self.assertEqual((True, True), (eager['brain'], eager['builtins']))
+
+    def test_import_time(self):
+        '''Import astroid faster than loading everything up-front.'''
+        def _get_time(syntax_only):
+            return min(_import(syntax_only)['import'] for _ in range(3))
+
+        self.assertLess(_get_time(syntax_only=True) * 1.25, _get_time(syntax_only=False))
+
+    def test_inference(self):
+        '''Load everything that inference needs, once something is inferred.'''
+        node = astroid.extract_node('len')
+
+        self.assertEqual('len', next(node.infer()).name)
+        self.assertTrue(astroid.raw_building.is_bootstrapped())
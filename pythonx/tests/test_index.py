@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that calls can be found by position.'''
+
+# IMPORT STANDARD LIBRARIES
+import timeit
+import unittest
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper.trimmer import index
+
+
+def _make_index(ranges):
+    '''<index.CallIndex>: Index some (start, end) ranges, using each range as its own call.'''
+    return index.CallIndex(ranges, lambda range_: range_)
+
+
+class Lookup(unittest.TestCase):
+
+    '''Find the calls around some position.'''
+
+    def setUp(self):
+        '''Create calls that look like `foo(bar(1), fizz(2)); buzz(\n    3,\n)`.'''
+        super(Lookup, self).setUp()
+
+        self.foo = ((1, 0), (1, 19))
+        self.bar = ((1, 4), (1, 9))
+        self.fizz = ((1, 12), (1, 18))
+        self.buzz = ((1, 22), (3, 0))
+        self.calls = _make_index([self.bar, self.buzz, self.fizz, self.foo])
+
+    def test_outermost(self):
+        '''Find the first, least-nested call of a row.'''
+        self.assertEqual(self.foo, self.calls.get_outermost(1))
+        self.assertEqual(self.buzz, self.calls.get_outermost(1, column=25))
+        self.assertEqual(self.buzz, self.calls.get_outermost(2))
+        self.assertEqual(None, self.calls.get_outermost(4))
+
+    def test_innermost(self):
+        '''Find the most-nested call of a position.'''
+        self.assertEqual(self.bar, self.calls.get_innermost(1))
+        self.assertEqual(self.fizz, self.calls.get_innermost(1, column=15))
+        self.assertEqual(self.foo, self.calls.get_innermost(1, column=10))
+        self.assertEqual(None, self.calls.get_innermost(1, column=20))
+
+    def test_containing(self):
+        '''Find every call around a position.'''
+        self.assertEqual([self.foo, self.fizz], self.calls.get_containing(1, column=13))
+
+    def test_depth(self):
+        '''Find how deeply nested each call is.'''
+        self.assertEqual(
+            [0, 1, 1, 0],
+            [self.calls.get_depth(call) for call in (self.foo, self.bar, self.fizz, self.buzz)],
+        )
+
+    def test_range(self):
+        '''Find every call within some rows.'''
+        self.assertEqual([self.foo, self.bar, self.fizz], self.calls.get_calls(1, 2))
+        self.assertEqual([self.foo, self.bar, self.fizz, self.buzz], self.calls.get_calls())
+
+
+class Scaling(unittest.TestCase):
+
+    '''Make sure that finding a call doesn't check every call.'''
+
+    def test_large_index(self):
+        '''Look up calls in an index much faster than checking each call.'''
+        ranges = [((row, 0), (row, 10)) for row in range(1, 20001)]
+        calls = _make_index(ranges)
+        rows = range(1, 20001, 97)
+
+        def _scan():
+            for row in rows:
+                next(range_ for range_ in ranges if range_[0][0] <= row <= range_[1][0])
+
+        def _lookup():
+            for row in rows:
+                calls.get_outermost(row)
+
+        scan_time = min(timeit.repeat(_scan, number=1, repeat=3))
+        lookup_time = min(timeit.repeat(_lookup, number=1, repeat=3))
+
+        self.assertLess(lookup_time * 10, scan_time)
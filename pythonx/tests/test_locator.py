@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that calls can be found and swapped using only their tokens.'''
+
+# IMPORT STANDARD LIBRARIES
+import textwrap
+import unittest
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper.trimmer import locator
+from python_style_swapper.trimmer import builder
+from python_style_swapper import swapper
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+def _get_calls(code):
+    '''list[<locator.CallSpan>]: Find every call in a single statement.'''
+    lines = code.split('\n')
+
+    return locator.get_calls(lines, 1, len(lines))
+
+
+def _get_arguments(code, call):
+    '''list[str]: Get the text of every argument of `call`, which is on one line.'''
+    return [code[start[1]:end[1]] for start, end in call.arguments]
+
+
+class Calls(unittest.TestCase):
+
+    '''Find calls and their arguments.'''
+
+    def test_arguments(self):
+        '''Split arguments by their top-level commas.'''
+        code = "foo(   bar,  thing=None, *args, another={'a': [(1, 2), 8]}, **kwargs)"
+        call, = _get_calls(code)
+
+        self.assertEqual('foo', call.name)
+        self.assertEqual(
+            ['bar', 'thing=None', '*args', "another={'a': [(1, 2), 8]}", '**kwargs'],
+            _get_arguments(code, call),
+        )
+
+    def test_nested(self):
+        '''Find outer calls before inner calls.'''
+        code = 'value = foo(bar(fizz()), buzz)'
+        calls = _get_calls(code)
+
+        self.assertEqual(['foo', 'bar', 'fizz'], [call.name for call in calls])
+        self.assertEqual([0, 1, 2], [call.depth for call in calls])
+        self.assertEqual((1, 8), calls[0].start)
+
+    def test_chained(self):
+        '''A call made on the result of another call contains that call.'''
+        code = "'{}'.format(foo).strip(bar)"
+        calls = _get_calls(code)
+
+        self.assertEqual(['strip', 'format'], [call.name for call in calls])
+        self.assertEqual([(1, 0), (1, 0)], [call.start for call in calls])
+        self.assertEqual([0, 1], [call.depth for call in calls])
+
+    def test_not_calls(self):
+        '''Keywords and definitions are followed by parentheses but aren't calls.'''
+        self.assertEqual([], _get_calls('if (foo) and not(bar): pass'))
+        self.assertEqual(['fizz'], [call.name for call in _get_calls('def foo(bar=fizz()): pass')])
+
+    def test_multi_line(self):
+        '''Find a call which spans several lines.'''
+        code = textwrap.dedent(
+            '''\
+            foo(
+                thing,  # A comment
+                bar,
+            )'''
+        )
+        call, = _get_calls(code)
+
+        self.assertEqual((1, 4), (call.fromlineno, call.tolineno))
+        self.assertEqual([((2, 4), (2, 9)), ((3, 4), (3, 7))], call.arguments)
+        self.assertTrue(call.has_comments)
+
+    def test_ambiguous(self):
+        '''Refuse to describe calls which need to be parsed.'''
+        for code in ('@foo(bar)', 'foo(lambda: bar)', "foo(f'{bar}')", 'foo(bar'):
+            with self.assertRaises(locator.AmbiguousCallError):
+                _get_calls(code)
+
+
+class Nearest(unittest.TestCase):
+
+    '''Find the call which contains some row.'''
+
+    def test_outermost(self):
+        '''Find the least nested call by default.'''
+        lines = ['foo(bar(fizz()), buzz)']
+
+        self.assertEqual('foo', locator.get_nearest_call(lines, 1).name)
+
+    def test_innermost(self):
+        '''Find the most nested call.'''
+        lines = ['foo(bar(fizz()), buzz)']
+
+        self.assertEqual('fizz', locator.get_nearest_call(lines, 1, innermost=True).name)
+        self.assertEqual('bar', locator.get_nearest_call(lines, 1, column=6, innermost=True).name)
+
+    def test_no_call(self):
+        '''Return nothing if there is no call on the row.'''
+        self.assertEqual(None, locator.get_nearest_call(['foo = bar', 'fizz()'], 1))
+
+    def test_inside_string(self):
+        '''Return nothing if the row is only the text of a multi-line string.'''
+        lines = ["value = foo('''", '    bar(fizz, buzz)', "''')"]
+
+        self.assertEqual(None, locator.get_nearest_call(lines, 2))
+        self.assertEqual('foo', locator.get_nearest_call(lines, 3).name)
+
+
+class TokenSwap(unittest.TestCase):
+
+    '''Swap calls without building an astroid tree.'''
+
+    def _toggle(self, code, row):
+        '''str: Toggle the call on `row` and make sure that nothing was parsed.'''
+        with mock.patch.object(builder, 'parse', wraps=builder.parse) as patch:
+            output, _ = swapper.toggle(code, row)
+
+        self.assertEqual(0, patch.call_count)
+
+        return output
+
+    def test_expand(self):
+        '''Keep the text around the call and the text of each argument.'''
+        code = 'value = 8 + foo(bar(1,2),  thing=None)  # A comment'
+        expected = textwrap.dedent(
+            '''\
+            value = 8 + foo(
+                bar(1,2),
+                thing=None,
+            )  # A comment'''
+        )
+
+        self.assertEqual(expected, self._toggle(code, 1))
+
+    def test_collapse(self):
+        '''Put every argument back onto one line.'''
+        code = textwrap.dedent(
+            '''\
+            class Thing(object):
+                def method(self):
+                    return foo(
+                        bar,
+                            thing=None,
+                    ).fizz'''
+        )
+        expected = textwrap.dedent(
+            '''\
+            class Thing(object):
+                def method(self):
+                    return foo(bar, thing=None).fizz'''
+        )
+
+        self.assertEqual(expected, self._toggle(code, 4))
+
+    def test_fallback(self):
+        '''Parse the call if its comments would be lost.'''
+        code = textwrap.dedent(
+            '''\
+            foo(
+                bar,  # A comment
+                thing=None,
+            )'''
+        )
+
+        with mock.patch.object(builder, 'parse', wraps=builder.parse) as patch:
+            output, _ = swapper.toggle(code, 2)
+
+        self.assertEqual('foo(bar, thing=None)', output)
+        self.assertEqual(1, patch.call_count)
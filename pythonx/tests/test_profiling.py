@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that only the swaps which were asked for are profiled and that their files are written.'''
+
+# IMPORT STANDARD LIBRARIES
+import tempfile
+import unittest
+import shutil
+import io
+import os
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper import profiling
+from python_style_swapper import swapper
+from python_style_swapper import config
+
+
+class _ProfilingCase(unittest.TestCase):
+
+    '''A test case which writes profiles into a temporary folder.'''
+
+    def setUp(self):
+        '''Make the folder and stop profiling once the test is done.'''
+        super(_ProfilingCase, self).setUp()
+
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+        directory = config.get_profile_directory()
+        config.register_profile_directory(self.root)
+        self.addCleanup(config.register_profile_directory, directory)
+        self.addCleanup(profiling.arm, 0)
+
+
+class Profiled(_ProfilingCase):
+
+    '''Profile the time and memory of swaps.'''
+
+    def test_not_armed(self):
+        '''Don't profile anything unless profiling was asked for.'''
+        with profiling.profiled('toggle') as paths:
+            swapper.toggle('foo(bar)', 1)
+
+        self.assertEqual([], paths)
+        self.assertEqual([], os.listdir(self.root))
+
+    def test_count(self):
+        '''Only profile as many swaps as were asked for.'''
+        profiling.arm(2)
+
+        for _ in range(3):
+            with profiling.profiled('toggle'):
+                swapper.toggle('foo(bar)', 1)
+
+        self.assertEqual(0, profiling.get_remaining())
+        self.assertEqual(4, len(os.listdir(self.root)))
+
+    def test_files(self):
+        '''Write the time of astroid's visitors and the largest allocations.'''
+        profiling.arm()
+
+        with profiling.profiled('make_multi_line') as paths:
+            swapper.make_multi_line('foo(lambda: 1, bar)', 1)
+
+        stats, report = paths
+
+        self.assertTrue(stats.endswith('.pstats'))
+        self.assertTrue(os.path.isfile(stats))
+
+        with io.open(report, 'r', encoding='utf-8') as handler:
+            text = handler.read()
+
+        for name in profiling.ASTROID_FUNCTIONS:
+            self.assertIn('Functions of {name}'.format(name=name), text)
+
+        if profiling.tracemalloc is not None:
+            self.assertIn('Largest allocations', text)
+
+
+class Main(_ProfilingCase):
+
+    '''Profile a swap from the command-line.'''
+
+    def test_output(self):
+        '''Write the profile into the given folder and leave the user's preferences alone.'''
+        path = os.path.join(self.root, 'code.py')
+        output = os.path.join(self.root, 'output')
+
+        with io.open(path, 'w', encoding='utf-8') as handler:
+            handler.write(u'foo(bar, fizz)\n')
+
+        self.assertEqual(0, profiling.main([path, '1', '--function', 'make_multi_line', '-o', output]))
+        self.assertEqual(2, len(os.listdir(output)))
+        self.assertEqual(self.root, config.get_profile_directory())
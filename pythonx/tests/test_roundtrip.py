@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that calls are swapped back and forth and that any swap which changes the code's meaning is reported.'''
+
+# IMPORT STANDARD LIBRARIES
+import textwrap
+import tempfile
+import unittest
+import shutil
+import json
+import ast
+import io
+import os
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper import roundtrip
+from python_style_swapper import config
+
+
+_CODE = textwrap.dedent(
+    '''\
+    def function(value):
+        result = foo(value, bar(1, 2), thing=[3, 4])
+        other = fizz(
+            lambda: value,
+            buzz,
+        )
+
+        return result(other)
+    '''
+)
+
+
+class _DirectoryCase(unittest.TestCase):
+
+    '''A test case which writes files into a temporary directory.'''
+
+    def setUp(self):
+        '''Make the temporary directory.'''
+        super(_DirectoryCase, self).setUp()
+
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def _write(self, name, code):
+        '''str: Write `code` into a file in the temporary directory and return its path.'''
+        path = os.path.join(self.root, name)
+
+        with io.open(path, 'w', encoding='utf-8') as handler:
+            handler.write(code)
+
+        return path
+
+
+class CheckFile(_DirectoryCase):
+
+    '''Round-trip every call of a single file.'''
+
+    def test_calls(self):
+        '''Check every row which has a call, without changing the file.'''
+        path = self._write('code.py', _CODE)
+        result = roundtrip.check_file(path, slowest=2)
+
+        self.assertEqual(3, result['calls'])
+        self.assertEqual(0, result['text_rows'])
+        self.assertEqual([], result['failures'])
+        self.assertEqual(2, len(result['slowest']))
+        self.assertEqual(_CODE, io.open(path, 'r', encoding='utf-8').read())
+
+    def test_skipped(self):
+        '''Skip a file which isn't valid Python.'''
+        result = roundtrip.check_file(self._write('broken.py', 'print "Python 2"\n'))
+
+        self.assertIn('skipped', result)
+        self.assertEqual(0, result['calls'])
+
+
+class Failure(unittest.TestCase):
+
+    '''Find swaps which change what code means.'''
+
+    def test_syntax(self):
+        '''Report code which doesn't parse.'''
+        kind, _ = roundtrip._get_failure('make_multi_line', 'foo(', ast.dump(ast.parse('foo()')))
+
+        self.assertEqual(roundtrip.SYNTAX, kind)
+
+    def test_changed_ast(self):
+        '''Report code which parses into something else.'''
+        kind, _ = roundtrip._get_failure('make_single_line', 'foo(bar)', ast.dump(ast.parse('foo(bar, fizz)')))
+
+        self.assertEqual(roundtrip.CHANGED_AST, kind)
+
+    def test_formatting(self):
+        '''Ignore parentheses, whitespace and trailing commas.'''
+        expected = ast.dump(ast.parse('foo(bar)'))
+
+        self.assertIsNone(roundtrip._get_failure('make_multi_line', 'foo(\n    bar,\n)', expected))
+
+
+class CheckCall(unittest.TestCase):
+
+    '''Swap one call back and forth.'''
+
+    def test_continuation_row(self):
+        '''Check the same call again, not the code after it, once a call from a later row is on one row.'''
+        code = textwrap.dedent(
+            '''\
+            foo(
+                bar, fizz(1))
+            buzz(thing,
+                 other)
+            '''
+        )
+
+        self.assertIsNone(roundtrip._check_call(code, 2, ast.dump(ast.parse(code))))
+
+
+class TextRows(unittest.TestCase):
+
+    '''Toggle rows which are only strings or comments and expect nothing to change.'''
+
+    _CODE = textwrap.dedent(
+        '''\
+        # A comment before any statement
+        def function():
+            \'\'\'Call foo(bar, fizz).
+
+            And then buzz(thing, other).
+
+            \'\'\'
+            # foo(bar)
+            return foo(
+                # A comment inside of the call
+                bar,
+            )
+        '''
+    )
+
+    def test_rows(self):
+        '''Find the inside of multi-line strings and comments outside of any statement.'''
+        self.assertEqual([1, 4, 5, 6, 8], roundtrip._get_text_rows(self._CODE))
+
+    def test_unchanged(self):
+        '''Toggle every text row without changing the code.'''
+        for row in roundtrip._get_text_rows(self._CODE):
+            self.assertIsNone(roundtrip._check_text_row(self._CODE, row))
+
+    def test_swapped(self):
+        '''Report a toggle which changes a text row.'''
+        kind, _ = roundtrip._check_text_row('foo(bar)\n', 1)
+
+        self.assertEqual(roundtrip.SWAPPED_TEXT, kind)
+
+
+class Main(_DirectoryCase):
+
+    '''Check several files in parallel and write the results as JSON.'''
+
+    def test_output(self):
+        '''Report throughput, skipped files and the slowest calls, across processes.'''
+        self._write('first.py', _CODE)
+        self._write('second.py', 'value = foo(bar)\n')
+        self._write('broken.py', 'print "Python 2"\n')
+        output = os.path.join(self.root, 'results.json')
+        backend = config.get_backend()
+
+        self.assertEqual(0, roundtrip.main([self.root, '--workers', '2', '-b', 'ast', '--slowest', '3', '-o', output]))
+
+        with io.open(output, 'r', encoding='utf-8') as handler:
+            report = json.load(handler)
+
+        self.assertEqual(backend, config.get_backend())
+        self.assertEqual(3, report['files'])
+        self.assertEqual(4, report['calls'])
+        self.assertEqual(0, report['failed'])
+        self.assertEqual(['broken.py'], [os.path.basename(item['path']) for item in report['skipped']])
+        self.assertEqual(3, len(report['slowest']))
+        self.assertGreater(report['calls_per_second'], 0)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that the cost of a swap grows no faster than the size of its buffer.
+
+Each swap is timed on buffers of N, 2N, 4N and 8N lines. A swap which
+grows linearly takes, at most, roughly 8 times as long on the largest buffer
+as on the smallest. A swap which grows quadratically takes roughly 64 times
+as long, so a regression fails even though timing a swap is noisy.
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+from __future__ import division
+
+import collections
+import unittest
+import timeit
+import gc
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper import benchmark
+from python_style_swapper import swapper
+from python_style_swapper import config
+
+
+_FACTORS = (1, 2, 4, 8)
+# How much slower than linear the largest buffer may be before it fails
+_TOLERANCE = 2.0
+_REPEAT = 5
+# Timing is noisy. A swap which seems too slow is measured again before it fails
+_ATTEMPTS = 2
+_FUNCTIONS = collections.OrderedDict((
+    ('toggle', swapper.toggle),
+    ('make_multi_line', swapper.make_multi_line),
+    ('make_single_line', swapper.make_single_line),
+))
+
+
+def _median(values):
+    '''float: Get the middle of some numbers.'''
+    values = sorted(values)
+    middle = len(values) // 2
+
+    if len(values) % 2:
+        return values[middle]
+
+    return (values[middle - 1] + values[middle]) / 2
+
+
+def _measure(function, code, row):
+    '''float: Get the median seconds of running a swap several times, with garbage collection turned off.'''
+    times = []
+    enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        for _ in range(_REPEAT):
+            started = timeit.default_timer()
+            function(code, row)
+            times.append(timeit.default_timer() - started)
+    finally:
+        if enabled:
+            gc.enable()
+
+    return _median(times)
+
+
+def _get_cases(lines, lambdas):
+    '''Generate buffers of N, 2N, 4N and 8N lines and choose the call in the middle of each one.
+
+    Args:
+        lines (int): N, the number of lines of the smallest buffer.
+        lambdas (bool): If True, every call has a lambda and must be parsed. Otherwise, tokens are enough.
+
+    Returns:
+        list[tuple[str, str, int]]:
+            The code of each buffer, the same code with the chosen call
+            already written across multiple lines and the 1-based row of
+            the chosen call.
+
+    '''
+    cases = []
+
+    for factor in _FACTORS:
+        code, rows = benchmark.generate_code(lines * factor, lambdas=lambdas)
+        row = rows[len(rows) // 2]
+        cases.append((code, swapper.make_multi_line(code, row), row))
+
+    return cases
+
+
+class _ScalingCase(unittest.TestCase):
+
+    '''A test case which times swaps on buffers that double in size.'''
+
+    def _get_times(self, function, cases, name):
+        '''list[float]: Time `function` on the call of each buffer.'''
+        times = []
+
+        for code, expanded, row in cases:
+            times.append(_measure(function, expanded if name == 'make_single_line' else code, row))
+
+        return times
+
+    def _assert_linear(self, lines, lambdas=False):
+        '''Check that every swap grows no faster than linearly, with some tolerance for noise.
+
+        Args:
+            lines (int): The number of lines of the smallest buffer.
+            lambdas (bool, optional): If True, every call must be parsed.
+
+        '''
+        cases = _get_cases(lines, lambdas)
+        maximum = _FACTORS[-1] / _FACTORS[0] * _TOLERANCE
+
+        for name, function in _FUNCTIONS.items():
+            # Warm up any lazy imports, so they aren't counted against the smallest buffer
+            function(cases[0][1] if name == 'make_single_line' else cases[0][0], cases[0][2])
+
+            for _ in range(_ATTEMPTS):
+                times = self._get_times(function, cases, name)
+
+                if times[-1] / times[0] <= maximum:
+                    break
+
+            self.assertLessEqual(
+                times[-1] / times[0],
+                maximum,
+                msg='"{name}" grew faster than linearly. Milliseconds for {sizes} lines: {times}'.format(
+                    name=name,
+                    sizes=[lines * factor for factor in _FACTORS],
+                    times=['{:.3f}'.format(time_ * 1000) for time_ in times],
+                ),
+            )
+
+
+class Tokens(_ScalingCase):
+
+    '''Time swaps of calls which are found and rendered with tokens alone.'''
+
+    def test_statement(self):
+        '''Only read the lines around the call.'''
+        self._assert_linear(1000)
+
+
+class Parsed(_ScalingCase):
+
+    '''Time swaps of calls which must be parsed.'''
+
+    def setUp(self):
+        '''Remember the user's preferences, so each test can change them.'''
+        super(Parsed, self).setUp()
+
+        self.addCleanup(config.register_parse_scope, config.get_parse_scope())
+        self.addCleanup(config.register_backend, config.get_backend())
+
+    def test_statement(self):
+        '''Only parse the statement of the call.'''
+        config.register_parse_scope(config.STATEMENT_SCOPE)
+
+        self._assert_linear(1000, lambdas=True)
+
+    def test_module_ast(self):
+        '''Parse the whole buffer with `ast`.'''
+        config.register_parse_scope(config.MODULE_SCOPE)
+        config.register_backend(config.AST_BACKEND)
+
+        self._assert_linear(250, lambdas=True)
+
+    def test_module_astroid(self):
+        '''Parse the whole buffer with astroid.'''
+        config.register_parse_scope(config.MODULE_SCOPE)
+        config.register_backend(config.ASTROID_BACKEND)
+
+        self._assert_linear(250, lambdas=True)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that a single swap only parses its code once.'''
+
+# IMPORT STANDARD LIBRARIES
+import textwrap
+import inspect
+import timeit
+import unittest
+import sys
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper.trimmer import statement
+from python_style_swapper.trimmer import session
+from python_style_swapper.trimmer import builder
+from python_style_swapper.trimmer import parser
+from python_style_swapper import swapper
+from python_style_swapper import config
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+# IMPORT LOCAL LIBRARIES
+from tests import common
+
+
+def _make_code(count):
+    '''str: Create `count` single-line function calls.'''
+    return '\n'.join(
+        'value_{index} = foo(bar, {index}, thing=[{index}, "{index}"])'.format(index=index)
+        for index in range(count)
+    )
+
+
+class ParseCount(common.Parsed, unittest.TestCase):
+
+    '''Count how many times code is parsed for each swap.'''
+
+    def _get_parse_count(self, function, code, row):
+        '''int: Run `function` and count how many times astroid parsed any code.'''
+        with mock.patch.object(builder, 'parse', wraps=builder.parse) as patch:
+            function(code, row)
+
+        return patch.call_count
+
+    def test_toggle(self):
+        '''Toggle a single-line call to multi-line and back again, with one parse each.'''
+        code = _make_code(10)
+
+        self.assertEqual(1, self._get_parse_count(swapper.toggle, code, 5))
+
+        code, _ = swapper.toggle(code, 5)
+        self.assertEqual(1, self._get_parse_count(swapper.toggle, code, 5))
+
+    def test_make_multi_line(self):
+        '''Expand a call with only one parse.'''
+        self.assertEqual(1, self._get_parse_count(swapper.make_multi_line, _make_code(10), 5))
+
+    def test_session_reuse(self):
+        '''Look up the same code several times but only parse it once.'''
+        context = session.Session(_make_code(10), scope=config.MODULE_SCOPE)
+
+        with mock.patch.object(builder, 'parse', wraps=builder.parse) as patch:
+            for row in range(1, 11):
+                context.get_nearest_call(row)
+
+        self.assertEqual(1, patch.call_count)
+
+    def test_blank_row(self):
+        '''Don't parse a row which isn't part of any statement and only search for its statement once.'''
+        code = _make_code(5) + '\n\n' + _make_code(5)
+        context = session.Session(code, scope=config.STATEMENT_SCOPE)
+
+        with mock.patch.object(statement, 'get_statement_range', wraps=statement.get_statement_range) as search:
+            with mock.patch.object(builder, 'parse', wraps=builder.parse) as parse:
+                edit, call = swapper.get_edit(context, 6)
+                swapper.get_edit(context, 6)
+
+        self.assertEqual((None, None), (edit or None, call))
+        self.assertEqual(0, parse.call_count)
+        self.assertEqual(1, search.call_count)
+
+
+class CallSearch(unittest.TestCase):
+
+    '''Find only the calls of a parsed module which could contain some row.'''
+
+    def test_prune(self):
+        '''Skip every statement which can't contain the row.'''
+        code = textwrap.dedent(
+            '''\
+            foo(1)
+
+            def bar():
+                fizz(2); buzz(3)
+                thing(
+                    4,
+                )
+
+            other(5)'''
+        )
+        module = builder.parse(code)
+
+        def _get_names(row):
+            return [call.func.name for call in parser.get_calls(module, row=row)]
+
+        self.assertEqual(['fizz', 'buzz'], _get_names(4))
+        self.assertEqual(['thing'], _get_names(7))
+        self.assertEqual(['foo', 'fizz', 'buzz', 'thing', 'other'], _get_names(None))
+
+    def test_module_scope(self):
+        '''Find a call whose ")" is on its own row, in a block that was pruned.'''
+        code = 'def foo():\n    bar(\n        1,\n    )\n\n\nfizz(2)'
+        context = session.Session(code, scope=config.MODULE_SCOPE)
+
+        self.assertEqual('bar', context.get_nearest_call(4).func.name)
+        self.assertEqual('fizz', context.get_nearest_call(7).func.name)
+        self.assertEqual(None, context.get_nearest_call(5))
+
+    def test_module_scope_span(self):
+        '''Find a call's span from the parsed module, without searching for its statement.'''
+        code = "s = '''\nfoo(1)\n'''\nbar(\n    2,\n)"
+        context = session.Session(code, scope=config.MODULE_SCOPE)
+
+        with mock.patch.object(statement, 'get_statement_range', wraps=statement.get_statement_range) as patch:
+            edit, call = swapper.get_edit(context, 5)
+            nothing, _ = swapper.get_edit(context, 2)
+
+        self.assertEqual('bar', call.name)
+        self.assertEqual(['bar(2)'], edit.lines)
+        self.assertFalse(nothing)
+        self.assertEqual(0, patch.call_count)
+
+    def test_deep_nesting(self):
+        '''Find calls which are nested deeper than a recursive search could go.'''
+        depth = 30
+        module = builder.parse('{calls}1{closing}'.format(calls='foo(' * depth, closing=')' * depth))
+        limit = sys.getrecursionlimit()
+        # A recursive search needs at least 1 frame for each nested call
+        sys.setrecursionlimit(len(inspect.stack(0)) + depth)
+        self.addCleanup(sys.setrecursionlimit, limit)
+
+        self.assertEqual(depth, len(parser.get_calls(module)))
+
+
+class ToggleCost(common.Parsed, unittest.TestCase):
+
+    '''Compare the cost of a toggle with the cost of a single parse.'''
+
+    def setUp(self):
+        '''Parse the whole file, so that there's a whole parse to compare with.'''
+        super(ToggleCost, self).setUp()
+
+        self.addCleanup(config.register_parse_scope, config.get_parse_scope())
+        config.register_parse_scope(config.MODULE_SCOPE)
+
+    def test_toggle_costs_one_parse(self):
+        '''Toggle a call in the middle of a large file.'''
+        code = _make_code(1000)
+        repeat = 7
+
+        parse_time = min(timeit.repeat(lambda: builder.parse(code), number=1, repeat=repeat))
+        toggle_time = min(timeit.repeat(lambda: swapper.toggle(code, 500), number=1, repeat=repeat))
+
+        # A toggle also walks the parsed module but that walk costs much
+        # less than the parse. Two parses would put it well above this ratio.
+        #
+        self.assertLess(toggle_time, parse_time * 1.75)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that swapping calls for a long time doesn't keep using more memory.
+
+Editors stay open for days and most swaps build a new astroid module. Any
+module, node or cached property which outlives its swap, in
+`astroid.MANAGER.astroid_cache`, in `decorators.cached` or in the parse
+caches, adds up over thousands of swaps.
+
+Swapping that many calls takes a while, so this test only runs if the
+`PYTHON_STYLE_SWAPPER_SOAK` environment variable is set to "1".
+
+'''
+
+# IMPORT STANDARD LIBRARIES
+import unittest
+import gc
+import os
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2
+    tracemalloc = None
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper import benchmark
+from python_style_swapper import swapper
+from python_style_swapper import config
+from python_style_swapper import cache
+import astroid
+
+
+_BUFFERS = 4
+_TOGGLES = 10000
+# Swaps which run before memory is measured, so that lazy imports and caches fill up first
+_WARM_UP = 1000
+# The most memory which may still be in use after every swap is done
+_TRACED_LIMIT = 1024 * 1024
+_RSS_LIMIT = 32 * 1024 * 1024
+_ENABLED = os.environ.get('PYTHON_STYLE_SWAPPER_SOAK', '') == '1'
+
+
+def _get_rss():
+    '''int or NoneType: Get the bytes of memory which this process uses, if the platform can tell.'''
+    try:
+        with open('/proc/self/statm', 'r') as handler:
+            pages = int(handler.read().split()[1])
+    except (IOError, OSError, IndexError, ValueError):
+        return None
+
+    return pages * os.sysconf('SC_PAGE_SIZE')
+
+
+class _Buffer(object):
+
+    '''The code of an editor's buffer and the call which was last swapped in it.'''
+
+    def __init__(self, key, lines):
+        '''Create the buffer.
+
+        Args:
+            key (int): The number of the buffer.
+            lines (int): Roughly how many lines of code the buffer has.
+
+        '''
+        super(_Buffer, self).__init__()
+        code, self.rows = benchmark.generate_code(lines, arguments=2, lambdas=True)
+        self.key = key
+        self.lines = code.split('\n')
+        self.version = 0
+        self.swapped = None
+        self.count = 0
+
+
+class _Editor(object):
+
+    '''Swap calls in several buffers, the same way that `vim_swapper` does.'''
+
+    def __init__(self):
+        '''Create the buffers and every cache.'''
+        super(_Editor, self).__init__()
+        self.buffers = [_Buffer(key, 10 + key * 10) for key in range(_BUFFERS)]
+        self.sessions = cache.SessionCache()
+        self.restores = cache.RestoreCache()
+
+    def _get_edit(self, buffer, row, restore):
+        '''<swapper.Edit> or NoneType: Swap back the lines of an earlier swap or parse the buffer and swap a call.'''
+        if restore:
+            edit = self.restores.pop(buffer.key, buffer.lines, row)
+
+            if edit:
+                return edit
+
+        context = cache.get_session(self.sessions, '\n'.join(buffer.lines), key=buffer.key, version=buffer.version)
+        edit, _ = swapper.get_edit(context, row)
+        self.sessions.trim()
+        cache.trim_astroid_cache()
+
+        if edit:
+            self.restores.add(buffer.key, edit, buffer.lines[edit.start:edit.end])
+
+        return edit
+
+    def toggle(self, index):
+        '''Swap a call of one of the buffers.
+
+        Every call is swapped and then swapped back, so each buffer ends up
+        with its original code. Half of the buffers are parsed whole, as if
+        the user preferred to parse whole modules. Every other swap back
+        restores the original lines, as if the user swapped straight back.
+        The rest are parsed again, as if the user swapped back after other edits.
+
+        Args:
+            index (int): The number of the toggle, which chooses the buffer and the call to swap.
+
+        '''
+        buffer = self.buffers[index % len(self.buffers)]
+        config.register_parse_scope(config.MODULE_SCOPE if buffer.key % 2 else config.STATEMENT_SCOPE)
+
+        if buffer.swapped is None:
+            row = buffer.rows[buffer.count % len(buffer.rows)]
+            restore = False
+            buffer.swapped = row
+        else:
+            row = buffer.swapped
+            restore = bool(buffer.count % 2)
+            buffer.swapped = None
+            buffer.count += 1
+
+        edit = self._get_edit(buffer, row, restore)
+        buffer.lines[edit.start:edit.end] = edit.lines
+        buffer.version += 1
+
+
+@unittest.skipUnless(_ENABLED, 'Set PYTHON_STYLE_SWAPPER_SOAK=1 to swap calls for a long time')
+@unittest.skipIf(tracemalloc is None, 'Memory can only be traced with `tracemalloc`')
+class Soak(unittest.TestCase):
+
+    '''Swap many calls, across several buffers, like an editor which stays open for days.'''
+
+    def setUp(self):
+        '''Remember the user's preferences and astroid's cached modules so that they can be restored, later.'''
+        super(Soak, self).setUp()
+
+        self.addCleanup(config.register_parse_scope, config.get_parse_scope())
+        self.addCleanup(config.register_backend, config.get_backend())
+        config.register_backend(config.ASTROID_BACKEND)
+
+        modules = astroid.MANAGER.astroid_cache
+        cached = dict(modules.items())
+        self.addCleanup(lambda: (modules.clear(), modules.update(cached)))
+
+    def test_memory(self):
+        '''Keep the memory in use, the cached modules and the process's size the same, after every swap.'''
+        editor = _Editor()
+        originals = [list(buffer.lines) for buffer in editor.buffers]
+
+        # Trace the warm-up too, so that the parses which are cached when
+        # memory is first measured are counted once they're replaced
+        #
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.addCleanup(tracemalloc.stop)
+
+        for index in range(_WARM_UP):
+            editor.toggle(index)
+
+        gc.collect()
+        modules = len(astroid.MANAGER.astroid_cache)
+        rss = _get_rss()
+        before = tracemalloc.take_snapshot()
+        start = tracemalloc.get_traced_memory()[0]
+
+        for index in range(_WARM_UP, _TOGGLES):
+            editor.toggle(index)
+
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - start
+        after = tracemalloc.take_snapshot()
+        growth = '\n'.join(str(statistic) for statistic in after.compare_to(before, 'lineno')[:10])
+
+        self.assertEqual(originals, [buffer.lines for buffer in editor.buffers])
+        self.assertLessEqual(len(astroid.MANAGER.astroid_cache), modules)
+        self.assertLessEqual(
+            retained,
+            _TRACED_LIMIT,
+            msg='{retained} bytes are still in use after {count} swaps. The largest growth is:\n{growth}'.format(
+                retained=retained, count=_TOGGLES - _WARM_UP, growth=growth),
+        )
+
+        if rss is not None:
+            self.assertLessEqual(_get_rss() - rss, _RSS_LIMIT)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that only the statement under the cursor is parsed.'''
+
+# IMPORT STANDARD LIBRARIES
+import textwrap
+import timeit
+import unittest
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper.trimmer import statement
+from python_style_swapper.trimmer import session
+from python_style_swapper.trimmer import builder
+from python_style_swapper import swapper
+from python_style_swapper import config
+import astroid
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+# IMPORT LOCAL LIBRARIES
+from tests import common
+
+
+_CODE = textwrap.dedent(
+    '''
+    class Thing(object):
+        def method(self):
+            value = foo(
+                bar,
+                fizz(1, 2),
+                another=3,
+            )
+
+            # A comment
+            if buzz(value, 'text)'):
+                return foo(value) + \\
+                    bar(value)
+    '''
+).split('\n')
+
+
+class StatementRange(unittest.TestCase):
+
+    '''Find the lines of the statement under some row.'''
+
+    def test_single_line(self):
+        '''Find a statement which is only one line.'''
+        self.assertEqual((3, 3), statement.get_statement_range(_CODE, 3))
+
+    def test_multi_line(self):
+        '''Find a bracketed statement from any of its lines.'''
+        for row in range(4, 9):
+            self.assertEqual((4, 8), statement.get_statement_range(_CODE, row))
+
+    def test_continuation(self):
+        '''Find a statement which uses a backslash to continue onto the next line.'''
+        self.assertEqual((12, 13), statement.get_statement_range(_CODE, 12))
+        self.assertEqual((12, 13), statement.get_statement_range(_CODE, 13))
+
+    def test_no_statement(self):
+        '''Blank lines and comments are not part of any statement.'''
+        self.assertIs(statement.OUTSIDE, statement.get_statement_range(_CODE, 9))
+        self.assertIs(statement.OUTSIDE, statement.get_statement_range(_CODE, 10))
+
+    def test_no_statement_cost(self):
+        '''Stop searching as soon as a blank line is known to be between two statements.'''
+        lines = ['foo = 1'] * 500 + [''] + ['foo = 1'] * 500
+
+        with mock.patch.object(statement, '_find_statement_from', wraps=statement._find_statement_from) as patch:
+            self.assertIs(statement.OUTSIDE, statement.get_statement_range(lines, 501))
+
+        self.assertEqual(1, patch.call_count)
+
+    def test_comment_block(self):
+        '''Don't tokenize from blank lines or comments, which can't start a statement.'''
+        lines = ['foo = 1'] + ['# A comment'] * 3000 + ['foo = 1']
+
+        with mock.patch.object(statement, '_find_statement_from', wraps=statement._find_statement_from) as patch:
+            self.assertIs(statement.OUTSIDE, statement.get_statement_range(lines, 1500))
+
+        self.assertEqual(0, patch.call_count)
+
+    def test_blank_line_in_brackets(self):
+        '''Find the statement of a blank line between the arguments of a call.'''
+        lines = ['value = foo(', '    bar,', '', '    fizz,', ')']
+
+        self.assertEqual((1, 5), statement.get_statement_range(lines, 3))
+
+    def test_multi_line_string(self):
+        '''Find the statement of a row inside of a multi-line string, not the string's text.'''
+        lines = ['def f():', "    s = '''", '    foo(a, b)', '', "    '''", '    return s']
+
+        for row in range(2, 6):
+            self.assertEqual((2, 5), statement.get_statement_range(lines, row))
+
+        self.assertEqual((6, 6), statement.get_statement_range(lines, 6))
+        self.assertEqual([(1, 1), (2, 5), (6, 6)], list(statement.iter_statement_ranges(lines, 1, 6)))
+
+    def test_consecutive_strings(self):
+        '''Find the statement of a row inside of a string which opens on the line that closes another string.'''
+        lines = ["for code in ('''", '    foo(a)', "''', '''", '    bar(b)', "'''):", '    pass']
+
+        for row in range(1, 6):
+            self.assertEqual((1, 5), statement.get_statement_range(lines, row))
+
+    def test_multi_line_string_swap(self):
+        '''Never swap code which is only text inside of a multi-line string.'''
+        code = "def f():\n    s = '''\n    foo(a, b)\n    '''\n    return s"
+        self.addCleanup(config.register_backend, config.get_backend())
+
+        for backend in (config.ASTROID_BACKEND, config.AST_BACKEND):
+            config.register_backend(backend)
+
+            self.assertEqual((code, None), swapper.toggle(code, 3))
+
+
+class _Lines(list):
+
+    '''A list of lines which remembers how many lines were read, like a Vim buffer.'''
+
+    def __init__(self, lines):
+        '''Store the lines and start counting reads.'''
+        super(_Lines, self).__init__(lines)
+        self.read = 0
+
+    def __getitem__(self, index):
+        '''Count every line which is read, whether by index or by slice.'''
+        value = super(_Lines, self).__getitem__(index)
+        self.read += len(value) if isinstance(index, slice) else 1
+
+        return value
+
+
+class StatementWindow(unittest.TestCase):
+
+    '''Copy only the lines around a statement.'''
+
+    def test_small_file(self):
+        '''Copy every line of a file which is smaller than the window.'''
+        self.assertEqual((_CODE, 0), statement.get_window(_CODE, 5))
+
+    def test_grow(self):
+        '''Grow the window until it contains the whole statement.'''
+        lines = ['foo = 1'] * 100 + ['bar('] + ['    fizz,'] * 20 + [')'] + ['foo = 1'] * 100
+        window, offset = statement.get_window(lines, 110, size=4)
+
+        self.assertEqual((101 - offset, 122 - offset), statement.get_statement_range(window, 110 - offset))
+        self.assertLess(len(window), 100)
+        self.assertEqual(lines[offset:offset + len(window)], window)
+
+    def test_blank_line(self):
+        '''Stop growing as soon as the row is known to be outside of every statement.'''
+        lines = _Lines(['foo = 1'] * 10000 + [''] + ['foo = 1'] * 10000)
+        window, offset = statement.get_window(lines, 10001)
+
+        self.assertEqual(len(window), statement.WINDOW_SIZE * 2 + 1)
+        self.assertIs(statement.OUTSIDE, statement.get_statement_range(window, 10001 - offset))
+        self.assertLess(lines.read, 100)
+
+    def test_comment_block(self):
+        '''Stop growing once the window holds every line that could start the statement of a comment.'''
+        lines = _Lines(['foo = 1'] * 5000 + ['# A comment'] * 3000 + ['foo = 1'] * 5000)
+        window, _ = statement.get_window(lines, 6500)
+
+        self.assertLess(len(window), (statement.MAX_LOOKBEHIND + statement.WINDOW_SIZE) * 4)
+        self.assertLess(lines.read, statement.MAX_LOOKBEHIND * 8)
+
+    def test_large_file(self):
+        '''Read lines in proportion to the statement, not to the file.'''
+        lines = _Lines('value_{index} = foo(bar, {index})'.format(index=index) for index in range(20000))
+        window, offset = statement.get_window(lines, 10000)
+        edit, call = swapper.get_edit(session.Session('\n'.join(window)), 10000 - offset)
+
+        self.assertLess(lines.read, 1000)
+        self.assertEqual(10000, call.fromlineno + offset)
+        self.assertEqual((9999, 10000), (edit.start + offset, edit.end + offset))
+
+
+class TopLevel(unittest.TestCase):
+
+    '''Find the rows which must be copied so that an indented statement can be parsed.'''
+
+    _LINES = [
+        'foo = 1',
+        '@decorate',
+        'class Thing(object):',
+        "    '''",
+        'Text which is not indented.',
+        "    '''",
+        '    if x:',
+        '        pass',
+        '    elif foo(',
+        '):',
+        '        pass',
+        'else:',
+        '    pass',
+    ]
+
+    def test_start(self):
+        '''Start at the decorators of the top-level statement, skipping text which isn't a statement.'''
+        self.assertEqual(2, statement.get_top_level_start(self._LINES, 9))
+        self.assertEqual(1, statement.get_top_level_start(self._LINES, 1))
+
+    def test_clause(self):
+        '''Start at the compound statement which a clause, like "else:", belongs to.'''
+        self.assertEqual(2, statement.get_top_level_start(self._LINES, 13))
+
+    def test_complete_end(self):
+        '''Include the body of a compound statement's header and the definition below a decorator.'''
+        self.assertEqual(11, statement.get_complete_end(self._LINES, 9))
+        self.assertEqual(6, statement.get_complete_end(self._LINES, 2))
+        self.assertEqual(1, statement.get_complete_end(self._LINES, 1))
+
+
+class StatementParse(unittest.TestCase):
+
+    '''Parse one statement and keep its original positions.'''
+
+    def test_offset(self):
+        '''Every node has the same line numbers as it would in the whole file.'''
+        module = statement.parse(_CODE, 4, 8)
+        calls = list(module.nodes_of_class(astroid.Call))
+
+        self.assertEqual([4, 6], [call.fromlineno for call in calls])
+        self.assertEqual([16, 12], [call.col_offset for call in calls])
+
+    def test_compound_statement(self):
+        '''Parse the header of a compound statement, without its body.'''
+        module = statement.parse(_CODE, 11, 11)
+        call = next(module.nodes_of_class(astroid.Call))
+
+        self.assertEqual(11, call.fromlineno)
+        self.assertEqual('buzz', call.func.name)
+
+
+class StatementScope(common.Parsed, unittest.TestCase):
+
+    '''Toggle a call while only parsing the statement that it is in.'''
+
+    @staticmethod
+    def _make_code(count):
+        '''str: Create `count` single-line function calls.'''
+        return '\n'.join('value_{index} = foo(bar, {index})'.format(index=index) for index in range(count))
+
+    def test_parse_statement_only(self):
+        '''Only the statement under the cursor is given to astroid.'''
+        with mock.patch.object(builder, 'parse', wraps=builder.parse) as patch:
+            swapper.toggle(self._make_code(100), 50)
+
+        self.assertEqual([mock.call('value_49 = foo(bar, 49)')], patch.call_args_list)
+
+    def test_module_fallback(self):
+        '''Parse everything if the statement cannot be parsed on its own.'''
+        code = textwrap.dedent(
+            '''
+            if x:
+                pass
+            elif foo(
+                    bar, fizz):
+                pass
+            '''
+        )
+        context = session.Session(code)
+
+        with mock.patch.object(builder, 'parse', wraps=builder.parse) as patch:
+            call = context.get_nearest_call(5)
+
+        self.assertEqual('foo', call.func.name)
+        self.assertEqual(4, call.fromlineno)
+        self.assertEqual(2, patch.call_count)
+
+    def test_decorator(self):
+        '''Parse a decorator along with the header of the definition below it, instead of everything.'''
+        code = textwrap.dedent(
+            '''
+            class Thing(object):
+                @decorate(
+                    foo, bar)
+                @other
+                def method(self):
+                    pass
+            '''
+        )
+        lines = code.split('\n')
+        context = session.Session(code)
+
+        with mock.patch.object(builder, 'parse', wraps=builder.parse) as patch:
+            call = context.get_nearest_call(4)
+
+        self.assertEqual((3, 6), statement.get_statement_range(lines, 4))
+        self.assertEqual(('decorate', 3, 5), (call.func.name, call.fromlineno, call.col_offset))
+        self.assertEqual(1, patch.call_count)
+
+    def test_latency(self):
+        '''Toggle much faster than parsing the whole file.'''
+        code = self._make_code(5000)
+
+        def _toggle(scope):
+            config.register_parse_scope(scope)
+
+            try:
+                return min(timeit.repeat(lambda: swapper.toggle(code, 2500), number=1, repeat=3))
+            finally:
+                config.register_parse_scope(config.STATEMENT_SCOPE)
+
+        self.assertLess(_toggle(config.STATEMENT_SCOPE) * 10, _toggle(config.MODULE_SCOPE))
@@ -6,9 +6,24 @@
 # IMPORT STANDARD LIBRARIES
 import textwrap
 import unittest
+import sys
+import ast
 
 # IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper.trimmer import brackets
+from python_style_swapper.trimmer import session
+from python_style_swapper.trimmer import syntax
+from python_style_swapper import visitor
 from python_style_swapper import swapper
+from python_style_swapper import config
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+# IMPORT LOCAL LIBRARIES
+from tests import common
 
 
 class _Common(unittest.TestCase):
@@ -340,3 +355,373 @@ class ToggleStyle(_Common):
         )
 
         self._compare(expected, code)
+
+
+class ParsedSingleLineSwap(common.Parsed, SingleLineSwap):
+
+    '''Run <SingleLineSwap> using astroid.'''
+
+    pass
+
+
+class ParsedMultiLineSwap(common.Parsed, MultiLineSwap):
+
+    '''Run <MultiLineSwap> using astroid.'''
+
+    pass
+
+
+class ParsedSingleLineAssignmentSwap(common.Parsed, SingleLineAssignmentSwap):
+
+    '''Run <SingleLineAssignmentSwap> using astroid.'''
+
+    pass
+
+
+class ParsedMultiLineAssignmentSwap(common.Parsed, MultiLineAssignmentSwap):
+
+    '''Run <MultiLineAssignmentSwap> using astroid.'''
+
+    pass
+
+
+class ParsedToggleStyle(common.Parsed, ToggleStyle):
+
+    '''Run <ToggleStyle> using astroid.'''
+
+    pass
+
+
+class ParsedSourceSlices(common.Parsed, unittest.TestCase):
+
+    '''Re-write calls that astroid found from slices of their source code.'''
+
+    def test_keep_formatting(self):
+        '''Keep the spacing and quotes of each argument, instead of re-printing it.'''
+        code = "foo({'fizz':   \"buzz\"}, lambda x: x,  thing=[1,2])"
+        expected = textwrap.dedent(
+            '''\
+            foo(
+                {'fizz':   "buzz"},
+                lambda x: x,
+                thing=[1,2],
+            )'''
+        )
+
+        with mock.patch.object(visitor.MultiLineCallVisitor, 'visit_call') as patch:
+            self.assertEqual(expected, swapper.toggle(code, 1)[0])
+
+        self.assertEqual(0, patch.call_count)
+        self.assertEqual(code.replace(',  ', ', '), swapper.toggle(expected, 2)[0])
+
+    def test_no_tokens(self):
+        '''Re-print the call with astroid if its tokens couldn't be found.'''
+        expected = textwrap.dedent(
+            '''\
+            foo(
+                {'fizz': 'buzz'},
+            )'''
+        )
+
+        with mock.patch.object(brackets.BracketTable, 'get_call_span', return_value=None):
+            self.assertEqual(expected, swapper.toggle("foo({'fizz':   \"buzz\"})", 1)[0])
+
+    def test_parenthesized_function(self):
+        '''Keep the parentheses around a function which is called.'''
+        code = 'x = (foo.bar)(lambda: 1, fizz)'
+        expected = textwrap.dedent(
+            '''\
+            x = (foo.bar)(
+                lambda: 1,
+                fizz,
+            )'''
+        )
+
+        self.assertEqual(expected, swapper.toggle(code, 1)[0])
+        self.assertEqual(code, swapper.toggle(expected, 1)[0])
+
+    @unittest.skipIf(sys.version_info < (3, 7), 'Modules only have `__getattr__` in Python 3.7+')
+    def test_visitor_alias(self):
+        '''Find the visitor by its old name, on <swapper>.'''
+        self.assertIs(visitor.MultiLineCallVisitor, swapper.MultiLineCallVisitor)
+
+
+class _Syntax(common.Parsed):
+
+    '''A mix-in which forces calls to be found by parsing with the "ast" backend.'''
+
+    def setUp(self):
+        '''Parse with `ast` instead of astroid.'''
+        super(_Syntax, self).setUp()
+
+        config.register_backend(config.AST_BACKEND)
+        self.addCleanup(config.register_backend, config.ASTROID_BACKEND)
+
+
+class SyntaxSingleLineSwap(_Syntax, SingleLineSwap):
+
+    '''Run <SingleLineSwap> using `ast`.'''
+
+    pass
+
+
+class SyntaxMultiLineSwap(_Syntax, MultiLineSwap):
+
+    '''Run <MultiLineSwap> using `ast`.'''
+
+    pass
+
+
+class SyntaxSingleLineAssignmentSwap(_Syntax, SingleLineAssignmentSwap):
+
+    '''Run <SingleLineAssignmentSwap> using `ast`.'''
+
+    pass
+
+
+class SyntaxMultiLineAssignmentSwap(_Syntax, MultiLineAssignmentSwap):
+
+    '''Run <MultiLineAssignmentSwap> using `ast`.'''
+
+    pass
+
+
+class SyntaxToggleStyle(_Syntax, ToggleStyle):
+
+    '''Run <ToggleStyle> using `ast`.'''
+
+    pass
+
+
+class RoundTrip(unittest.TestCase):
+
+    '''Swap calls which `roundtrip` found being swapped into different or broken code.'''
+
+    def setUp(self):
+        '''Remember the user's backend, so each test can change it.'''
+        super(RoundTrip, self).setUp()
+
+        self.addCleanup(config.register_backend, config.get_backend())
+
+    def _assert_round_trip(self, code, expected, row):
+        '''Check that `code` expands into `expected`, with every backend, and then collapses back.'''
+        for backend in (config.AST_BACKEND, config.ASTROID_BACKEND):
+            config.register_backend(backend)
+            expanded = swapper.make_multi_line(code, row)
+            collapsed = swapper.make_single_line(expanded, row)
+
+            self.assertEqual(expected, expanded, msg=backend)
+            self.assertEqual(collapsed, swapper.make_single_line(collapsed, row), msg=backend)
+            self.assertEqual(ast.dump(ast.parse(code)), ast.dump(ast.parse(collapsed)), msg=backend)
+
+    def test_generator_targets(self):
+        '''Keep the comma of a generator's targets in the generator's argument.'''
+        code = "items = ', '.join(str(expr) for expr, vars in node.items)"
+        expected = textwrap.dedent(
+            '''\
+            items = ', '.join(
+                (str(expr) for expr, vars in node.items),
+            )'''
+        )
+
+        self._assert_round_trip(code, expected, 1)
+
+    def test_nested_generator_targets(self):
+        '''Keep the comma of a generator's targets when the generator has a call of its own.'''
+        code = 'if not any(isinstance(k, X) for k, _ in self.items):\n    pass'
+        expected = textwrap.dedent(
+            '''\
+            if not any(
+                (isinstance(k, X) for k, _ in self.items),
+            ):
+                pass'''
+        )
+
+        self._assert_round_trip(code, expected, 1)
+
+    def test_multi_line_generator(self):
+        '''Swap a generator whose targets are on a later row than its call.'''
+        code = textwrap.dedent(
+            '''\
+            field_defs = '\\n'.join(field_def.format(name=name, index=index)
+                                    for index, name in enumerate(attributes))'''
+        )
+        expected = textwrap.dedent(
+            '''\
+            field_defs = '\\n'.join(
+                (field_def.format(name=name, index=index) for index, name in enumerate(attributes)),
+            )'''
+        )
+
+        self._assert_round_trip(code, expected, 2)
+
+    def test_parenthesized_operator(self):
+        '''Keep the statement and the parentheses around an operator which is called.'''
+        code = textwrap.dedent(
+            '''\
+            def visit(node):
+                return (' %s ' % node.op).join(['(%s)' % n.accept(self)
+                                                for n in node.values])'''
+        )
+        expected = textwrap.dedent(
+            '''\
+            def visit(node):
+                return (' %s ' % node.op).join(
+                    ['(%s)' % n.accept(self) for n in node.values],
+                )'''
+        )
+
+        self._assert_round_trip(code, expected, 2)
+
+    def test_parenthesized_operator_no_tokens(self):
+        '''Keep the statement and the parentheses when astroid re-prints the call.'''
+        config.register_backend(config.ASTROID_BACKEND)
+        code = "def visit(node):\n    return (' %s ' % node.op).join(lambda: items)"
+        expected = textwrap.dedent(
+            '''\
+            def visit(node):
+                return ((' %s ') % (node.op)).join(
+                    lambda : items,
+                )'''
+        )
+
+        with mock.patch.object(brackets.BracketTable, 'get_call_span', return_value=None):
+            self.assertEqual(expected, swapper.make_multi_line(code, 2))
+
+    def test_unsafe_no_tokens(self):
+        '''Don't change a call which astroid can't re-print without losing the code around it.'''
+        config.register_backend(config.ASTROID_BACKEND)
+        code = 'if foo(lambda: 1, bar):\n    pass'
+
+        with mock.patch.object(brackets.BracketTable, 'get_call_span', return_value=None):
+            self.assertEqual(code, swapper.make_multi_line(code, 1))
+
+    def test_continuation_row(self):
+        '''Collapse a call from its last row, which then belongs to the code after it.'''
+        code = textwrap.dedent(
+            '''\
+            self.assertEqual(
+                'type', klass.metaclass().name)
+            self.assertEqual(found.type,
+                             spec.ModuleType.PY_ZIPMODULE)'''
+        )
+        collapsed = textwrap.dedent(
+            '''\
+            self.assertEqual('type', klass.metaclass().name)
+            self.assertEqual(found.type,
+                             spec.ModuleType.PY_ZIPMODULE)'''
+        )
+
+        self.assertEqual(collapsed, swapper.make_single_line(code, 2))
+        self.assertEqual(collapsed, swapper.make_single_line(collapsed, 1))
+
+
+class Edits(unittest.TestCase):
+
+    '''Only describe the lines which a swap changes.'''
+
+    def test_large_file(self):
+        '''Replace only the lines of the call, even in a very large file.'''
+        code = '\n'.join('value_{index} = foo(bar, {index})'.format(index=index) for index in range(20000))
+        edit, _ = swapper.get_edit(session.Session(code), 10000)
+
+        self.assertEqual((9999, 10000), (edit.start, edit.end))
+        self.assertEqual(['value_9999 = foo(', '    bar,', '    9999,', ')'], edit.lines)
+
+    def test_unchanged_lines(self):
+        '''Skip lines at the start and end of a replacement which stay the same.'''
+        lines = ['foo(', '    bar, fizz,', ')', 'thing']
+        edit = swapper._get_edit(lines, 0, 3, ['foo(', '    bar,', '    fizz,', ')'])
+
+        self.assertEqual((1, 2, ['    bar,', '    fizz,']), (edit.start, edit.end, edit.lines))
+
+    def test_no_call(self):
+        '''Don't make an edit if there's no call to swap.'''
+        self.assertEqual((None, None), swapper.get_edit(session.Session('foo = 8'), 1))
+
+    def test_apply(self):
+        '''Apply an edit to a copy of some lines.'''
+        lines = ['foo', 'bar', 'fizz']
+        edit = swapper.Edit(1, 2, ['buzz', 'thing'])
+
+        self.assertEqual(['foo', 'buzz', 'thing', 'fizz'], edit.apply(lines))
+        self.assertEqual(['foo', 'bar', 'fizz'], lines)
+        self.assertFalse(swapper.Edit(1, 1, []))
+
+
+class ToggleRange(unittest.TestCase):
+
+    '''Swap every call in a range of rows at once.'''
+
+    def test_every_call(self):
+        '''Swap each statement's call, even though earlier swaps change the rows of later calls.'''
+        code = textwrap.dedent(
+            '''\
+            foo(
+                1,
+            )
+            bar(2, 3)
+
+            # A comment
+            fizz(
+                4,
+            )'''
+        )
+        expected = textwrap.dedent(
+            '''\
+            foo(1)
+            bar(
+                2,
+                3,
+            )
+
+            # A comment
+            fizz(4)'''
+        )
+
+        self.assertEqual((expected, 3), swapper.toggle_range(code, 1, 9))
+
+    def test_partial_range(self):
+        '''Only swap calls of statements within the range, including a statement that the range starts inside of.'''
+        code = textwrap.dedent(
+            '''\
+            foo(
+                1,
+            )
+            bar(2, 3)
+            fizz(4, 5)'''
+        )
+        expected = textwrap.dedent(
+            '''\
+            foo(1)
+            bar(
+                2,
+                3,
+            )
+            fizz(4, 5)'''
+        )
+
+        self.assertEqual((expected, 2), swapper.toggle_range(code, 2, 4))
+
+    def test_parse_once(self):
+        '''Parse the whole file only once, no matter how many calls need it.'''
+        code = '\n'.join(
+            'if x:\n    pass\nelif foo(lambda: {index}, {index}):\n    pass'.format(index=index)
+            for index in range(10)
+        )
+        context = session.Session(code, backend=config.AST_BACKEND)
+
+        with mock.patch.object(syntax, 'parse', wraps=syntax.parse) as patch:
+            edits = swapper.get_range_edits(context, 1, len(context.lines))
+
+        whole = [call for call in patch.call_args_list if call[0][1:] == (1, len(context.lines))]
+
+        self.assertEqual(10, len(edits))
+        self.assertEqual(1, len(whole))
+
+    def test_apply_edits(self):
+        '''Apply edits which are given in any order.'''
+        lines = ['foo', 'bar', 'fizz', 'buzz']
+        edits = [swapper.Edit(3, 4, ['thing']), swapper.Edit(0, 1, ['a', 'b'])]
+
+        self.assertEqual(['a', 'b', 'bar', 'fizz', 'thing'], swapper.apply_edits(lines, edits))
@@ -0,0 +1,184 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that calls can be found and swapped using the "ast" backend.'''
+
+# IMPORT STANDARD LIBRARIES
+import textwrap
+import timeit
+import unittest
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper.trimmer import session
+from python_style_swapper.trimmer import builder
+from python_style_swapper.trimmer import syntax
+from python_style_swapper import swapper
+from python_style_swapper import config
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+
+class _SyntaxCase(unittest.TestCase):
+
+    '''A test case which parses with `ast` instead of astroid.'''
+
+    def setUp(self):
+        '''Use the "ast" backend.'''
+        super(_SyntaxCase, self).setUp()
+
+        config.register_backend(config.AST_BACKEND)
+        self.addCleanup(config.register_backend, config.ASTROID_BACKEND)
+
+    def _toggle(self, code, row):
+        '''str: Toggle the call on `row` and make sure that astroid was never used.'''
+        code = textwrap.dedent(code)
+
+        with mock.patch.object(builder, 'parse', wraps=builder.parse) as patch:
+            output, _ = swapper.toggle(code, row)
+
+        self.assertEqual(0, patch.call_count)
+
+        return output
+
+
+def _get_span(lines, row):
+    '''<locator.CallSpan> or NoneType: Find the call on `row` of `lines` with `ast`, the way that a swap does.'''
+    return session.Session('\n'.join(lines), backend=config.AST_BACKEND).get_syntax_span(row)
+
+
+class Calls(unittest.TestCase):
+
+    '''Find calls by parsing.'''
+
+    def test_lambda(self):
+        '''Don't split a lambda's parameters into separate arguments.'''
+        call = _get_span(['foo(lambda x, y: x, bar)'], 1)
+
+        self.assertEqual('foo', call.name)
+        self.assertEqual([((1, 4), (1, 18)), ((1, 20), (1, 23))], call.arguments)
+
+    def test_non_ascii(self):
+        '''Find calls which come after non-ASCII text.'''
+        call = _get_span([u'x = "é"; foo(lambda: 1)'], 1)
+
+        self.assertEqual((1, 9), call.start)
+
+    def test_decorator(self):
+        '''Find the call of a decorator, which is parsed along with the definition below it.'''
+        lines = ['@decorate(', '    foo, bar)', 'def function():', '    pass']
+
+        self.assertEqual((1, 1), _get_span(lines, 2).start)
+
+    def test_syntax_error(self):
+        '''Raise an exception if the code isn't valid Python.'''
+        with self.assertRaises(SyntaxError):
+            _get_span(['foo(lambda: 1', 'bar = )'], 1)
+
+    def test_parenthesized_function(self):
+        '''Find a call whose called expression is wrapped in parentheses.'''
+        self.assertEqual((1, 4), _get_span(['x = (foo)(lambda: 1, bar)'], 1).start)
+        self.assertEqual((1, 0), _get_span(['(foo(bar))(lambda: 1)'], 1).start)
+
+    def test_session(self):
+        '''Find calls with `ast` only once for each row.'''
+        context = session.Session('foo(lambda: 1)', backend=config.AST_BACKEND)
+
+        with mock.patch.object(syntax, 'get_calls', wraps=syntax.get_calls) as patch:
+            context.get_syntax_span(1)
+            context.get_syntax_span(1)
+
+        self.assertEqual(1, patch.call_count)
+
+    def test_backend(self):
+        '''Only allow known backends.'''
+        with self.assertRaises(ValueError):
+            config.register_backend('something')
+
+
+class SyntaxSwap(_SyntaxCase):
+
+    '''Swap calls that the tokens alone aren't enough for.'''
+
+    def test_expand_lambda(self):
+        '''Keep a lambda's parameters together.'''
+        expected = textwrap.dedent(
+            '''\
+            foo(
+                lambda x, y: x + y,
+                bar,
+            )'''
+        )
+
+        self.assertEqual(expected, self._toggle('foo(lambda x, y: x + y, bar)', 1))
+
+    def test_collapse_arguments(self):
+        '''Join arguments that span multiple lines and remove comments.'''
+        code = \
+            '''\
+            foo(
+                bar,  # A comment
+                {
+                    'fizz': "buzz",
+                },
+            )'''
+
+        self.assertEqual('foo(bar, {\'fizz\': "buzz",})', self._toggle(code, 2))
+
+    def test_expand_generator(self):
+        '''Add parentheses to a generator so that it can have a trailing comma.'''
+        expected = textwrap.dedent(
+            '''\
+            foo(
+                (item for item in items),
+            )'''
+        )
+
+        self.assertEqual(expected, self._toggle('foo(item for item in items)', 1))
+
+    def test_parenthesized_function(self):
+        '''Keep the parentheses around a called expression.'''
+        expected = textwrap.dedent(
+            '''\
+            x = (foo.bar)(
+                lambda: 1,
+                fizz,
+            )'''
+        )
+
+        self.assertEqual(expected, self._toggle('x = (foo.bar)(lambda: 1, fizz)', 1))
+
+    def test_compound_statement(self):
+        '''Keep the text around a call in a compound statement.'''
+        code = \
+            '''\
+            if foo(lambda: 1, bar):
+                pass'''
+        expected = textwrap.dedent(
+            '''\
+            if foo(
+                lambda: 1,
+                bar,
+            ):
+                pass'''
+        )
+
+        self.assertEqual(expected, self._toggle(code, 1))
+
+
+class Latency(unittest.TestCase):
+
+    '''Make sure that the "ast" backend is faster than astroid.'''
+
+    def test_module_parse(self):
+        '''Find and swap a call faster than astroid, even when the whole file is parsed.'''
+        code = '\n'.join('value_{index} = foo(lambda: bar, {index})'.format(index=index) for index in range(2000))
+
+        def _toggle(backend):
+            context = lambda: session.Session(code, scope=config.MODULE_SCOPE, backend=backend)
+
+            return min(timeit.repeat(lambda: swapper.toggle_session(context(), 1000), number=1, repeat=3))
+
+        self.assertLess(_toggle(config.AST_BACKEND) * 3, _toggle(config.ASTROID_BACKEND))
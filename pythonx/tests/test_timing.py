@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that each phase of a swap is timed on its own and that old swaps are forgotten.'''
+
+# IMPORT STANDARD LIBRARIES
+import unittest
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper import swapper
+from python_style_swapper import timing
+from python_style_swapper import config
+
+
+class _TimingCase(unittest.TestCase):
+
+    '''A test case which starts and ends with no recorded swaps.'''
+
+    def setUp(self):
+        '''Forget every swap that was recorded by other tests.'''
+        super(_TimingCase, self).setUp()
+
+        timing.clear()
+        self.addCleanup(timing.clear)
+
+
+class Record(_TimingCase):
+
+    '''Time the phases of swaps.'''
+
+    def test_phases(self):
+        '''Count each phase's time only once, even when phases run inside other phases.'''
+        with timing.record(command='toggle') as record:
+            swapper.toggle('foo(lambda: 1, bar)', 1)
+
+        times = record.get_milliseconds()
+
+        self.assertGreater(times['parse'], 0)
+        self.assertGreater(times['render'], 0)
+        self.assertAlmostEqual(times['total'], sum(times[name] for name in timing.PHASES), delta=0.001)
+        self.assertGreater(record.counts['calls'], 0)
+
+    def test_not_recorded(self):
+        '''Don't time anything unless a swap is being recorded.'''
+        swapper.toggle('foo(bar)', 1)
+
+        self.assertEqual([], timing.get_history())
+
+    def test_history(self):
+        '''Only keep the most recent swaps.'''
+        size = config.get_timing_history()
+        config.register_timing_history(2)
+        self.addCleanup(config.register_timing_history, size)
+
+        for index in range(3):
+            with timing.record(command=str(index)):
+                pass
+
+        self.assertEqual(['1', '2'], [record.info['command'] for record in timing.get_history()])
+
+    def test_keep(self):
+        '''Don't add a swap to the history if it isn't meant to be kept.'''
+        with timing.record(keep=False):
+            pass
+
+        self.assertEqual([], timing.get_history())
+
+
+class Percentiles(_TimingCase):
+
+    '''Summarize the times of many swaps.'''
+
+    def test_nearest_rank(self):
+        '''Find the smallest value which is at least as large as the percent of every value.'''
+        values = list(range(1, 101))
+
+        self.assertEqual(50, timing.get_percentile(values, 50))
+        self.assertEqual(95, timing.get_percentile(values, 95))
+        self.assertEqual(3, timing.get_percentile([3], 99))
+        self.assertEqual(0, timing.get_percentile([], 99))
+
+    def test_format(self):
+        '''Show a header, every swap and every percentile.'''
+        for _ in range(3):
+            with timing.record(command='toggle', lines=10):
+                swapper.toggle('foo(bar)', 1)
+
+        rows = timing.format_history(timing.get_history())
+
+        self.assertEqual(1 + 3 + len(timing.PERCENTILES), len(rows))
+        self.assertEqual(['swap', 'lines', 'calls', 'total'], rows[0].split()[:4])
+        self.assertEqual('p99', rows[-1].split()[0])
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+'''Make sure that swaps which are found ahead of time are re-used only while they're still valid.'''
+
+# IMPORT STANDARD LIBRARIES
+import textwrap
+import unittest
+import sys
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+# IMPORT LOCAL LIBRARIES
+from tests import fake_vim
+
+# `vim` only exists inside of Vim. It must be replaced before <vim_swapper> imports it
+sys.modules.setdefault('vim', fake_vim)
+
+# IMPORT THIRD-PARTY LIBRARIES
+from python_style_swapper.trimmer import builder  # pylint: disable=wrong-import-position
+from python_style_swapper import vim_swapper  # pylint: disable=wrong-import-position
+from python_style_swapper import config  # pylint: disable=wrong-import-position
+
+
+_CODE = textwrap.dedent(
+    '''\
+    value = foo(
+        bar,
+        fizz,
+    )
+
+    other = thing(1) + thing(2)'''
+).split('\n')
+
+
+class _VimCase(unittest.TestCase):
+
+    '''A test case which swaps calls in a stand-in Vim buffer.'''
+
+    def setUp(self):
+        '''Show `_CODE` in a new buffer and forget every earlier swap.'''
+        super(_VimCase, self).setUp()
+
+        fake_vim.reset(_CODE)
+        self.addCleanup(vim_swapper._PRECOMPUTED.clear)
+        self.addCleanup(vim_swapper._RESTORES.clear)
+        self.addCleanup(vim_swapper._CACHE.clear)
+        self.addCleanup(config.register_precompute_lines, config.get_precompute_lines())
+
+        patcher = mock.patch.object(vim_swapper, '_find_edit', wraps=vim_swapper._find_edit)
+        self.find = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _move(row):
+        '''Put the cursor on a 1-based row and find its swap, as if Vim was idle.'''
+        fake_vim.current.window.cursor = (row, 0)
+        vim_swapper.precompute()
+
+
+class Precompute(_VimCase):
+
+    '''Find swaps while Vim is idle.'''
+
+    def test_reuse(self):
+        '''Search once for every row of a statement whose call spans the whole statement.'''
+        for row in range(1, 5):
+            self._move(row)
+
+        self.assertEqual(1, self.find.call_count)
+        self.assertEqual((1, 4), vim_swapper._PRECOMPUTED[1][1])
+
+    def test_shared_statement(self):
+        '''Only re-use a swap from its own row if the statement has more than one call.'''
+        self._move(6)
+
+        self.assertEqual((6, 6), vim_swapper._PRECOMPUTED[1][1])
+
+    def test_changed(self):
+        '''Search again once the buffer changes.'''
+        self._move(2)
+        fake_vim.current.buffer[4:5] = ['# A comment']
+        self._move(2)
+
+        self.assertEqual(2, self.find.call_count)
+
+    def test_no_call(self):
+        '''Remember that a row has no call until the buffer changes or the cursor moves.'''
+        self._move(5)
+        self._move(5)
+
+        self.assertEqual(1, self.find.call_count)
+
+        self._move(6)
+        self._move(5)
+
+        self.assertEqual(3, self.find.call_count)
+
+    def test_error(self):
+        '''Remember that a row can't be parsed, but let <toggle> report the error.'''
+        self.find.side_effect = SyntaxError('invalid syntax')
+        self._move(1)
+        self._move(1)
+
+        self.assertEqual(1, self.find.call_count)
+
+        with self.assertRaises(SyntaxError):
+            vim_swapper.toggle()
+
+    def test_long_buffer(self):
+        '''Don't search buffers which are longer than the user's limit.'''
+        config.register_precompute_lines(len(_CODE) - 1)
+        self._move(1)
+
+        self.assertEqual(0, self.find.call_count)
+        self.assertEqual({}, vim_swapper._PRECOMPUTED)
+
+
+class PopPrecomputed(_VimCase):
+
+    '''Toggle with the swap that was found ahead of time.'''
+
+    def test_toggle(self):
+        '''Apply the swap without searching again.'''
+        self._move(3)
+        vim_swapper.toggle()
+
+        self.assertEqual(1, self.find.call_count)
+        self.assertEqual(['value = foo(bar, fizz)', '', 'other = thing(1) + thing(2)'], fake_vim.current.buffer)
+        self.assertEqual((1, 0), fake_vim.current.window.cursor)
+
+    def test_other_row(self):
+        '''Search again if the cursor moved outside of the swap's rows.'''
+        self._move(6)
+        fake_vim.current.window.cursor = (1, 0)
+        vim_swapper.toggle()
+
+        self.assertEqual(2, self.find.call_count)
+        self.assertEqual('value = foo(bar, fizz)', fake_vim.current.buffer[0])
+
+    def test_stale(self):
+        '''Never apply a swap which was found before the buffer changed.'''
+        self._move(1)
+        fake_vim.current.buffer[0] = 'value = foo('
+
+        self.assertIsNone(vim_swapper._pop_precomputed(fake_vim.current.buffer, 1))
+        self.assertEqual({}, vim_swapper._PRECOMPUTED)
+
+    def test_no_call(self):
+        '''Don't search again, or change anything, if the row was already found to have no call.'''
+        self._move(5)
+        vim_swapper.toggle()
+
+        self.assertEqual(1, self.find.call_count)
+        self.assertEqual(_CODE, fake_vim.current.buffer)
+
+
+class Toggle(_VimCase):
+
+    '''Swap the call under the cursor.'''
+
+    def test_parsed_memory(self):
+        '''Keep the cached sessions within the memory limit, once they're parsed.'''
+        self.addCleanup(config.register_cache_memory, config.get_cache_memory())
+        # A lambda can't be swapped from its tokens, so the buffer must be parsed
+        fake_vim.reset(['value = foo(lambda: bar)'])
+        config.register_cache_memory(len(fake_vim.current.buffer[0]) * 4)
+        vim_swapper.toggle()
+
+        self.assertLessEqual(vim_swapper._CACHE.get_memory(), config.get_cache_memory())
+
+
+class Window(_VimCase):
+
+    '''Copy more of the buffer only when the lines around the cursor can't be parsed.'''
+
+    def test_indented_block(self):
+        '''Parse from the top-level statement around the cursor, not the whole buffer.'''
+        lines = ['foo = 1'] * 100 + ['class Thing(object):'] + ['    x = 1'] * 100
+        lines += ['    def method(self):', '        if x:', '            pass', '        elif foo(lambda: 1, 2):', '            pass']
+        lines += ['    x = 1'] * 100
+        fake_vim.reset(lines)
+        # An "elif" can't be parsed without its "if" and the window starts inside of the class
+        fake_vim.current.window.cursor = (205, 0)
+
+        with mock.patch.object(builder, 'parse', wraps=builder.parse) as patch:
+            vim_swapper.toggle()
+
+        self.assertEqual(['        elif foo(', '            lambda: 1,', '            2,', '        ):'],
+                         fake_vim.current.buffer[204:208])
+        self.assertLess(max(len(call[0][0].split('\n')) for call in patch.call_args_list), 110)